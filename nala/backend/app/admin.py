@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Module, Node, Relationship, Topic, Concept, Student, StudentNote,
-    StudentQuizHistory, StudentBloomRecord, Conversation, Message
+    QuizPayload, StudentQuizHistory, StudentBloomRecord, Conversation, Message
 )
 
 # Node & Topic / Concept
@@ -19,9 +19,14 @@ class StudentQuizHistoryAdmin(admin.ModelAdmin):
     list_display = ('student', 'module', 'quiz_type', 'score', 'completed', 'created_at')
     list_filter = ('quiz_type', 'completed', 'module')
     search_fields = ('student__name', 'module__name')
-    readonly_fields = ('created_at', 'updated_at', 'quiz_data', 'student_answers')
+    readonly_fields = ('created_at', 'updated_at', 'payload', 'num_questions', 'student_answers')
     filter_horizontal = ('topics_covered',)  # ManyToMany field
 
+@admin.register(QuizPayload)
+class QuizPayloadAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'created_at')
+    readonly_fields = ('content_hash', 'questions', 'created_at')
+
 # Bloom record
 @admin.register(StudentBloomRecord)
 class StudentBloomRecordAdmin(admin.ModelAdmin):
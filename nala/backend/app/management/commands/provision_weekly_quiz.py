@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Module
+from app.services.quiz_provisioning import BATCH_SIZE, load_quiz_definitions, provision_weekly_quiz
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the weekly quiz for every student enrolled in a module. Safe to rerun: "
+        "students who already have a weekly quiz for the same topics are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("definition",
+                            help="JSON quiz definition ({module_id, topic_ids, questions} or a list), "
+                                 "or a CSV in the weeklyquizzes.csv format")
+        parser.add_argument("--module", help="Only provision definitions of this module")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Students per transaction")
+
+    def handle(self, *args, **options):
+        try:
+            definitions = load_quiz_definitions(options["definition"])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read quiz definition: {e}")
+        if options["module"]:
+            definitions = [d for d in definitions if str(d.get("module_id")) == options["module"]]
+        if not definitions:
+            raise CommandError("No quiz definitions to provision")
+
+        for definition in definitions:
+            module_id = definition.get("module_id")
+            topic_ids = definition.get("topic_ids") or []
+            label = f"module {module_id}, topics {','.join(str(t) for t in topic_ids)}"
+            start = time.perf_counter()
+
+            def report(totals):
+                self.stdout.write(f"  [{totals['existing'] + totals['created']}/{totals['students']}] {label}")
+
+            try:
+                totals = provision_weekly_quiz(
+                    module_id,
+                    topic_ids,
+                    definition.get("questions") or [],
+                    batch_size=options["batch_size"],
+                    progress=report,
+                )
+            except Module.DoesNotExist:
+                raise CommandError(f"Module '{module_id}' not found")
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{label}: {totals['created']} created, {totals['existing']} already provisioned "
+                f"of {totals['students']} enrolled ({time.perf_counter() - start:.1f}s)"
+            ))
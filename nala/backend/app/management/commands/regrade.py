@@ -0,0 +1,86 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import QuizPayload, StudentQuizHistory
+from app.services.grading import regrade_payload, rescore_quizzes
+
+
+class Command(BaseCommand):
+    help = (
+        "Regrade completed quiz attempts. With --payload/--quiz and a corrected answer key "
+        "(--key-file or --set), the quiz's answers are fixed and scores and Bloom counts of "
+        "every attempt are updated. Without a key, scores are recomputed from the stored questions."
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument("--payload", type=int, help="QuizPayload ID (all quizzes sharing these questions)")
+        target.add_argument("--quiz", type=int, help="A StudentQuizHistory ID; regrades every quiz sharing its questions")
+        target.add_argument("--module", help="Recompute scores of all completed quizzes in this module")
+        parser.add_argument("--key-file",
+                            help="JSON file with the corrected answers: a full list, or {question_index: answer}")
+        parser.add_argument("--set", action="append", default=[], metavar="INDEX=ANSWER",
+                            help="Correct one answer, e.g. --set 3=B (repeatable)")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without saving")
+
+    def handle(self, *args, **options):
+        answer_key = self._answer_key(options)
+        payload_id = options["payload"]
+        if options["quiz"] is not None:
+            quiz = StudentQuizHistory.objects.filter(id=options["quiz"]).only('id', 'payload_id').first()
+            if quiz is None or quiz.payload_id is None:
+                raise CommandError(f"Quiz {options['quiz']} not found or has no questions")
+            payload_id = quiz.payload_id
+
+        if payload_id is not None:
+            if not QuizPayload.objects.filter(id=payload_id).exists():
+                raise CommandError(f"QuizPayload {payload_id} not found")
+            try:
+                totals = regrade_payload(payload_id, answer_key, dry_run=options["dry_run"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(
+                f"Payload {totals['payload_id']}: {totals['quizzes']} attempts regraded, "
+                f"{totals['scores_changed']} scores changed, "
+                f"{totals['bloom_records_updated']} Bloom records updated"
+            )
+        else:
+            if answer_key is not None:
+                raise CommandError("A corrected answer key needs --payload or --quiz")
+            payload_ids = None
+            if options["module"]:
+                payload_ids = (
+                    StudentQuizHistory.objects.filter(module_id=options["module"], completed=True, payload__isnull=False)
+                    .order_by('payload_id').values_list('payload_id', flat=True).distinct()
+                )
+            totals = rescore_quizzes(payload_ids, dry_run=options["dry_run"])
+            self.stdout.write(
+                f"{totals['payloads']} quizzes, {totals['quizzes']} attempts rescored, "
+                f"{totals['scores_changed']} scores changed"
+            )
+
+        if options["dry_run"]:
+            self.stdout.write("Dry run: nothing was saved.")
+
+    def _answer_key(self, options):
+        if options["key_file"] and options["set"]:
+            raise CommandError("Use either --key-file or --set, not both")
+        if options["key_file"]:
+            try:
+                with open(options["key_file"], "r", encoding="utf-8") as f:
+                    answer_key = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read answer key: {e}")
+            if not isinstance(answer_key, (list, dict)):
+                raise CommandError("The answer key must be a JSON list or object")
+            return answer_key
+        if options["set"]:
+            answer_key = {}
+            for item in options["set"]:
+                index, sep, answer = item.partition("=")
+                if not sep or not index.strip().isdigit():
+                    raise CommandError(f"Expected INDEX=ANSWER, got {item!r}")
+                answer_key[int(index)] = answer.strip()
+            return answer_key
+        return None
@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from app.services import metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-view latency, DB query count/time and LLM call count/time.
+
+    Only a sample of requests (settings.METRICS_SAMPLE_RATE) is profiled so
+    the overhead stays low under load. A client can force profiling of a
+    single request and get the numbers back in a Server-Timing header by
+    sending `X-Server-Timing: 1` (when settings.METRICS_SERVER_TIMING is on).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = float(getattr(settings, "METRICS_SAMPLE_RATE", 0.1))
+        self.server_timing_enabled = bool(getattr(settings, "METRICS_SERVER_TIMING", False))
+
+    def __call__(self, request):
+        wants_timing = self.server_timing_enabled and request.headers.get("X-Server-Timing") == "1"
+        sampled = wants_timing or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        metrics.registry.count_request(sampled)
+
+        if not sampled:
+            return self.get_response(request)
+
+        request_metrics = metrics.begin_request()
+        start = time.perf_counter()
+        try:
+            with _wrap_all_connections():
+                response = self.get_response(request)
+        finally:
+            metrics.end_request()
+        elapsed = time.perf_counter() - start
+
+        metrics.registry.observe(_view_name(request), elapsed, response.status_code, request_metrics)
+
+        if wants_timing:
+            response["Server-Timing"] = _server_timing_header(elapsed, request_metrics)
+        return response
+
+
+class _wrap_all_connections:
+    """Install the query timer on every configured DB connection for this request."""
+
+    def __enter__(self):
+        self._wrappers = []
+        for alias in connections:
+            wrapper = connections[alias].execute_wrapper(metrics.db_query_wrapper)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        return self
+
+    def __exit__(self, *exc_info):
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(*exc_info)
+        return False
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.url_name or match.view_name or "unresolved"
+
+
+def _server_timing_header(elapsed: float, request_metrics: metrics.RequestMetrics) -> str:
+    return ", ".join([
+        f"total;dur={elapsed * 1000:.2f}",
+        f'db;dur={request_metrics.db_seconds * 1000:.2f};desc="{request_metrics.db_queries} queries"',
+        f'llm;dur={request_metrics.llm_seconds * 1000:.2f};desc="{request_metrics.llm_calls} calls"',
+    ])
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:38
+
+from django.db import migrations, models
+
+# Frozen copies of Student.LEARNING_STYLE_KEYS / LEARNING_STYLE_DESCRIPTIONS at this migration
+LEARNING_STYLE_KEYS = {
+    'Retrieval Practice': 'RETRIEVAL',
+    'Spaced Practice': 'SPACED',
+    'Elaboration': 'ELABORATION',
+    'Concrete Examples': 'CONCRETE',
+    'Interleaving': 'INTERLEAVING',
+    'Dual Coding': 'DUAL_CODING',
+}
+
+LEARNING_STYLE_DESCRIPTIONS = {
+    "RETRIEVAL": "Testing yourself to strengthen memory and recall",
+    "ELABORATION": "Explaining discrete ideas with many details",
+    "CONCRETE": "Use specific examples to understand abstract ideas",
+    "INTERLEAVING": "Mixing different topics or skills during study sessions",
+    "DUAL_CODING": "Using both visual and verbal information processing",
+}
+
+
+def backfill_learning_style(apps, schema_editor):
+    """Store the primary style the old read path derived from the breakdown, and its description."""
+    Student = apps.get_model("app", "Student")
+    batch = []
+    for student in list(Student.objects.only('id', 'learningStyle', 'learningStyleBreakdown')):
+        breakdown = student.learningStyleBreakdown or {}
+        primary = max(
+            (k for k in breakdown if k in LEARNING_STYLE_KEYS and isinstance(breakdown[k], (int, float))),
+            key=lambda k: breakdown[k],
+            default=None
+        )
+        if primary is not None and breakdown[primary] > 0:
+            student.learningStyle = LEARNING_STYLE_KEYS[primary]
+        student.learningStyleDescription = LEARNING_STYLE_DESCRIPTIONS.get(student.learningStyle, "")
+        batch.append(student)
+        if len(batch) >= 1000:
+            Student.objects.bulk_update(batch, ['learningStyle', 'learningStyleDescription'])
+            batch = []
+    if batch:
+        Student.objects.bulk_update(batch, ['learningStyle', 'learningStyleDescription'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_load_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='learningStyleDescription',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='learningStyle',
+            field=models.CharField(blank=True, choices=[('RETRIEVAL', 'Retrieval Practice'), ('SPACED', 'Spaced Practice'), ('ELABORATION', 'Elaboration'), ('CONCRETE', 'Concrete Examples'), ('INTERLEAVING', 'Interleaving'), ('DUAL_CODING', 'Dual Coding')], db_index=True, default='RETRIEVAL', max_length=20, null=True),
+        ),
+        migrations.RunPython(backfill_learning_style, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the levels at the time of this migration
+BLOOM_LEVELS = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
+
+
+def backfill_bloom_counts(apps, schema_editor):
+    StudentBloomRecord = apps.get_model('app', 'StudentBloomRecord')
+    StudentBloomCount = apps.get_model('app', 'StudentBloomCount')
+
+    batch = []
+    for record in StudentBloomRecord.objects.only('student_id', 'module_id', 'bloom_summary').iterator():
+        for topic_id, counts in (record.bloom_summary or {}).items():
+            for level, count in (counts or {}).items():
+                if level in BLOOM_LEVELS and isinstance(count, (int, float)) and count > 0:
+                    batch.append(StudentBloomCount(
+                        student_id=record.student_id, module_id=record.module_id,
+                        topic_id=str(topic_id), level=level, count=int(count),
+                    ))
+        if len(batch) >= 1000:
+            StudentBloomCount.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        StudentBloomCount.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_student_learning_style_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentBloomCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic_id', models.CharField(max_length=255)),
+                ('level', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bloom_counts', to='app.module')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bloom_counts', to='app.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['module', 'topic_id', 'level', 'count'], name='app_student_module__50be1b_idx')],
+                'unique_together': {('student', 'module', 'topic_id', 'level')},
+            },
+        ),
+        migrations.RunPython(backfill_bloom_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+def backfill_num_questions(apps, schema_editor):
+    # Same rules as StudentQuizHistory.get_questions / get_effective_quiz_type at this migration
+    StudentQuizHistory = apps.get_model('app', 'StudentQuizHistory')
+
+    batch = []
+    for quiz in StudentQuizHistory.objects.only('id', 'quiz_data', 'quiz_type').iterator():
+        data = quiz.quiz_data
+        questions = data.get('questions', []) if isinstance(data, dict) else data
+        quiz.num_questions = len(questions) if isinstance(questions, list) else 0
+        if isinstance(data, dict) and isinstance(data.get('quiz_type'), str) and data['quiz_type']:
+            quiz.quiz_type = data['quiz_type']
+        batch.append(quiz)
+        if len(batch) >= 1000:
+            StudentQuizHistory.objects.bulk_update(batch, ['num_questions', 'quiz_type'])
+            batch = []
+    if batch:
+        StudentQuizHistory.objects.bulk_update(batch, ['num_questions', 'quiz_type'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_student_bloom_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentquizhistory',
+            name='num_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='studentquizhistory',
+            index=models.Index(fields=['student', '-created_at', '-id'], name='app_student_student_f16fbf_idx'),
+        ),
+        migrations.RunPython(backfill_num_questions, migrations.RunPython.noop),
+    ]
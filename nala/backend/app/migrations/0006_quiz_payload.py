@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:43
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of QuizPayload.hash_questions at this migration
+def hash_questions(questions):
+    canonical = json.dumps(questions, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def move_quiz_data_to_payloads(apps, schema_editor):
+    """
+    Store each distinct question list once and point history rows at it.
+    Custom quizzes keep their bloom_levels; topic_ids kept in quiz_data
+    (which took precedence over topics_covered) are copied to topics_covered.
+    """
+    QuizPayload = apps.get_model('app', 'QuizPayload')
+    StudentQuizHistory = apps.get_model('app', 'StudentQuizHistory')
+    Topic = apps.get_model('app', 'Topic')
+    TopicLink = StudentQuizHistory.topics_covered.through
+
+    topic_ids = set(Topic.objects.values_list('id', flat=True))
+    payload_ids = dict(QuizPayload.objects.values_list('content_hash', 'id'))
+    batch = []
+
+    def flush():
+        StudentQuizHistory.objects.bulk_update(batch, ['payload', 'bloom_levels'])
+        batch.clear()
+
+    for quiz in StudentQuizHistory.objects.only('id', 'quiz_data', 'bloom_levels').iterator():
+        data = quiz.quiz_data
+        questions = data.get('questions', []) if isinstance(data, dict) else data
+        if not isinstance(questions, list):
+            questions = []
+
+        content_hash = hash_questions(questions)
+        if content_hash not in payload_ids:
+            payload_ids[content_hash] = QuizPayload.objects.create(content_hash=content_hash, questions=questions).id
+        quiz.payload_id = payload_ids[content_hash]
+
+        if isinstance(data, dict):
+            if isinstance(data.get('bloom_levels'), (list, tuple)):
+                quiz.bloom_levels = ",".join(str(level) for level in data['bloom_levels'])
+            if isinstance(data.get('topic_ids'), (list, tuple)):
+                TopicLink.objects.filter(studentquizhistory_id=quiz.id).delete()
+                TopicLink.objects.bulk_create([
+                    TopicLink(studentquizhistory_id=quiz.id, topic_id=topic_id)
+                    for topic_id in {str(tid) for tid in data['topic_ids']} if topic_id in topic_ids
+                ])
+
+        batch.append(quiz)
+        if len(batch) >= 1000:
+            flush()
+    if batch:
+        flush()
+
+
+def restore_quiz_data(apps, schema_editor):
+    StudentQuizHistory = apps.get_model('app', 'StudentQuizHistory')
+
+    batch = []
+    for quiz in StudentQuizHistory.objects.select_related('payload').prefetch_related('topics_covered').iterator(chunk_size=1000):
+        quiz.quiz_data = {
+            'questions': quiz.payload.questions if quiz.payload else [],
+            'quiz_type': quiz.quiz_type,
+            'topic_ids': [topic.id for topic in quiz.topics_covered.all()],
+        }
+        if quiz.bloom_levels:
+            quiz.quiz_data['bloom_levels'] = quiz.bloom_levels.split(',')
+        batch.append(quiz)
+        if len(batch) >= 1000:
+            StudentQuizHistory.objects.bulk_update(batch, ['quiz_data'])
+            batch = []
+    if batch:
+        StudentQuizHistory.objects.bulk_update(batch, ['quiz_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_quiz_history_num_questions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('questions', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='studentquizhistory',
+            name='bloom_levels',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='studentquizhistory',
+            name='payload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='quiz_histories', to='app.quizpayload'),
+        ),
+        migrations.RunPython(move_quiz_data_to_payloads, restore_quiz_data),
+        migrations.RemoveField(
+            model_name='studentquizhistory',
+            name='quiz_data',
+        ),
+    ]
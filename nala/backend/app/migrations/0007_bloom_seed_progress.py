@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_quiz_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BloomSeedProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_file_sha256', models.CharField(max_length=64)),
+                ('classification', models.JSONField(default=dict)),
+                ('last_student_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bloom_seed_runs', to='app.module')),
+            ],
+            options={
+                'unique_together': {('module', 'chat_file_sha256')},
+            },
+        ),
+    ]
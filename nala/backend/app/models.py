@@ -1,4 +1,11 @@
-from django.db import models
+import hashlib
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 
 # === Modules ===
 class Module(models.Model):
@@ -60,44 +67,108 @@ class Student(models.Model):
         ('DUAL_CODING', 'Dual Coding'),
     ]
 
+    # Breakdown label -> learningStyle key
+    LEARNING_STYLE_KEYS = {
+        'Retrieval Practice': 'RETRIEVAL',
+        'Spaced Practice': 'SPACED',
+        'Elaboration': 'ELABORATION',
+        'Concrete Examples': 'CONCRETE',
+        'Interleaving': 'INTERLEAVING',
+        'Dual Coding': 'DUAL_CODING',
+    }
+
+    LEARNING_STYLE_DESCRIPTIONS = {
+        "RETRIEVAL": "Testing yourself to strengthen memory and recall",
+        "ELABORATION": "Explaining discrete ideas with many details",
+        "CONCRETE": "Use specific examples to understand abstract ideas",
+        "INTERLEAVING": "Mixing different topics or skills during study sessions",
+        "DUAL_CODING": "Using both visual and verbal information processing",
+    }
+
     id = models.CharField(primary_key=True, max_length=255)
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
     enrolled_modules = models.ManyToManyField(Module, related_name='students', blank=True)
     learningStyleBreakdown = models.JSONField(default=dict, blank=True)
+    # Primary style and its description are derived on write (set_learning_style / save)
+    # so reads are plain field access; indexed for cohort queries.
     learningStyle = models.CharField(
         max_length=20,
         choices=LEARNING_STYLE_CHOICES,
         default='RETRIEVAL',
         blank=True,
-        null=True
+        null=True,
+        db_index=True
     )
+    learningStyleDescription = models.CharField(max_length=255, blank=True, default='')
+
+    @classmethod
+    def clean_learning_style_breakdown(cls, breakdown):
+        """
+        Validate a learning style breakdown ({label: percentage, ...,
+        "total_user_messages": n}) and return it with float percentages.
+        Raises ValidationError for non-numeric, negative or > 100 shares.
+        """
+        if not isinstance(breakdown, dict):
+            raise ValidationError("learning_style_breakdown must be a dictionary")
+
+        cleaned = {}
+        for key, value in breakdown.items():
+            key = str(key)
+            if isinstance(value, bool):
+                raise ValidationError(f"learning_style_breakdown[{key!r}] must be a number")
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValidationError(f"learning_style_breakdown[{key!r}] must be a number")
+            if not math.isfinite(number) or number < 0:
+                raise ValidationError(f"learning_style_breakdown[{key!r}] must be a non-negative number")
+            if key == 'total_user_messages':
+                cleaned[key] = int(number)
+            elif number > 100:
+                raise ValidationError(f"learning_style_breakdown[{key!r}] is a percentage, got {number}")
+            else:
+                cleaned[key] = number
+        return cleaned
+
+    @classmethod
+    def primary_learning_style(cls, breakdown):
+        """learningStyle key of the largest non-zero share in a learningStyleBreakdown, or None."""
+        if not breakdown:
+            return None
+        primary = max(
+            (k for k in breakdown if k in cls.LEARNING_STYLE_KEYS),
+            key=lambda k: breakdown[k],
+            default=None
+        )
+        if primary is None or not breakdown[primary] > 0:
+            return None
+        return cls.LEARNING_STYLE_KEYS[primary]
+
+    def set_learning_style(self, breakdown=None, style=None):
+        """
+        Validate and store a breakdown and/or primary style. Without an
+        explicit `style` the primary one is taken from the breakdown.
+        """
+        if breakdown is not None:
+            self.learningStyleBreakdown = self.clean_learning_style_breakdown(breakdown)
+        if style is not None and style not in dict(self.LEARNING_STYLE_CHOICES):
+            raise ValidationError(f"Unknown learning style {style!r}")
+        style = style or self.primary_learning_style(self.learningStyleBreakdown)
+        if style:
+            self.learningStyle = style
+        self.learningStyleDescription = self.LEARNING_STYLE_DESCRIPTIONS.get(self.learningStyle, "")
+
+    def save(self, *args, **kwargs):
+        # Keep the stored description in step with learningStyle however it was assigned.
+        self.learningStyleDescription = self.LEARNING_STYLE_DESCRIPTIONS.get(self.learningStyle, "")
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'learningStyle' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'learningStyleDescription'}
+        super().save(*args, **kwargs)
 
     def get_learning_style_description(self):
-        key_map = {
-            'Retrieval Practice': 'RETRIEVAL',
-            'Elaboration': 'ELABORATION',
-            'Concrete Examples': 'CONCRETE',
-            'Interleaving': 'INTERLEAVING',
-            'Dual Coding': 'DUAL_CODING'
-        }
-        if self.learningStyleBreakdown:
-            primary = max(
-                (k for k in self.learningStyleBreakdown if k in key_map),
-                key=lambda k: self.learningStyleBreakdown[k],
-                default=None
-            )
-            if primary:
-                self.learningStyle = key_map[primary]
-
-        descriptions = {
-            "RETRIEVAL": "Testing yourself to strengthen memory and recall",
-            "ELABORATION": "Explaining discrete ideas with many details",
-            "CONCRETE": "Use specific examples to understand abstract ideas",
-            "INTERLEAVING": "Mixing different topics or skills during study sessions",
-            "DUAL_CODING": "Using both visual and verbal information processing",
-        }
-        return descriptions.get(self.learningStyle, "")
+        return self.learningStyleDescription
 
     def __str__(self):
         return f'Student: [{self.id}] {self.name}'
@@ -149,55 +220,115 @@ class StudentNote(models.Model):
 
 
 # === Quiz History ===
+class QuizPayload(models.Model):
+    """
+    A quiz's question list, stored once per distinct content and addressed by
+    its SHA-256. A weekly quiz handed to every student of a module is one row.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    questions = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def hash_questions(questions):
+        canonical = json.dumps(questions, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def for_questions(cls, questions):
+        """The payload holding `questions`, created if this content was never stored."""
+        payload, _ = cls.objects.get_or_create(
+            content_hash=cls.hash_questions(questions),
+            defaults={'questions': questions},
+        )
+        return payload
+
+    def __str__(self):
+        return f"QuizPayload: {self.content_hash[:12]} ({len(self.questions)} questions)"
+
+
 class StudentQuizHistory(models.Model):
     id = models.AutoField(primary_key=True)
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='quiz_histories')
     module = models.ForeignKey(Module, on_delete=models.SET_NULL, null=True, blank=True)
-    quiz_data = models.JSONField(default=dict)
+    payload = models.ForeignKey(QuizPayload, on_delete=models.PROTECT, null=True, blank=True, related_name='quiz_histories')
     student_answers = models.JSONField(default=dict, blank=True)
     score = models.FloatField(null=True, blank=True)
     completed = models.BooleanField(default=False)
     quiz_type = models.CharField(max_length=20, choices=[("weekly", "Weekly"), ("custom", "Custom")], default="weekly")
+    # Comma separated levels a custom quiz was generated for
+    bloom_levels = models.CharField(max_length=255, blank=True, default="")
     topics_covered = models.ManyToManyField(Topic, related_name="quizzes", blank=True)
+    # len(get_questions()), kept in step with the payload so listings never load it
+    num_questions = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def __str__(self):
-        return f"QuizHistory: {self.student.name} - Module: {self.module.name if self.module else 'N/A'} ({self.quiz_type})"
-
-    def get_questions(self):
-        """Return the list of quiz questions regardless of stored format."""
-        data = self.quiz_data
+    class Meta:
+        indexes = [
+            # Quiz history pages: a student's quizzes newest first. `completed` is filtered
+            # while walking the index; a student only has a few unfinished quizzes.
+            models.Index(fields=["student", "-created_at", "-id"]),
+        ]
 
+    @property
+    def quiz_data(self):
+        """The quiz as one dict, in the shape it used to be stored in."""
+        data = {
+            'questions': self.get_questions(),
+            'quiz_type': self.get_effective_quiz_type(),
+            'num_questions': self.num_questions,
+            'topic_ids': self.get_topic_ids() if self.pk else [],
+        }
+        if self.bloom_levels:
+            data['bloom_levels'] = self.bloom_levels.split(',')
+        return data
+
+    @quiz_data.setter
+    def quiz_data(self, data):
+        """
+        Accepts a question list or a dict with 'questions' (and optionally
+        'quiz_type' and 'bloom_levels'). The payload row is looked up or
+        created on save(); topics belong in topics_covered.
+        """
+        questions = data
         if isinstance(data, dict):
             questions = data.get('questions', [])
-            return questions if isinstance(questions, list) else []
-
-        if isinstance(data, list):
-            return data
+            quiz_type = data.get('quiz_type')
+            if isinstance(quiz_type, str) and quiz_type:
+                self.quiz_type = quiz_type
+            bloom_levels = data.get('bloom_levels')
+            if isinstance(bloom_levels, (list, tuple)):
+                self.bloom_levels = ",".join(str(level) for level in bloom_levels)
+        self._pending_questions = questions if isinstance(questions, list) else []
+        self.num_questions = len(self._pending_questions)
 
-        return []
+    def save(self, *args, **kwargs):
+        questions = self.__dict__.pop('_pending_questions', None)
+        if questions is not None:
+            self.payload = QuizPayload.for_questions(questions)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'payload', 'num_questions', 'quiz_type', 'bloom_levels'}
+        super().save(*args, **kwargs)
 
-    def get_topic_ids(self):
-        """Return topic IDs from the JSON payload or the M2M relation."""
-        data = self.quiz_data
+    def __str__(self):
+        return f"QuizHistory: {self.student.name} - Module: {self.module.name if self.module else 'N/A'} ({self.quiz_type})"
 
-        if isinstance(data, dict):
-            topic_ids = data.get('topic_ids')
-            if isinstance(topic_ids, (list, tuple)):
-                return [str(tid) for tid in topic_ids if str(tid)]
+    def get_questions(self):
+        """Return the list of quiz questions."""
+        if '_pending_questions' in self.__dict__:
+            return self._pending_questions
+        if self.payload_id is None:
+            return []
+        return self.payload.questions
 
+    def get_topic_ids(self):
+        """Return topic IDs from the M2M relation."""
         return [str(topic_id) for topic_id in self.topics_covered.values_list('id', flat=True)]
 
     def get_effective_quiz_type(self):
-        """Determine the quiz type using the JSON payload or the model field."""
-        data = self.quiz_data
-
-        if isinstance(data, dict):
-            quiz_type = data.get('quiz_type')
-            if isinstance(quiz_type, str) and quiz_type:
-                return quiz_type
-
+        """Determine the quiz type from the model field."""
         return self.quiz_type or 'weekly'
 
 
@@ -215,6 +346,54 @@ class StudentBloomRecord(models.Model):
         return f"BloomRecord: {self.student.name} - {self.module.name}"
 
 
+class StudentBloomCount(models.Model):
+    """
+    StudentBloomRecord.bloom_summary flattened to one row per non-zero
+    (student, module, topic, level) count, so cohort analytics can be
+    aggregated in SQL. Kept in sync by app.services.bloom_analytics.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="bloom_counts")
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="bloom_counts")
+    # Keys of bloom_summary; not a foreign key since summaries may name topics that no longer exist
+    topic_id = models.CharField(max_length=255)
+    level = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("student", "module", "topic_id", "level")
+        indexes = [
+            models.Index(fields=["module", "topic_id", "level", "count"]),
+        ]
+
+    def __str__(self):
+        return f"BloomCount: {self.student_id} - {self.module_id} - {self.topic_id} {self.level}={self.count}"
+
+
+class BloomSeedProgress(models.Model):
+    """
+    Progress of seeding every student's Bloom record of a module from one chat
+    history file (update_bloom_records.py). The cursor is saved in the same
+    transaction as each chunk of records, so a resumed run never applies a
+    chunk twice; the classification is kept so the whole run merges the same
+    counts.
+    """
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name="bloom_seed_runs")
+    chat_file_sha256 = models.CharField(max_length=64)
+    classification = models.JSONField(default=dict)
+    # Students are processed in primary key order; None until the first chunk commits
+    last_student_id = models.CharField(max_length=255, null=True, blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("module", "chat_file_sha256")
+
+    def __str__(self):
+        return f"BloomSeedProgress: {self.module_id} {self.chat_file_sha256[:12]} after {self.last_student_id}"
+
+
 # === Conversations and Messages ===
 class Conversation(models.Model):
     convo_id = models.AutoField(primary_key=True)
@@ -248,3 +427,25 @@ class Message(models.Model):
             models.Index(fields=['student', 'module']),
             models.Index(fields=['conversation', 'msg_timestamp']),
         ]
+
+
+@receiver(m2m_changed, sender=Student.enrolled_modules.through)
+def enrollment_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Module Bloom analytics are computed over the enrolled students; drop them when enrollment changes."""
+    from app.services.bloom_analytics import invalidate_many_module_analytics
+
+    if action == 'pre_clear' and not reverse:
+        # pk_set is not given for clear(); remember which modules the student leaves
+        instance._cleared_module_ids = list(instance.enrolled_modules.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        module_ids = [instance.pk]  # instance is a Module
+    elif action == 'post_clear':
+        module_ids = instance.__dict__.pop('_cleared_module_ids', [])
+    else:
+        module_ids = list(pk_set or [])
+    if module_ids:
+        transaction.on_commit(lambda: invalidate_many_module_analytics(module_ids))
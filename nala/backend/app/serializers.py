@@ -139,7 +139,7 @@ class ThreadMapRelationshipSerializer(serializers.ModelSerializer):
 
 class StudentSerializer(serializers.ModelSerializer):
     enrolled_modules_info = serializers.SerializerMethodField()
-    learning_style_description = serializers.SerializerMethodField()
+    learning_style_description = serializers.CharField(source='learningStyleDescription', read_only=True)
     learning_style_display = serializers.CharField(source='get_learningStyle_display', read_only=True)
     learningStyleBreakdown = serializers.JSONField(read_only=True) 
     
@@ -158,9 +158,6 @@ class StudentSerializer(serializers.ModelSerializer):
             }
             for module in obj.enrolled_modules.all()
         ]
-    
-    def get_learning_style_description(self, obj):
-        return obj.get_learning_style_description()
 
 class TopicWithConceptsSerializer(serializers.ModelSerializer):
     concepts = serializers.SerializerMethodField()
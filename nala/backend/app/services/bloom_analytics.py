@@ -0,0 +1,174 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from app.models import Student, StudentBloomCount, StudentBloomRecord, Topic
+
+BLOOM_LEVELS = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
+PERCENTILES = (25, 50, 75, 90)
+
+VERSION_KEY = "bloom_analytics:version:{module_id}"
+CACHE_KEY = "bloom_analytics:{module_id}:v{version}:weeks={weeks}"
+
+
+# -------------------- Normalised counts --------------------
+
+def bloom_count_rows(record: StudentBloomRecord) -> List[StudentBloomCount]:
+    return [
+        StudentBloomCount(
+            student_id=record.student_id,
+            module_id=record.module_id,
+            topic_id=str(topic_id),
+            level=level,
+            count=int(count),
+        )
+        for topic_id, counts in (record.bloom_summary or {}).items()
+        for level, count in (counts or {}).items()
+        if level in BLOOM_LEVELS and isinstance(count, (int, float)) and count > 0
+    ]
+
+
+def sync_bloom_counts(records: Iterable[StudentBloomRecord]):
+    """
+    Rewrite the StudentBloomCount rows of `records` from their bloom_summary
+    (one DELETE and one bulk INSERT per module) and invalidate the cached
+    analytics of the affected modules once the transaction commits.
+    """
+    by_module = defaultdict(list)
+    for record in records:
+        by_module[record.module_id].append(record)
+    if not by_module:
+        return
+
+    with transaction.atomic():
+        for module_id, module_records in by_module.items():
+            StudentBloomCount.objects.filter(
+                module_id=module_id,
+                student_id__in=[record.student_id for record in module_records],
+            ).delete()
+            StudentBloomCount.objects.bulk_create(
+                [row for record in module_records for row in bloom_count_rows(record)],
+                batch_size=1000,
+            )
+        module_ids = list(by_module)
+        transaction.on_commit(lambda: invalidate_many_module_analytics(module_ids))
+
+
+def rebuild_bloom_counts(module_id: Optional[str] = None):
+    """Recreate all counts (or one module's) from the Bloom records, e.g. after a backfill."""
+    records = StudentBloomRecord.objects.only('student_id', 'module_id', 'bloom_summary')
+    if module_id is not None:
+        records = records.filter(module_id=module_id)
+    sync_bloom_counts(list(records))
+
+
+# -------------------- Cache --------------------
+
+def _version(module_id) -> int:
+    return cache.get_or_set(VERSION_KEY.format(module_id=module_id), 1, None)
+
+
+def invalidate_module_analytics(module_id):
+    """Bump the module's cache version; entries of older versions are never read again."""
+    key = VERSION_KEY.format(module_id=module_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def invalidate_many_module_analytics(module_ids):
+    for module_id in module_ids:
+        invalidate_module_analytics(module_id)
+
+
+# -------------------- Analytics --------------------
+
+def _percentile(sorted_values: List[int], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * (pct / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return round(sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low), 2)
+
+
+def compute_module_analytics(module_id, weeks: Optional[List[str]] = None) -> Dict:
+    """
+    Per-topic, per-level Bloom counts across every student enrolled in the
+    module. Sums, maxima and the number of students who reached a level are
+    aggregated in SQL; percentiles and means come from the ordered counts of
+    each (topic, level), with enrolled students who never reached it
+    (including those without a Bloom record yet) counted as 0.
+    """
+    topics = Topic.objects.filter(module_id=module_id)
+    if weeks:
+        topics = topics.filter(week_no__in=weeks)
+    topics = list(topics.order_by('id').values('id', 'name', 'week_no'))
+    topic_ids = [topic['id'] for topic in topics]
+
+    enrollments = Student.enrolled_modules.through.objects.filter(module_id=module_id)
+    cohort_size = enrollments.count()
+    # Counts of students no longer enrolled would not be part of the cohort
+    counts = StudentBloomCount.objects.filter(
+        module_id=module_id,
+        topic_id__in=topic_ids,
+        student_id__in=enrollments.values('student_id'),
+    )
+
+    aggregates = {
+        (row['topic_id'], row['level']): row
+        for row in counts.values('topic_id', 'level')
+        .annotate(students=Count('student_id'), total=Sum('count'), max=Max('count'))
+        .order_by()
+    }
+    values = defaultdict(list)
+    for topic_id, level, count in counts.order_by('topic_id', 'level', 'count').values_list('topic_id', 'level', 'count'):
+        values[(topic_id, level)].append(count)
+
+    results = []
+    for topic in topics:
+        levels = {}
+        for level in BLOOM_LEVELS:
+            row = aggregates.get((topic['id'], level)) or {'students': 0, 'total': 0, 'max': 0}
+            reached = values.get((topic['id'], level), [])
+            distribution = [0] * max(cohort_size - len(reached), 0) + reached
+            levels[level] = {
+                'students_reached': row['students'],
+                'total': row['total'] or 0,
+                'mean': round((row['total'] or 0) / cohort_size, 2) if cohort_size else 0.0,
+                'max': row['max'] or 0,
+                **{f'p{pct}': _percentile(distribution, pct) for pct in PERCENTILES},
+            }
+        results.append({
+            'topic_id': topic['id'],
+            'topic_name': topic['name'],
+            'week_no': topic['week_no'],
+            'levels': levels,
+        })
+
+    return {
+        'module_id': str(module_id),
+        'weeks': weeks or None,
+        'students': cohort_size,
+        'topics': results,
+    }
+
+
+def get_module_analytics(module_id, weeks: Optional[List[str]] = None) -> Dict:
+    """
+    Cached compute_module_analytics; invalidated whenever a Bloom record of
+    the module changes or students enroll in or leave it.
+    """
+    weeks = sorted({str(week) for week in weeks}) if weeks else []
+    key = CACHE_KEY.format(module_id=module_id, version=_version(module_id), weeks=",".join(weeks))
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_module_analytics(module_id, weeks)
+        cache.set(key, analytics, getattr(settings, 'BLOOM_ANALYTICS_CACHE_TTL', 600))
+    return analytics
@@ -1,9 +1,15 @@
 import csv
 import json
+import logging
 from typing import Dict, List, Optional
 from django.db import transaction
 from app.models import Module, Student, Topic, StudentBloomRecord, Message, StudentQuizHistory
+from app.services.bloom_analytics import sync_bloom_counts
 from app.services.classifier import classify
+from app.services.prediction_features import invalidate_many_student_features, invalidate_student_features
+from app.services.structured_logging import LazyJSON, counters, get_logger
+
+logger = get_logger(__name__)
 
 
 # -------------------- Helpers --------------------
@@ -53,15 +59,21 @@ def classify_messages_by_topic_and_taxonomy(
     result = {t['id']: {lvl: 0 for lvl in ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]} 
               for t in topics}
     if not topics:
-        print("WARNING: No topics provided for classification")
+        logger.warning("classification.no_topics")
         return result
 
     topic_list_str = ", ".join([f"topic_id_{t['id']}: {t['name']}" for t in topics])
-    
-    print(f"\n=== Starting Classification ===")
-    print(f"Total messages to process: {len(messages)}")
-    print(f"Topics available: {[t['name'] for t in topics]}")
-    print(f"Topic IDs: {[t['id'] for t in topics]}\n")
+    system_prompt = (
+        f"You are a strict classifier. "
+        f"Classify the student's message into ONE topic from this list: [{topic_list_str}] "
+        f"and ONE Bloom's Taxonomy level from [Remember, Understand, Apply, Analyze, Evaluate, Create]. "
+        f"Return ONLY a JSON object with 'topic_id' (as a number) and 'bloom_level' (exact spelling). "
+        f"Example: {{\"topic_id\": 1, \"bloom_level\": \"Apply\"}}"
+    )
+
+    # Resolve the level check once; per-message logging is DEBUG only.
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.info("classification.start", messages=len(messages), topics=len(topics))
 
     processed_count = 0
     skipped_count = 0
@@ -79,26 +91,18 @@ def classify_messages_by_topic_and_taxonomy(
         text = extract_text_from_msg(raw_text)
         
         if not text or len(text.strip()) == 0:
-            print(f"Message {idx}: No text content (raw: {raw_text[:100]}...)")
+            if debug:
+                logger.debug("classification.empty_message", index=idx)
             skipped_count += 1
             continue
 
-        print(f"\nMessage {idx + 1}:")
-        print(f"  Text: {text[:100]}...")
-
         try:
-            classification = classify(
-                text,
-                system=f"You are a strict classifier. "
-                       f"Classify the student's message into ONE topic from this list: [{topic_list_str}] "
-                       f"and ONE Bloom's Taxonomy level from [Remember, Understand, Apply, Analyze, Evaluate, Create]. "
-                       f"Return ONLY a JSON object with 'topic_id' (as a number) and 'bloom_level' (exact spelling). "
-                       f"Example: {{\"topic_id\": 1, \"bloom_level\": \"Apply\"}}"
-            )
+            classification = classify(text, system=system_prompt)
 
             classification_text = classification.get("text", "")
             if not classification_text:
-                print(f"  No classification returned")
+                if debug:
+                    logger.debug("classification.no_response", index=idx)
                 error_count += 1
                 continue
                 
@@ -106,7 +110,8 @@ def classify_messages_by_topic_and_taxonomy(
             start = classification_text.find('{')
             end = classification_text.rfind('}') + 1
             if start == -1 or end == 0:
-                print(f"  No JSON found in: {classification_text[:150]}")
+                if debug:
+                    logger.debug("classification.no_json", index=idx, response=classification_text[:150])
                 error_count += 1
                 continue
                 
@@ -118,46 +123,59 @@ def classify_messages_by_topic_and_taxonomy(
             
             # Validate the classification
             if not tid or not level:
-                print(f"  Missing topic_id or bloom_level in: {parsed}")
+                if debug:
+                    logger.debug("classification.incomplete", index=idx, parsed=parsed)
                 error_count += 1
                 continue
                 
             if tid not in result:
-                print(f"  Invalid topic_id: {tid} (valid: {list(result.keys())})")
+                if debug:
+                    logger.debug("classification.invalid_topic", index=idx, topic_id=tid)
                 error_count += 1
                 continue
                 
             if level not in result[tid]:
-                print(f"  Invalid bloom_level: {level}")
+                if debug:
+                    logger.debug("classification.invalid_level", index=idx, bloom_level=level)
                 error_count += 1
                 continue
             
             # Success!
             result[tid][level] += 1
             processed_count += 1
-            print(f"  Topic {tid}, Level: {level}")
+            if debug:
+                logger.debug("classification.message", index=idx, topic_id=tid, bloom_level=level)
                 
         except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
-            print(f"  Error: {type(e).__name__}: {e}")
+            if debug:
+                logger.debug("classification.error", index=idx, error=f"{type(e).__name__}: {e}")
             error_count += 1
             continue
 
-    print(f"\n{'='*60}")
-    print(f"Classification Summary:")
-    print(f"  Processed successfully: {processed_count}")
-    print(f"  Skipped (non-user): {skipped_count}")
-    print(f"  Errors: {error_count}")
-    print(f"{'='*60}")
-    
-    # Print results per topic
-    for topic_id, counts in result.items():
-        topic_name = next((t['name'] for t in topics if t['id'] == topic_id), f"Topic {topic_id}")
-        total = sum(counts.values())
-        if total > 0:
-            print(f"\n{topic_name} (ID: {topic_id}): {total} messages")
-            for level, count in counts.items():
-                if count > 0:
-                    print(f"  {level}: {count}")
+    counters.update({
+        "classification.processed": processed_count,
+        "classification.skipped": skipped_count,
+        "classification.errors": error_count,
+    })
+    logger.info(
+        "classification.done",
+        processed=processed_count,
+        skipped=skipped_count,
+        errors=error_count,
+    )
+
+    if debug:
+        topic_names = {t['id']: t['name'] for t in topics}
+        for topic_id, counts in result.items():
+            total = sum(counts.values())
+            if total > 0:
+                logger.debug(
+                    "classification.topic_summary",
+                    topic_id=topic_id,
+                    topic=topic_names.get(topic_id, f"Topic {topic_id}"),
+                    total=total,
+                    **{lvl: count for lvl, count in counts.items() if count > 0}
+                )
     
     return result
 
@@ -171,7 +189,69 @@ def update_bloom_record(record: StudentBloomRecord, classification: Dict[str, Di
             record.bloom_summary[topic_id] = {lvl: 0 for lvl in ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]}
         for lvl, count in counts.items():
             if count > 0:
-                record.bloom_summary[topic_id][lvl] += count
+                # Records written by other paths may only hold the non-zero levels.
+                topic_counts = record.bloom_summary[topic_id]
+                topic_counts[lvl] = topic_counts.get(lvl, 0) + count
+
+
+def load_chathistory_messages(chat_filepath: str) -> List[Dict]:
+    messages = load_json(chat_filepath)
+    if isinstance(messages, dict):
+        if 'messages' in messages:
+            messages = messages['messages']
+        else:
+            messages = [messages]
+    return messages
+
+
+def classify_chathistory_file(module_id: str, chat_filepath: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """Classify a chat history file against a module's topics; None if the module has no topics."""
+    messages = load_chathistory_messages(chat_filepath)
+    topics = load_topics_from_db(module_id)
+    logger.info("chathistory.loaded", messages=len(messages), topics=len(topics))
+    
+    if not topics:
+        logger.error("chathistory.no_topics", module_id=module_id)
+        return None
+    
+    return classify_messages_by_topic_and_taxonomy(messages, topics)
+
+
+def apply_classification_to_students(
+    module: Module,
+    student_ids: List[str],
+    classification: Dict[str, Dict[str, int]],
+) -> Dict[str, int]:
+    """
+    Merge one classification into the Bloom records of many students with one
+    SELECT, one bulk_update and one bulk_create. Callers chunk `student_ids`
+    and wrap each chunk in a transaction.
+    """
+    records = {
+        record.student_id: record
+        for record in StudentBloomRecord.objects.select_for_update()
+        .filter(module=module, student_id__in=student_ids)
+        .only('id', 'student_id', 'module_id', 'bloom_summary')
+    }
+    new_records = []
+    for student_id in student_ids:
+        record = records.get(student_id)
+        if record is None:
+            record = StudentBloomRecord(student_id=student_id, module=module, bloom_summary={})
+            new_records.append(record)
+        update_bloom_record(record, classification)
+
+    if records:
+        StudentBloomRecord.objects.bulk_update(list(records.values()), ['bloom_summary'])
+    if new_records:
+        StudentBloomRecord.objects.bulk_create(new_records)
+    sync_bloom_counts(list(records.values()) + new_records)
+
+    ids = list(student_ids)
+    transaction.on_commit(lambda: invalidate_many_student_features(ids))
+    counters.incr("bloom.bulk_records_updated", len(records))
+    counters.incr("bloom.bulk_records_created", len(new_records))
+    return {'updated': len(records), 'created': len(new_records)}
 
 
 # -------------------- Main Update Functions --------------------
@@ -183,59 +263,39 @@ def update_bloom_from_chathistory(
     chat_filepath: str
 ):
     """Bulk update from existing chat history JSON file."""
-    print(f"\n{'='*60}")
-    print(f"Processing Chat History")
-    print(f"{'='*60}")
-    print(f"Student: {student.name} (ID: {student.id})")
-    print(f"Module ID: {module_id}")
-    print(f"File: {chat_filepath}")
-    print(f"{'='*60}\n")
+    logger.info(
+        "chathistory.start",
+        student_id=student.id,
+        module_id=module_id,
+        file=chat_filepath,
+    )
     
     # Get module and record
     module = Module.objects.get(id=module_id)
     record, created = StudentBloomRecord.objects.get_or_create(student=student, module=module)
     
     if created:
-        print("✓ Created new StudentBloomRecord")
-    else:
-        print("✓ Found existing StudentBloomRecord")
-        if record.bloom_summary:
-            print(f"  Existing data: {sum(sum(v.values()) for v in record.bloom_summary.values())} total counts")
-    
-    # Load messages
-    messages = load_json(chat_filepath)
-    if isinstance(messages, dict):
-        if 'messages' in messages:
-            messages = messages['messages']
-        else:
-            messages = [messages]
-    
-    print(f"\n✓ Loaded {len(messages)} messages from file")
-    
-    # Load topics
-    topics = load_topics_from_db(module_id)
-    print(f"✓ Loaded {len(topics)} topics from database:")
-    for t in topics:
-        print(f"  - Topic {t['id']}: {t['name']}")
+        logger.debug("chathistory.record_created", student_id=student.id, module_id=module_id)
+    elif record.bloom_summary and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "chathistory.record_found",
+            student_id=student.id,
+            module_id=module_id,
+            existing_counts=sum(sum(v.values()) for v in record.bloom_summary.values()),
+        )
     
-    if not topics:
-        print("\n ERROR: No topics found in database for this module!")
+    classification = classify_chathistory_file(module_id, chat_filepath)
+    if classification is None:
         return
     
-    # Classify messages
-    classification = classify_messages_by_topic_and_taxonomy(messages, topics)
-    
     # Update record
-    print(f"\n{'='*60}")
-    print("Updating Bloom Record...")
-    print(f"{'='*60}")
-    
     update_bloom_record(record, classification)
     record.save()
+    sync_bloom_counts([record])
+    transaction.on_commit(lambda: invalidate_student_features(student.id))
     
-    print("✓ Saved bloom record to database")
-    print(f"\nFinal bloom_summary:")
-    print(json.dumps(record.bloom_summary, indent=2))
+    logger.info("chathistory.saved", student_id=student.id, module_id=module_id)
+    logger.debug("chathistory.bloom_summary", bloom_summary=LazyJSON(record.bloom_summary))
 
 
 @transaction.atomic
@@ -263,6 +323,8 @@ def update_bloom_from_messages(
     classification = classify_messages_by_topic_and_taxonomy(message_list, topics)
     update_bloom_record(record, classification)
     record.save()
+    sync_bloom_counts([record])
+    transaction.on_commit(lambda: invalidate_student_features(student.id))
 
 
 @transaction.atomic
@@ -334,6 +396,8 @@ def update_bloom_from_quiz(student, quiz_history):
 
     bloom_record.bloom_summary = bloom_summary
     bloom_record.save()
+    sync_bloom_counts([bloom_record])
+    transaction.on_commit(lambda: invalidate_student_features(student_id))
     return bloom_record
 
 
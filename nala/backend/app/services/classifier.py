@@ -3,6 +3,11 @@ import json, requests
 from django.conf import settings
 from typing import Optional
 
+from app.services.metrics import track_llm_call
+from app.services.structured_logging import counters, get_logger
+
+logger = get_logger(__name__)
+
 BASE_URL = settings.BASE_URL
 API_KEY = settings.API_KEY
 
@@ -16,13 +21,16 @@ def classify(text: str, system: Optional[str] = None, timeout_s: float = 30.0):
     if system:
         payload["system"] = system
     try:
-        r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout_s)
+        with track_llm_call():
+            r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout_s)
         if not r.ok:
-            # Try to print server's message for debugging
+            # Log the server's message for debugging
             try:
-                print("Error body:", r.json())
+                error_body = r.json()
             except Exception:
-                print("Error text:", r.text)
+                error_body = r.text
+            counters.incr("llm.classify.errors")
+            logger.warning("llm.classify.http_error", status=r.status_code, body=error_body)
             # Return structured error instead of raising to avoid 500s upstream
             return {
                 "error": f"HTTP {r.status_code}",
@@ -30,12 +38,13 @@ def classify(text: str, system: Optional[str] = None, timeout_s: float = 30.0):
                 "text": None,
             }
         data = r.json()
-        print("Model:", data.get("model"))
-        print("Output:", data.get("text"))
-        print("Usage:", data.get("usage"))
+        counters.incr("llm.classify.calls")
+        logger.debug("llm.classify.response", model=data.get("model"), output=data.get("text"), usage=data.get("usage"))
         return data
     except requests.RequestException as e:
         # Network/timeout or other requests-level error
+        counters.incr("llm.classify.errors")
+        logger.warning("llm.classify.request_error", error=str(e))
         return {
             "error": str(e),
             "status": None,
@@ -133,7 +133,6 @@ def percentage_from_json(filepath):
             parsed_data = json.loads(json_string)
 
             label = parsed_data.get("labels", [None])[0]  # grab first element safely
-            print(label)
             if label == "topic1: Introducing the Matrix":
                 topic1_count += 1
             elif label == "topic2: Linear Transforms and the Matrix":
@@ -236,16 +235,52 @@ def calculate_time_spent_per_topic(filepath):
 
 # 5. learning style based on entire user chat history
 
-def learning_style_from_json(filepath):
+LEARNING_STYLES = ["Retrieval Practice", "Elaboration", "Concrete Examples", "Interleaving", "Dual Coding"]
+
+LEARNING_STYLE_SYSTEM_PROMPT = ("You are a strict classifier. Classify the user's text into one of the following learning styles: [Retrieval Practice, Elaboration, Concrete Examples, Interleaving, Dual Coding], where"
+    "Retrieval Practice: Testing yourself to strengthen memory and recall,"
+    "Elaboration: Explaining discrete ideas with many details,"
+    "Concrete Examples: Using specific examples to understand abstract ideas,"
+    "Interleaving: Mixing different topics or skills during study sessions and the topics here are firstly, Introducing the Matrix then,"
+    "Linear Transforms and the Matrix then,"
+    "Manipulating the Matrix then lastly,"
+    "Inverting the Matrix, so if the user's text is about any of two or more of these topics mentioned at the same time, classify it as Interleaving."
+    "Dual Coding: Using both visual and verbal information processing. Choose EXACTLY ONE best label. Return ONLY a compact JSON string with keys: \"labels\" (array with one element).")
+
+def classify_learning_style(text):
+    """One LLM call; returns the label (possibly outside LEARNING_STYLES) or None if unparseable."""
+    learning_style = classify(text, system=LEARNING_STYLE_SYSTEM_PROMPT).get("text")
+    if not learning_style:
+        return None
+    try:
+        start = learning_style.find("{")
+        end = learning_style.rfind("}") + 1
+        json_string = learning_style[start:end]
+        parsed_data = json.loads(json_string)
+        return parsed_data.get('labels')[0]
+    except (json.JSONDecodeError, IndexError, TypeError, AttributeError):
+        return None
+
+def learning_style_breakdown(styles):
+    """Percentages per learning style over classified messages (labels, None = unparseable)."""
+    counts = {style: 0 for style in LEARNING_STYLES}
     total_count = 0
-    retrieval_practice_count = 0
-    elaboration_count = 0
-    concrete_examples_count = 0
-    interleaving_count = 0
-    dual_coding_count = 0
+    for style in styles:
+        if style is None:
+            continue
+        if style in counts:
+            counts[style] += 1
+        total_count += 1
 
+    if total_count == 0:
+        return None
+
+    breakdown = {style: round((count / total_count) * 100, 2) for style, count in counts.items()}
+    breakdown["total_user_messages"] = total_count
+    return breakdown
+
+def learning_style_from_json(filepath):
     data = load_json(filepath)
-    results = []
 
     if isinstance(data, list):
         messages = data
@@ -254,6 +289,7 @@ def learning_style_from_json(filepath):
     else:
         return []
 
+    styles = []
     for msg in messages:
         if msg.get("msg_sender") != "user":
             continue
@@ -262,53 +298,13 @@ def learning_style_from_json(filepath):
         if not raw_text:
             continue
 
-        learning_style = classify(raw_text, system="You are a strict classifier. Classify the user's text into one of the following learning styles: [Retrieval Practice, Elaboration, Concrete Examples, Interleaving, Dual Coding], where"
-        "Retrieval Practice: Testing yourself to strengthen memory and recall,"
-        "Elaboration: Explaining discrete ideas with many details,"
-        "Concrete Examples: Using specific examples to understand abstract ideas,"
-        "Interleaving: Mixing different topics or skills during study sessions and the topics here are firstly, Introducing the Matrix then,"
-        "Linear Transforms and the Matrix then,"
-        "Manipulating the Matrix then lastly,"
-        "Inverting the Matrix, so if the user's text is about any of two or more of these topics mentioned at the same time, classify it as Interleaving."
-        "Dual Coding: Using both visual and verbal information processing. Choose EXACTLY ONE best label. Return ONLY a compact JSON string with keys: \"labels\" (array with one element).")
-
-        learning_style = learning_style.get("text")
+        styles.append(classify_learning_style(raw_text))
 
-        try:
-            start = learning_style.find("{")
-            end = learning_style.rfind("}") + 1
-            json_string = learning_style[start:end]
-            parsed_data = json.loads(json_string)
-
-            style = parsed_data.get('labels')[0]
-
-            if style == "Retrieval Practice":
-                retrieval_practice_count += 1
-            elif style == "Elaboration":
-                elaboration_count += 1
-            elif style == "Concrete Examples":
-                concrete_examples_count += 1
-            elif style == "Interleaving":
-                interleaving_count += 1
-            elif style == "Dual Coding":
-                dual_coding_count += 1
-        except (json.JSONDecodeError, IndexError, TypeError):
-            continue
-        total_count += 1
-
-    if total_count == 0:  
+    breakdown = learning_style_breakdown(styles)
+    if breakdown is None:
         return [{"error": "No user messages found"}]
 
-    results.append({
-        "Retrieval Practice": round((retrieval_practice_count / total_count) * 100, 2),
-        "Elaboration": round((elaboration_count / total_count) * 100, 2),
-        "Concrete Examples": round((concrete_examples_count / total_count) * 100, 2),
-        "Interleaving": round((interleaving_count / total_count) * 100, 2),
-        "Dual Coding": round((dual_coding_count / total_count) * 100, 2),
-        "total_user_messages": total_count
-    })
-
-    return results
+    return [breakdown]
 
 
 # 6. taxonomy progression
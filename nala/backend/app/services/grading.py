@@ -0,0 +1,259 @@
+import copy
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+
+from app.models import QuizPayload, StudentBloomRecord, StudentQuizHistory
+from app.services.bloom_analytics import BLOOM_LEVELS, sync_bloom_counts
+from app.services.prediction_features import invalidate_many_student_features
+from app.services.structured_logging import counters, get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 5000
+
+
+# -------------------- Engine --------------------
+
+@dataclass
+class AnswerKey:
+    """A quiz's correct answers and, per question, the (topic, Bloom level) it counts towards."""
+    answers: List[object]
+    # Column of each question in GradeResult.by_group, -1 if it counts towards none
+    group_index: np.ndarray
+    groups: List[Tuple[str, str]]
+
+    @classmethod
+    def from_questions(cls, questions: Sequence[Dict]) -> "AnswerKey":
+        # Same rules as submit_quiz and update_bloom_from_quiz
+        answers = [question.get('answer') or question.get('correct_answer') for question in questions]
+        groups, columns = [], {}
+        group_index = np.full(len(questions), -1, dtype=np.int64)
+        for idx, question in enumerate(questions):
+            level = question.get('bloom_level')
+            if level not in BLOOM_LEVELS:
+                continue
+            group = (str(question.get('topic_id')), level)
+            if group not in columns:
+                columns[group] = len(groups)
+                groups.append(group)
+            group_index[idx] = columns[group]
+        return cls(answers=answers, group_index=group_index, groups=groups)
+
+    @property
+    def num_questions(self) -> int:
+        return len(self.answers)
+
+
+@dataclass
+class GradeResult:
+    correct: np.ndarray   # (submissions, questions) bool
+    by_group: np.ndarray  # (submissions, groups) correct answers per (topic, level)
+    groups: List[Tuple[str, str]]
+
+    @property
+    def correct_counts(self) -> np.ndarray:
+        return self.correct.sum(axis=1)
+
+    @property
+    def scores(self) -> np.ndarray:
+        num_questions = self.correct.shape[1]
+        if not num_questions:
+            return np.zeros(self.correct.shape[0])
+        return self.correct_counts / num_questions * 100
+
+
+def grade(key: AnswerKey, submissions: Sequence[Dict[str, object]]) -> GradeResult:
+    """
+    Grade many submissions ({question_index: answer}) of one quiz at once.
+
+    Answers are read out of the submissions by a Python generator into one
+    (submissions x questions) object array and compared with the key in a
+    single broadcast. Numpy still calls == once per cell (the same comparison
+    as submit_quiz), so this is a constant-factor gain over a per-answer loop
+    (~2-3x), not a compiled comparison. Per-topic/per-level totals are one
+    matrix product with a question -> group projection.
+    """
+    num_submissions, num_questions = len(submissions), key.num_questions
+    indexes = [str(idx) for idx in range(num_questions)]
+
+    key_answers = np.fromiter(key.answers, dtype=object, count=num_questions)
+    answers = np.fromiter(
+        (answer for submission in submissions for answer in map((submission or {}).get, indexes)),
+        dtype=object,
+        count=num_submissions * num_questions,
+    ).reshape(num_submissions, num_questions)
+
+    correct = (answers == key_answers).astype(bool)
+
+    projection = np.zeros((num_questions, len(key.groups)), dtype=np.int64)
+    counted = key.group_index >= 0
+    projection[np.nonzero(counted)[0], key.group_index[counted]] = 1
+    by_group = correct.astype(np.int64) @ projection
+
+    return GradeResult(correct=correct, by_group=by_group, groups=key.groups)
+
+
+def score_submission(questions: Sequence[Dict], answers: Dict[str, object]) -> Tuple[int, float]:
+    """(correct_count, score as a percentage) of a single submission."""
+    result = grade(AnswerKey.from_questions(questions), [answers])
+    return int(result.correct_counts[0]), float(result.scores[0])
+
+
+# -------------------- Bulk updates --------------------
+
+def _completed_quizzes(payload_id):
+    return (
+        StudentQuizHistory.objects.filter(payload_id=payload_id, completed=True)
+        .only('id', 'student_id', 'module_id', 'student_answers', 'score')
+        .order_by('id')
+    )
+
+
+def _apply_bloom_deltas(quizzes: List[StudentQuizHistory], groups: List[Tuple[str, str]], deltas: np.ndarray) -> int:
+    """Add per-(topic, level) count changes to each quiz's Bloom record, never below zero."""
+    per_record = defaultdict(lambda: np.zeros(len(groups), dtype=np.int64))
+    for quiz, delta in zip(quizzes, deltas):
+        if quiz.module_id is not None and delta.any():
+            per_record[(quiz.student_id, quiz.module_id)] += delta
+    if not per_record:
+        return 0
+
+    by_module = defaultdict(list)
+    for student_id, module_id in per_record:
+        by_module[module_id].append(student_id)
+
+    changed, new_records = [], []
+    for module_id, student_ids in by_module.items():
+        records = {
+            record.student_id: record
+            for record in StudentBloomRecord.objects.select_for_update().filter(
+                module_id=module_id, student_id__in=student_ids
+            )
+        }
+        for student_id in student_ids:
+            record = records.get(student_id)
+            if record is None:
+                record = StudentBloomRecord(student_id=student_id, module_id=module_id, bloom_summary={})
+                new_records.append(record)
+            else:
+                changed.append(record)
+            summary = record.bloom_summary or {}
+            for (topic_id, level), delta in zip(groups, per_record[(student_id, module_id)]):
+                if delta:
+                    counts = summary.setdefault(topic_id, {lvl: 0 for lvl in BLOOM_LEVELS})
+                    counts[level] = max(0, counts.get(level, 0) + int(delta))
+            record.bloom_summary = summary
+
+    if changed:
+        StudentBloomRecord.objects.bulk_update(changed, ['bloom_summary'], batch_size=1000)
+    if new_records:
+        StudentBloomRecord.objects.bulk_create(new_records, batch_size=1000)
+    sync_bloom_counts(changed + new_records)
+    student_ids = list({student_id for student_id, _ in per_record})
+    transaction.on_commit(lambda: invalidate_many_student_features(student_ids))
+    return len(changed) + len(new_records)
+
+
+def corrected_questions(questions: Sequence[Dict], answer_key) -> List[Dict]:
+    """
+    `questions` with answers replaced from `answer_key`: a full list of
+    answers, or {question_index: answer} for just the corrected ones.
+    """
+    if isinstance(answer_key, list):
+        if len(answer_key) != len(questions):
+            raise ValueError(f"Answer key has {len(answer_key)} answers, quiz has {len(questions)} questions")
+        answer_key = dict(enumerate(answer_key))
+
+    questions = copy.deepcopy(list(questions))
+    for index, answer in answer_key.items():
+        index = int(index)
+        if not 0 <= index < len(questions):
+            raise ValueError(f"Question {index} does not exist (quiz has {len(questions)} questions)")
+        questions[index]['answer'] = answer
+        if 'correct_answer' in questions[index]:
+            questions[index]['correct_answer'] = answer
+    return questions
+
+
+def _store_questions(payload: QuizPayload, questions: List[Dict]) -> QuizPayload:
+    """Rewrite a payload's questions; if that content is already stored, move its quizzes there."""
+    content_hash = QuizPayload.hash_questions(questions)
+    existing = QuizPayload.objects.filter(content_hash=content_hash).exclude(id=payload.id).first()
+    if existing is not None:
+        StudentQuizHistory.objects.filter(payload=payload).update(payload=existing)
+        payload.delete()
+        return existing
+    payload.questions = questions
+    payload.content_hash = content_hash
+    payload.save(update_fields=['questions', 'content_hash'])
+    return payload
+
+
+def regrade_payload(payload_id, answer_key=None, chunk_size: int = CHUNK_SIZE, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Regrade every completed attempt of the quizzes sharing one payload.
+
+    With `answer_key` (see corrected_questions) the payload's answers are
+    corrected first. Scores are rewritten, and each attempt's Bloom counts
+    move by (new - old) correct answers per topic and level. The latest
+    answers are assumed to have been counted once; earlier retries are not
+    stored, so they cannot be taken back. Without a key only scores that no
+    longer match the stored questions are fixed.
+    """
+    with transaction.atomic():
+        payload = QuizPayload.objects.select_for_update().get(id=payload_id)
+        old_key = AnswerKey.from_questions(payload.questions)
+        new_questions = corrected_questions(payload.questions, answer_key) if answer_key is not None else payload.questions
+        new_key = AnswerKey.from_questions(new_questions)
+
+        totals = {'payload_id': payload.id, 'quizzes': 0, 'scores_changed': 0, 'bloom_records_updated': 0}
+        quizzes = list(_completed_quizzes(payload.id))
+        for start in range(0, len(quizzes), chunk_size):
+            chunk = quizzes[start:start + chunk_size]
+            submissions = [quiz.student_answers for quiz in chunk]
+            new = grade(new_key, submissions)
+
+            rescored = []
+            for quiz, score in zip(chunk, new.scores.tolist()):
+                if quiz.score != score:
+                    quiz.score = score
+                    rescored.append(quiz)
+            if rescored:
+                StudentQuizHistory.objects.bulk_update(rescored, ['score'], batch_size=1000)
+            totals['scores_changed'] += len(rescored)
+            totals['quizzes'] += len(chunk)
+
+            if answer_key is not None:
+                # Same questions and levels, so both keys have the same groups.
+                deltas = new.by_group - grade(old_key, submissions).by_group
+                totals['bloom_records_updated'] += _apply_bloom_deltas(chunk, new.groups, deltas)
+
+        if answer_key is not None:
+            totals['payload_id'] = _store_questions(payload, new_questions).id
+        if dry_run:
+            # Everything above ran for the totals; nothing is kept.
+            transaction.set_rollback(True)
+
+    counters.incr("grading.quizzes_regraded", totals['quizzes'])
+    logger.info("grading.regraded", dry_run=dry_run, **totals)
+    return totals
+
+
+def rescore_quizzes(payload_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> Dict[str, int]:
+    """Recompute the scores of all completed quizzes (or those of `payload_ids`) from their stored questions."""
+    if payload_ids is None:
+        payload_ids = (
+            StudentQuizHistory.objects.filter(completed=True, payload__isnull=False)
+            .order_by('payload_id').values_list('payload_id', flat=True).distinct()
+        )
+    totals = {'payloads': 0, 'quizzes': 0, 'scores_changed': 0}
+    for payload_id in list(payload_ids):
+        result = regrade_payload(payload_id, dry_run=dry_run)
+        totals['payloads'] += 1
+        totals['quizzes'] += result['quizzes']
+        totals['scores_changed'] += result['scores_changed']
+    return totals
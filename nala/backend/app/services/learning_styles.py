@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.db import connection, transaction
+
+from app.models import Message, Student
+from app.services.classifierjson import classify_learning_style, extract_text_from_msg, learning_style_breakdown
+from app.services.structured_logging import counters, get_logger
+
+logger = get_logger(__name__)
+
+# Key in Message.msg_context under which a message's learning-style label is kept,
+# so reruns only send messages to the LLM that were never classified.
+CONTEXT_KEY = "learning_style"
+
+
+@dataclass
+class StudentLearningStyle:
+    student_id: str
+    breakdown: Optional[Dict] = None
+    classified_messages: List[Message] = field(default_factory=list)
+    reused: int = 0
+
+
+def compute_student_learning_style(student_id: str, module_id: Optional[str] = None) -> StudentLearningStyle:
+    """
+    Learning-style breakdown of one student from their own user messages.
+    Messages that already carry a label in msg_context are not classified again;
+    newly classified ones are returned (with updated msg_context) for saving.
+    """
+    result = StudentLearningStyle(student_id=student_id)
+    messages = Message.objects.filter(student_id=student_id, msg_sender='user').only('msg_id', 'msg_text', 'msg_context')
+    if module_id is not None:
+        messages = messages.filter(module_id=module_id)
+
+    styles = []
+    try:
+        for message in messages.order_by('msg_id'):
+            context = message.msg_context if isinstance(message.msg_context, dict) else {}
+            if CONTEXT_KEY in context:
+                styles.append(context[CONTEXT_KEY])
+                result.reused += 1
+                continue
+
+            text = extract_text_from_msg(message.msg_text)
+            if not text:
+                continue
+            style = classify_learning_style(text)
+            styles.append(style)
+            if style is not None:
+                message.msg_context = {**context, CONTEXT_KEY: style}
+                result.classified_messages.append(message)
+    finally:
+        # Worker threads each get their own connection; don't leave them open.
+        connection.close()
+
+    result.breakdown = learning_style_breakdown(styles)
+    return result
+
+
+def save_learning_styles(results: List[StudentLearningStyle]) -> int:
+    """Write breakdowns, primary styles and new message labels with one bulk_update per table."""
+    with_breakdown = [result for result in results if result.breakdown is not None]
+    # Current styles, kept when a breakdown has no non-zero share
+    existing = Student.objects.only('id', 'learningStyle').in_bulk([result.student_id for result in with_breakdown])
+    students = []
+    for result in with_breakdown:
+        student = existing.get(result.student_id)
+        if student is None:
+            continue
+        student.set_learning_style(result.breakdown)
+        students.append(student)
+    messages = [message for result in results for message in result.classified_messages]
+
+    with transaction.atomic():
+        if students:
+            Student.objects.bulk_update(
+                students, ['learningStyleBreakdown', 'learningStyle', 'learningStyleDescription']
+            )
+        if messages:
+            Message.objects.bulk_update(messages, ['msg_context'], batch_size=1000)
+    return len(students)
+
+
+def update_learning_styles(
+    student_ids: Optional[Iterable[str]] = None,
+    module_id: Optional[str] = None,
+    workers: int = 4,
+    chunk_size: int = 200,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict[str, int]:
+    """
+    Recompute every (or every given) student's learning style.
+
+    Students are processed in chunks: within a chunk a bounded thread pool
+    computes the breakdowns (the work is LLM round-trips), then the chunk is
+    written in one transaction. Finished chunks stay saved if a later one fails.
+    """
+    if student_ids is None:
+        student_ids = Student.objects.order_by('id').values_list('id', flat=True)
+    student_ids = list(student_ids)
+
+    totals = {'students': len(student_ids), 'processed': 0, 'updated': 0, 'classified': 0, 'reused': 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for start in range(0, len(student_ids), chunk_size):
+            chunk = student_ids[start:start + chunk_size]
+            results = list(executor.map(lambda sid: compute_student_learning_style(sid, module_id), chunk))
+
+            totals['updated'] += save_learning_styles(results)
+            totals['processed'] += len(chunk)
+            totals['classified'] += sum(len(result.classified_messages) for result in results)
+            totals['reused'] += sum(result.reused for result in results)
+            if progress:
+                progress(dict(totals))
+
+    counters.incr("learning_style.students_updated", totals['updated'])
+    counters.incr("learning_style.messages_classified", totals['classified'])
+    logger.info("learning_style.updated", **totals)
+    return totals
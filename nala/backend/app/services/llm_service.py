@@ -1,6 +1,11 @@
 import os, json, requests
 from django.conf import settings
 
+from .metrics import track_llm_call
+from .structured_logging import counters, get_logger
+
+logger = get_logger(__name__)
+
 BASE_URL = settings.BASE_URL
 API_KEY = settings.API_KEY
 
@@ -14,13 +19,17 @@ def llm(text, system=None, timeout_s=30):
     if system:
         payload["system"] = system
     
-    r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout_s)
+    with track_llm_call():
+        r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout_s)
     
     if not r.ok:
         try:
-            print("Error body:", r.json())
+            error_body = r.json()
         except Exception:
-            print("Error text:", r.text)
+            error_body = r.text
+        counters.incr("llm.generate.errors")
+        logger.warning("llm.generate.http_error", status=r.status_code, body=error_body)
         r.raise_for_status()
     
+    counters.incr("llm.generate.calls")
     return r.json()
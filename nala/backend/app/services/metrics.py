@@ -0,0 +1,187 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.services.structured_logging import counters as event_counters
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class RequestMetrics:
+    """Per-request counters, filled in by the DB wrapper and LLM call tracking."""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+
+
+@dataclass
+class ViewMetrics:
+    requests: int = 0
+    errors: int = 0
+    latency_seconds: float = 0.0
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+
+
+_current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("nala_request_metrics", default=None)
+
+
+class MetricsRegistry:
+    """Process-wide, thread-safe aggregation of sampled request metrics per view."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: Dict[str, ViewMetrics] = {}
+        self._requests_total = 0
+        self._requests_sampled = 0
+
+    def count_request(self, sampled: bool):
+        with self._lock:
+            self._requests_total += 1
+            if sampled:
+                self._requests_sampled += 1
+
+    def observe(self, view: str, seconds: float, status_code: int, request_metrics: RequestMetrics):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics()
+            metrics.requests += 1
+            if status_code >= 500:
+                metrics.errors += 1
+            metrics.latency_seconds += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    metrics.latency_buckets[i] += 1
+            metrics.db_queries += request_metrics.db_queries
+            metrics.db_seconds += request_metrics.db_seconds
+            metrics.llm_calls += request_metrics.llm_calls
+            metrics.llm_seconds += request_metrics.llm_seconds
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._requests_total = 0
+            self._requests_sampled = 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests_total": self._requests_total,
+                "requests_sampled": self._requests_sampled,
+                "views": {
+                    name: ViewMetrics(
+                        requests=m.requests,
+                        errors=m.errors,
+                        latency_seconds=m.latency_seconds,
+                        latency_buckets=list(m.latency_buckets),
+                        db_queries=m.db_queries,
+                        db_seconds=m.db_seconds,
+                        llm_calls=m.llm_calls,
+                        llm_seconds=m.llm_seconds,
+                    )
+                    for name, m in self._views.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format (0.0.4)."""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP nala_http_requests_total Requests seen by the metrics middleware.",
+            "# TYPE nala_http_requests_total counter",
+            f"nala_http_requests_total {snapshot['requests_total']}",
+            "# HELP nala_http_requests_sampled_total Requests that were timed and profiled.",
+            "# TYPE nala_http_requests_sampled_total counter",
+            f"nala_http_requests_sampled_total {snapshot['requests_sampled']}",
+            "# HELP nala_view_latency_seconds Latency of sampled requests per view.",
+            "# TYPE nala_view_latency_seconds histogram",
+        ]
+        views = sorted(snapshot["views"].items())
+        for name, m in views:
+            label = _escape_label(name)
+            for bound, count in zip(LATENCY_BUCKETS, m.latency_buckets):
+                lines.append(f'nala_view_latency_seconds_bucket{{view="{label}",le="{bound}"}} {count}')
+            lines.append(f'nala_view_latency_seconds_bucket{{view="{label}",le="+Inf"}} {m.requests}')
+            lines.append(f'nala_view_latency_seconds_sum{{view="{label}"}} {m.latency_seconds:.6f}')
+            lines.append(f'nala_view_latency_seconds_count{{view="{label}"}} {m.requests}')
+
+        counters = [
+            ("nala_view_errors_total", "Sampled requests that returned a 5xx status.", "errors", "{}"),
+            ("nala_view_db_queries_total", "Database queries executed by sampled requests.", "db_queries", "{}"),
+            ("nala_view_db_seconds_total", "Time spent in database queries by sampled requests.", "db_seconds", "{:.6f}"),
+            ("nala_view_llm_calls_total", "External LLM calls made by sampled requests.", "llm_calls", "{}"),
+            ("nala_view_llm_seconds_total", "Time spent in external LLM calls by sampled requests.", "llm_seconds", "{:.6f}"),
+        ]
+        for metric, help_text, attr, fmt in counters:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, m in views:
+                lines.append(f'{metric}{{view="{_escape_label(name)}"}} {fmt.format(getattr(m, attr))}')
+
+        lines.append("# HELP nala_events_total Application event counters.")
+        lines.append("# TYPE nala_events_total counter")
+        for event, count in sorted(event_counters.snapshot().items()):
+            lines.append(f'nala_events_total{{event="{_escape_label(event)}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+# -------------------- Request scope --------------------
+
+def begin_request() -> RequestMetrics:
+    request_metrics = RequestMetrics()
+    _current_request.set(request_metrics)
+    return request_metrics
+
+
+def end_request():
+    _current_request.set(None)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    return _current_request.get()
+
+
+def db_query_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper hook that times every query of a sampled request."""
+    request_metrics = _current_request.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.db_queries += 1
+        request_metrics.db_seconds += time.perf_counter() - start
+
+
+@contextmanager
+def track_llm_call():
+    """Time an outbound LLM request. A no-op outside sampled requests."""
+    request_metrics = _current_request.get()
+    if request_metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.llm_calls += 1
+        request_metrics.llm_seconds += time.perf_counter() - start
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from app.models import StudentBloomRecord, StudentQuizHistory, Topic
+
+BLOOM_ORDER = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
+
+# The study-time model was trained on lower-case Bloom levels.
+DEFAULT_BLOOMS_LEVEL = "remember"
+DEFAULT_PREVIOUS_GRADE = 80
+
+CACHE_KEY = "prediction_features:{student_id}"
+
+
+def get_highest_blooms_level(blooms_dict) -> Optional[str]:
+    """Return the highest Bloom's level that has a non-zero count."""
+    if not blooms_dict:
+        return None
+    for level in reversed(BLOOM_ORDER):
+        if blooms_dict.get(level, 0) > 0:
+            return level
+    return None
+
+
+def _cache_key(student_id) -> str:
+    return CACHE_KEY.format(student_id=student_id)
+
+
+def load_student_features(student_id) -> Dict:
+    """
+    Assemble prediction inputs for every topic of a student in three queries:
+    enrolled topics, Bloom records and completed quiz scores per topic.
+
+    Returns:
+        {
+            "topics": [{"topic_id": "1", "topic_name": "..."}, ...],
+            "blooms_level": {"1": "apply", ...},      # highest level reached
+            "previous_grade": {"1": 66.7, ...},       # latest completed quiz score
+        }
+    """
+    student_id = str(student_id)
+
+    topics = [
+        {'topic_id': str(topic['id']), 'topic_name': topic['name']}
+        for topic in Topic.objects.filter(module__students__id=student_id)
+        .order_by('id')
+        .values('id', 'name')
+        .distinct()
+    ]
+
+    blooms_level = {}
+    for bloom_summary in StudentBloomRecord.objects.filter(student_id=student_id).values_list('bloom_summary', flat=True):
+        for topic_id, counts in (bloom_summary or {}).items():
+            level = get_highest_blooms_level(counts)
+            if level:
+                blooms_level[str(topic_id)] = level.lower()
+
+    # Ordered oldest -> newest so the latest quiz covering a topic wins.
+    previous_grade = {}
+    quiz_topics = StudentQuizHistory.topics_covered.through.objects.filter(
+        studentquizhistory__student_id=student_id,
+        studentquizhistory__completed=True,
+        studentquizhistory__score__isnull=False,
+    ).order_by('studentquizhistory__created_at', 'studentquizhistory_id')
+    for topic_id, score in quiz_topics.values_list('topic_id', 'studentquizhistory__score'):
+        previous_grade[str(topic_id)] = round(float(score), 2)
+
+    return {
+        'topics': topics,
+        'blooms_level': blooms_level,
+        'previous_grade': previous_grade,
+    }
+
+
+def get_student_features(student_id) -> Dict:
+    """Cached wrapper around load_student_features; see invalidate_student_features."""
+    key = _cache_key(student_id)
+    features = cache.get(key)
+    if features is None:
+        features = load_student_features(student_id)
+        cache.set(key, features, getattr(settings, 'PREDICTION_FEATURE_CACHE_TTL', 300))
+    return features
+
+
+def invalidate_student_features(student_id):
+    """Drop cached features after a quiz submission or Bloom update."""
+    cache.delete(_cache_key(student_id))
+
+
+def invalidate_many_student_features(student_ids):
+    cache.delete_many([_cache_key(student_id) for student_id in student_ids])
+
+
+def get_student_topics(student_id) -> List[Dict]:
+    return get_student_features(student_id)['topics']
+
+
+def get_blooms_level(student_id, topic_id) -> str:
+    features = get_student_features(student_id)
+    return features['blooms_level'].get(str(topic_id), DEFAULT_BLOOMS_LEVEL)
+
+
+def get_previous_grade(student_id, topic_id) -> float:
+    features = get_student_features(student_id)
+    return features['previous_grade'].get(str(topic_id), DEFAULT_PREVIOUS_GRADE)
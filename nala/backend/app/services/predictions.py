@@ -0,0 +1,196 @@
+"""
+Study-time predictions, served in-process by both the DRF views and the
+standalone Flask app (app.py).
+
+The model lives in the prediction_model project; its package root is put on
+sys.path and the process-wide model registry (hot reload, bundle/compiled/
+lookup-table paths) is shared by every caller. Student inputs come from
+app.services.prediction_features, which caches them per student.
+"""
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from app.services import prediction_features
+
+_pipeline_lock = threading.Lock()
+_pipeline = None
+
+
+def _prediction_model_dir() -> str:
+    return str(getattr(settings, 'PREDICTION_MODEL_DIR', settings.BASE_DIR / 'prediction_model'))
+
+
+def get_pipeline():
+    """The shared PredictPipeline; imports prediction_model on first use."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                model_dir = _prediction_model_dir()
+                if model_dir not in sys.path:
+                    sys.path.append(model_dir)
+                from src.pipeline.model_registry import default_registry
+                from src.pipeline.predict_pipeline import PredictPipeline
+                _pipeline = PredictPipeline(registry=default_registry)
+    return _pipeline
+
+
+def get_registry():
+    return get_pipeline().registry
+
+
+def warmup():
+    """Load model artifacts now so the first request doesn't pay for them."""
+    return get_registry().warmup()
+
+
+def readiness() -> Dict:
+    """Model state of this process, without loading anything."""
+    artifacts = get_registry().current
+    return {
+        'model_warm': artifacts is not None,
+        'model_version': artifacts.version if artifacts else None,
+        'model_source': artifacts.source if artifacts else None,
+        'model_loaded_at': artifacts.loaded_at if artifacts else None,
+        'pid': os.getpid(),
+    }
+
+
+# -------------------- Model inputs --------------------
+
+def get_blooms_level(student_id, topic_id) -> str:
+    return prediction_features.get_blooms_level(student_id, topic_id)
+
+
+def get_previous_grades(student_id, topic_id) -> float:
+    """Get student's latest completed quiz score for this topic"""
+    return prediction_features.get_previous_grade(student_id, topic_id)
+
+
+def get_student_topics(student_id) -> List[Dict]:
+    return prediction_features.get_student_topics(student_id)
+
+
+# Dummy data functions
+def get_topic_difficulty(topic_id):
+    dummy_difficulties = {
+        "1": 5,
+        "2": 5,
+        "3": 2,
+        "4": 6,
+        "5": 2
+    }
+    return dummy_difficulties.get(str(topic_id), 3)
+
+
+def get_exam_date(student_id, topic_id):
+    dummy_exam_dates = {
+        ("student123", "1"): "2025-10-01", # exam #1 to focus on
+        ("student123", "2"): "2025-09-15", # exam already passed
+        ("student123", "3"): "2025-10-03", # exam #2 to focus on
+        ("student123", "4"): "2025-12-01",
+        ("student123", "5"): "2025-12-15",
+        ("student456", "1"): "2025-10-01", # exam #1 to focus on
+        ("student456", "2"): "2025-09-15", # exam already passed
+        ("student456", "3"): "2025-10-03", # exam #2 to focus on
+        ("student456", "4"): "2025-12-01",
+        ("student456", "5"): "2025-12-15"
+    }
+    return dummy_exam_dates.get((student_id, topic_id), "2024-02-01")
+
+
+def get_preferred_study_start_time(student_id):
+    dummy_study_times = {
+        "student123": "08:30",
+        "student456": "18:33"
+    }
+    return dummy_study_times.get(student_id, 9)  # default to 9 AM
+
+
+def get_preffered_break_time_between_studying(student_id):
+    dummy_break_times = {
+        "student123": 30,
+        "student456": 10
+    }
+    return dummy_break_times.get(student_id, 10)  # default to 10 minutes
+
+
+def collect_topic_features(student_id, topics) -> List[Dict]:
+    """Gather the three model inputs for every topic of a student."""
+    feature_rows = []
+    for topic in topics:
+        topic_id = topic['topic_id']
+        feature_rows.append({
+            'student_id': student_id,
+            'topic_id': topic_id,
+            'topic_name': topic['topic_name'],
+            'blooms_level': get_blooms_level(student_id, topic_id),
+            'topic_difficulty': get_topic_difficulty(topic_id),
+            'previous_grade': get_previous_grades(student_id, topic_id)
+        })
+    return feature_rows
+
+
+def prepare_batch_prediction_columns(feature_rows) -> Dict[str, List]:
+    """Model inputs as plain column lists; the compiled/table paths don't need a DataFrame."""
+    return {
+        'blooms_level': [row['blooms_level'] for row in feature_rows],
+        'topic_difficulty': [row['topic_difficulty'] for row in feature_rows],
+        'previous_grade': [row['previous_grade'] for row in feature_rows]
+    }
+
+
+# -------------------- Predictions --------------------
+
+def predict_study_hours(feature_rows) -> List[float]:
+    """Run transform + predict once for all rows, returning one float per row."""
+    if not feature_rows:
+        return []
+    columns = prepare_batch_prediction_columns(feature_rows)
+    return get_pipeline().predict_batch(columns).tolist()
+
+
+def build_topic_results(student_id, feature_rows, predictions) -> List[Dict]:
+    preferred_study_time = get_preferred_study_start_time(student_id)  # Not used in prediction
+    break_time = get_preffered_break_time_between_studying(student_id)
+    return [
+        {
+            'topic_id': row['topic_id'],
+            'topic_name': row['topic_name'],
+            'actual_study_hours': round(predicted_hours, 2),
+            'student_grade_history': row['previous_grade'],
+            'blooms_level': row['blooms_level'],
+            'topic_difficulty': row['topic_difficulty'],
+            'exam_date': get_exam_date(student_id, row['topic_id']),  # Not used in prediction
+            'preferred_study_time': preferred_study_time,
+            'break_time_between_studying': break_time
+        }
+        for row, predicted_hours in zip(feature_rows, predictions)
+    ]
+
+
+def predict_student_topics(student_id, topic_ids: Optional[set] = None) -> List[Dict]:
+    """Predicted study hours for every (or every wanted) topic of a student, one model call."""
+    topics = get_student_topics(student_id)
+    if topic_ids is not None:
+        topics = [t for t in topics if str(t['topic_id']) in topic_ids]
+    feature_rows = collect_topic_features(student_id, topics)
+    return build_topic_results(student_id, feature_rows, predict_study_hours(feature_rows))
+
+
+def predict_topic(student_id, topic_id) -> Dict:
+    """Prediction and model inputs for a single (student, topic) pair."""
+    topic_names = {t['topic_id']: t['topic_name'] for t in get_student_topics(student_id)}
+    topic = {'topic_id': str(topic_id), 'topic_name': topic_names.get(str(topic_id))}
+    row = collect_topic_features(student_id, [topic])[0]
+    predicted_hours = predict_study_hours([row])[0]
+    return {
+        'actual_study_hours': round(predicted_hours, 2),
+        'student_grade_history': row['previous_grade'],
+        'blooms_level': row['blooms_level'],
+        'topic_difficulty': row['topic_difficulty'],
+    }
@@ -0,0 +1,123 @@
+import json
+from typing import Dict, Iterable, Tuple
+
+from django.db import connection, models
+from django.db.models import F, Func
+from django.utils import timezone
+
+from app.models import StudentQuizHistory
+
+
+class QuizAccessDenied(Exception):
+    pass
+
+
+class InvalidAnswers(ValueError):
+    pass
+
+
+class JSONSet(Func):
+    """
+    Set top-level keys of a JSON object column inside the UPDATE itself, so
+    only the changed answers are sent and the rest of the column is never
+    read into Python: JSONSet('student_answers', {'3': 'B'}).
+    """
+    vendors = ('mysql', 'sqlite', 'postgresql')
+    output_field = models.JSONField()
+
+    def __init__(self, field_name: str, values: Dict[str, object]):
+        super().__init__(F(field_name))
+        self.values = values
+
+    def _pairs(self) -> Iterable[Tuple[str, str]]:
+        for key, value in self.values.items():
+            yield key, json.dumps(value)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        sql = f"JSON_SET(COALESCE({column}, '{{}}')"
+        for key, value in self._pairs():
+            sql += ", %s, JSON(%s)"
+            params = (*params, f'$."{key}"', value)
+        return sql + ")", params
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        sql = f"JSON_SET(COALESCE({column}, JSON_OBJECT())"
+        for key, value in self._pairs():
+            sql += ", %s, CAST(%s AS JSON)"
+            params = (*params, f'$."{key}"', value)
+        return sql + ")", params
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        sql = f"COALESCE({column}, '{{}}'::jsonb)"
+        for key, value in self._pairs():
+            sql = f"jsonb_set({sql}, ARRAY[%s], %s::jsonb, true)"
+            params = (*params, key, value)
+        return sql, params
+
+
+def normalize_answers(answers) -> Dict[str, object]:
+    """
+    {question_index: answer} from a dict, or from a list of
+    {"question_index": ..., "answer": ...} items (a debounced batch).
+    Indexes must be non-negative integers; they are stored as strings.
+    """
+    if isinstance(answers, dict):
+        items = answers.items()
+    elif isinstance(answers, list):
+        try:
+            items = [(item['question_index'], item.get('answer')) for item in answers]
+        except (TypeError, KeyError):
+            raise InvalidAnswers("answers must be an object or a list of {question_index, answer}")
+    else:
+        raise InvalidAnswers("answers must be an object or a list of {question_index, answer}")
+
+    normalized = {}
+    for index, answer in items:
+        try:
+            index = int(index)
+        except (TypeError, ValueError):
+            raise InvalidAnswers(f"question_index must be an integer, got {index!r}")
+        if index < 0:
+            raise InvalidAnswers(f"question_index must not be negative, got {index}")
+        normalized[str(index)] = answer
+    return normalized
+
+
+def save_quiz_answers(quiz_history_id, student_id, answers: Dict[str, object]) -> None:
+    """
+    Merge `answers` ({question_index: answer}) into a quiz's student_answers.
+
+    One UPDATE that writes only the given keys (plus updated_at), so the cost
+    of a save does not depend on the size of the quiz or of earlier answers.
+    Raises StudentQuizHistory.DoesNotExist or QuizAccessDenied.
+    """
+    if not answers:
+        if not StudentQuizHistory.objects.filter(id=quiz_history_id, student_id=student_id).exists():
+            _raise_missing_or_denied(quiz_history_id)
+        return
+
+    quizzes = StudentQuizHistory.objects.filter(id=quiz_history_id, student_id=student_id)
+    if connection.vendor in JSONSet.vendors:
+        updated = quizzes.update(
+            student_answers=JSONSet('student_answers', answers),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            _raise_missing_or_denied(quiz_history_id)
+        return
+
+    # No JSON update function: read and write just this column.
+    quiz = quizzes.only('id', 'student_answers').first()
+    if quiz is None:
+        _raise_missing_or_denied(quiz_history_id)
+    quiz.student_answers = {**(quiz.student_answers or {}), **answers}
+    quiz.save(update_fields=['student_answers', 'updated_at'])
+
+
+def _raise_missing_or_denied(quiz_history_id):
+    if StudentQuizHistory.objects.filter(id=quiz_history_id).exists():
+        raise QuizAccessDenied("Unauthorized: Quiz does not belong to this student")
+    raise StudentQuizHistory.DoesNotExist
@@ -0,0 +1,76 @@
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db.models import Q
+
+from app.models import StudentQuizHistory
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Output field -> (columns it needs, how it is rendered from a row)
+QUIZ_HISTORY_FIELDS = {
+    'id': (('id',), lambda quiz: quiz.id),
+    'module_name': (('module__name',), lambda quiz: quiz.module.name if quiz.module else 'N/A'),
+    'score': (('score',), lambda quiz: quiz.score),
+    'num_questions': (('num_questions',), lambda quiz: quiz.num_questions),
+    'quiz_type': (('quiz_type',), lambda quiz: quiz.quiz_type or 'weekly'),
+    'created_at': (('created_at',), lambda quiz: quiz.created_at.isoformat()),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(quiz: StudentQuizHistory) -> str:
+    """Opaque keyset cursor: position of `quiz` in (created_at, id) order."""
+    raw = f"{quiz.created_at.isoformat()}|{quiz.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, quiz_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(quiz_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def get_quiz_history_page(
+    student_id: str,
+    fields: Optional[Sequence[str]] = None,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Dict:
+    """
+    One page of a student's completed quizzes, newest first.
+
+    Keyset pagination on (created_at, id) using the history index, so the cost
+    depends on the page size rather than on how many quizzes the student took.
+    Only the columns needed for `fields` are loaded; question payloads never are.
+    """
+    fields = list(fields or QUIZ_HISTORY_FIELDS)
+    columns = {'id', 'created_at'}
+    for name in fields:
+        columns.update(QUIZ_HISTORY_FIELDS[name][0])
+
+    quizzes = StudentQuizHistory.objects.filter(student_id=student_id, completed=True)
+    if cursor:
+        created_at, quiz_id = decode_cursor(cursor)
+        quizzes = quizzes.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=quiz_id))
+    if 'module__name' in columns:
+        quizzes = quizzes.select_related('module')
+    page: List[StudentQuizHistory] = list(
+        quizzes.order_by('-created_at', '-id').only(*columns)[:limit + 1]
+    )
+
+    return {
+        'quiz_history': [
+            {name: QUIZ_HISTORY_FIELDS[name][1](quiz) for name in fields}
+            for quiz in page[:limit]
+        ],
+        'next_cursor': encode_cursor(page[limit - 1]) if len(page) > limit else None,
+    }
@@ -0,0 +1,141 @@
+import csv
+import json
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from app.models import Module, QuizPayload, Student, StudentQuizHistory, Topic
+from app.services.structured_logging import counters, get_logger
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 2000
+
+QuizHistoryTopic = StudentQuizHistory.topics_covered.through
+
+
+def load_quiz_definitions(path: str) -> List[Dict]:
+    """
+    Weekly quiz definitions from a file:
+    - JSON: {"module_id", "topic_ids", "questions"} or a list of them
+    - CSV in the weeklyquizzes.csv format: one quiz per (module_id, topic_id),
+      rows with a quiz_type other than weekly are skipped
+    """
+    if path.lower().endswith('.csv'):
+        grouped = defaultdict(list)
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if (row.get('quiz_type') or 'weekly').strip() != 'weekly':
+                    continue
+                module_id, topic_id = row['module_id'].strip(), row['topic_id'].strip()
+                grouped[(module_id, topic_id)].append({
+                    'question': row['question'].strip(),
+                    'options': {
+                        'A': row['option_A'].strip(),
+                        'B': row['option_B'].strip(),
+                        'C': row['option_C'].strip(),
+                        'D': row['option_D'].strip(),
+                    },
+                    'answer': row['answer'].strip(),
+                    'bloom_level': row['bloom_level'].strip(),
+                    'topic_id': topic_id,
+                })
+        return [
+            {'module_id': module_id, 'topic_ids': [topic_id], 'questions': questions}
+            for (module_id, topic_id), questions in grouped.items()
+        ]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        definitions = json.load(f)
+    return definitions if isinstance(definitions, list) else [definitions]
+
+
+def _weekly_quizzes_for_topics(module_id, topic_ids: Sequence[str]):
+    """Weekly quizzes of the module covering exactly `topic_ids` (as get_weekly_quiz matches them)."""
+    return (
+        StudentQuizHistory.objects.filter(module_id=module_id, quiz_type='weekly')
+        .annotate(
+            topic_count=Count('topics_covered', distinct=True),
+            matched_topics=Count('topics_covered', filter=Q(topics_covered__id__in=topic_ids), distinct=True),
+        )
+        .filter(topic_count=len(topic_ids), matched_topics=len(topic_ids))
+    )
+
+
+def provision_weekly_quiz(
+    module_id: str,
+    topic_ids: Sequence[str],
+    questions: List[Dict],
+    batch_size: int = BATCH_SIZE,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict[str, int]:
+    """
+    Give every student enrolled in the module the weekly quiz for `topic_ids`.
+
+    Idempotent: students who already have a weekly quiz for exactly these
+    topics are skipped, whatever its questions. The questions are stored once
+    (QuizPayload); history rows and their topics_covered rows are inserted
+    with bulk_create, one transaction per batch, so an interrupted run leaves
+    no quiz without topics and a rerun picks up the remaining students.
+    """
+    topic_ids = sorted({str(topic_id) for topic_id in topic_ids})
+    module = Module.objects.get(id=module_id)
+    found = set(Topic.objects.filter(module=module, id__in=topic_ids).values_list('id', flat=True))
+    missing = [topic_id for topic_id in topic_ids if topic_id not in found]
+    if not topic_ids or missing:
+        raise ValueError(f"Topics not found in module {module.id}: {', '.join(missing) or '(none given)'}")
+    if not questions:
+        raise ValueError("A weekly quiz needs at least one question")
+
+    payload = QuizPayload.for_questions(questions)
+
+    provisioned = _weekly_quizzes_for_topics(module.id, topic_ids).values('student_id')
+    student_ids = list(
+        Student.enrolled_modules.through.objects.filter(module_id=module.id)
+        .exclude(student_id__in=provisioned)
+        .order_by('student_id')
+        .values_list('student_id', flat=True)
+    )
+    enrolled = Student.enrolled_modules.through.objects.filter(module_id=module.id).count()
+    totals = {'payload_id': payload.id, 'students': enrolled, 'existing': enrolled - len(student_ids), 'created': 0}
+
+    for start in range(0, len(student_ids), batch_size):
+        batch = student_ids[start:start + batch_size]
+        with transaction.atomic():
+            quizzes = StudentQuizHistory.objects.bulk_create([
+                StudentQuizHistory(
+                    student_id=student_id,
+                    module=module,
+                    payload=payload,
+                    num_questions=len(questions),
+                    quiz_type='weekly',
+                    student_answers={},
+                )
+                for student_id in batch
+            ])
+            quiz_ids = [quiz.id for quiz in quizzes if quiz.id is not None]
+            if len(quiz_ids) != len(batch):
+                # Backends that don't return primary keys from bulk inserts (MySQL):
+                # the new rows are this batch's quizzes with this payload and no topics yet.
+                quiz_ids = list(
+                    StudentQuizHistory.objects.filter(module=module, payload=payload, student_id__in=batch)
+                    .filter(~Exists(QuizHistoryTopic.objects.filter(studentquizhistory_id=OuterRef('pk'))))
+                    .values_list('id', flat=True)
+                )
+            QuizHistoryTopic.objects.bulk_create(
+                [
+                    QuizHistoryTopic(studentquizhistory_id=quiz_id, topic_id=topic_id)
+                    for quiz_id in quiz_ids
+                    for topic_id in topic_ids
+                ],
+                batch_size=5000,
+            )
+        totals['created'] += len(batch)
+        if progress:
+            progress(dict(totals))
+
+    counters.incr("quiz_provisioning.created", totals['created'])
+    logger.info("quiz_provisioning.provisioned", module_id=module.id, topic_ids=",".join(topic_ids), **totals)
+    return totals
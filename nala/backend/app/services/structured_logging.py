@@ -0,0 +1,106 @@
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class LazyJSON:
+    """Defer json.dumps until a handler actually formats the record."""
+
+    __slots__ = ("obj", "indent")
+
+    def __init__(self, obj, indent=None):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self):
+        return json.dumps(self.obj, indent=self.indent, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    Render records as `time level logger event key=value ...`.
+    Field values are only stringified here, i.e. when a record is emitted.
+    """
+
+    def format(self, record):
+        base = super().format(record)
+        fields = getattr(record, "fields", None) or {}
+        if not fields:
+            return base
+        rendered = " ".join(f"{key}={_render_value(value)}" for key, value in fields.items())
+        return f"{base} {rendered}"
+
+
+def _render_value(value) -> str:
+    text = str(value)
+    if not text or any(ch in text for ch in ' ="\n'):
+        return json.dumps(text)
+    return text
+
+
+class StructuredLogger:
+    """
+    Thin wrapper over a stdlib logger taking an event name plus keyword
+    fields: `log.debug("classified", topic_id=tid, level=lvl)`. The level
+    check happens before any record or field formatting, so disabled levels
+    cost a single comparison.
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level: int, event: str, fields: Dict, exc_info=None):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, extra={"fields": fields}, exc_info=exc_info, stacklevel=3)
+
+    def debug(self, event: str, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event: str, **fields):
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+class Counters:
+    """Thread-safe named event counters, exported through /api/metrics/."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def update(self, counts: Dict[str, int]):
+        with self._lock:
+            self._counts.update(counts)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+counters = Counters()
+
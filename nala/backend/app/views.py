@@ -1,5 +1,7 @@
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import api_view
@@ -38,11 +40,39 @@ from app.services.blooms import (
 )
 
 from app.services.quiz_generator import generate_quiz
+from app.services.grading import score_submission
+from app.services.prediction_features import invalidate_student_features
+from app.services import predictions
+from app.services.bloom_analytics import get_module_analytics, sync_bloom_counts
+from app.services.quiz_answers import (
+    InvalidAnswers,
+    QuizAccessDenied,
+    normalize_answers,
+    save_quiz_answers,
+)
+from app.services.quiz_history import (
+    DEFAULT_LIMIT as DEFAULT_HISTORY_LIMIT,
+    MAX_LIMIT as MAX_HISTORY_LIMIT,
+    QUIZ_HISTORY_FIELDS,
+    InvalidCursor,
+    get_quiz_history_page,
+)
+from app.services.metrics import registry as metrics_registry
+from app.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 @api_view(['GET'])
 def homepage_view(request):
     return Response({"message": "Hello, World!"})
 
+def metrics_view(request):
+    """Per-view latency, DB and LLM metrics in the Prometheus text format."""
+    return HttpResponse(
+        metrics_registry.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Chat history analytics
 @api_view(["GET"])
 def classify_chathistory(request):
@@ -182,7 +212,8 @@ def student_topic_notes(request, student_id, topic_id):
 def get_weekly_quiz(request, module_id):
     """
     Fetch weekly quiz questions from the database for a specific module.
-    Weekly quizzes are pre-loaded, so this only retrieves existing entries.
+    Weekly quizzes are pre-loaded (python manage.py provision_weekly_quiz),
+    so this only retrieves existing entries.
     """
     try:
         student_id = request.GET.get('student_id')
@@ -215,20 +246,23 @@ def get_weekly_quiz(request, module_id):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Find existing weekly quiz by matching exact topic_ids in quiz_data
-        existing_quiz = None
-        candidate_quizzes = StudentQuizHistory.objects.filter(
-            student=student,
-            module=module,
-            quiz_type='weekly'
+        # Find the weekly quiz covering exactly the selected topics, in one query
+        existing_quiz = (
+            StudentQuizHistory.objects.filter(
+                student=student,
+                module=module,
+                quiz_type='weekly'
+            )
+            .annotate(
+                topic_count=Count('topics_covered', distinct=True),
+                matched_topics=Count('topics_covered', filter=Q(topics_covered__id__in=topic_ids_set), distinct=True),
+            )
+            .filter(topic_count=len(topic_ids_set), matched_topics=len(topic_ids_set))
+            .select_related('payload')
+            .order_by('id')
+            .first()
         )
         
-        for quiz in candidate_quizzes:
-            stored_topic_ids = set(quiz.get_topic_ids())
-            if stored_topic_ids == topic_ids_set:
-                existing_quiz = quiz
-                break
-        
         if not existing_quiz:
             return Response(
                 {'error': 'Weekly quiz not found for selected topics. Please contact your instructor.'}, 
@@ -357,28 +391,59 @@ def generate_custom_quiz(request, module_id):
 def save_quiz_answer(request, quiz_history_id):
     """
     Save a single answer as the student progresses through the quiz.
+    Only that answer is written; the rest of the quiz row is left untouched.
     """
     try:
-        question_index = str(request.data.get('question_index'))
-        answer = request.data.get('answer')
         student_id = request.data.get('student_id')
         
         if not student_id:
             return Response({'error': 'student_id is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        quiz_history = StudentQuizHistory.objects.get(id=str(quiz_history_id))
-        
-        if str(quiz_history.student_id) != str(student_id):
-            return Response({'error': 'Unauthorized: Quiz does not belong to this student'}, status=status.HTTP_403_FORBIDDEN)
-        
-        if not quiz_history.student_answers:
-            quiz_history.student_answers = {}
-        
-        quiz_history.student_answers[str(question_index)] = answer
-        quiz_history.save()
+
+        answers = normalize_answers([{
+            'question_index': request.data.get('question_index'),
+            'answer': request.data.get('answer'),
+        }])
+        save_quiz_answers(quiz_history_id, str(student_id), answers)
         
         return Response({'status': 'success', 'message': 'Answer saved'})
         
+    except InvalidAnswers as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except QuizAccessDenied as e:
+        return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+    except StudentQuizHistory.DoesNotExist:
+        return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['PATCH'])
+def save_quiz_answers_batch(request, quiz_history_id):
+    """
+    Save several answers at once, e.g. a debounced batch from the frontend.
+
+    Expected payload:
+    {
+        "student_id": "student_123",
+        "answers": {"0": "A", "3": "C"}
+    }
+    or "answers": [{"question_index": 0, "answer": "A"}, ...]
+    """
+    try:
+        student_id = request.data.get('student_id')
+
+        if not student_id:
+            return Response({'error': 'student_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        answers = normalize_answers(request.data.get('answers', {}))
+        save_quiz_answers(quiz_history_id, str(student_id), answers)
+
+        return Response({'status': 'success', 'message': f'{len(answers)} answer(s) saved'})
+
+    except InvalidAnswers as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except QuizAccessDenied as e:
+        return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
     except StudentQuizHistory.DoesNotExist:
         return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
@@ -398,7 +463,7 @@ def submit_quiz(request, quiz_history_id):
         if not student_id:
             return Response({'error': 'student_id is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        quiz_history = StudentQuizHistory.objects.get(id=str(quiz_history_id))
+        quiz_history = StudentQuizHistory.objects.select_related('payload').get(id=str(quiz_history_id))
 
         if str(quiz_history.student_id) != str(student_id):
             return Response({'error': 'Unauthorized: Quiz does not belong to this student'}, status=status.HTTP_403_FORBIDDEN)
@@ -418,21 +483,15 @@ def submit_quiz(request, quiz_history_id):
         quiz_history.student_answers = answers
 
         questions = quiz_history.get_questions()
-        correct_count = 0
-
-        for idx, question in enumerate(questions):
-            student_answer = quiz_history.student_answers.get(str(idx))
-            correct_answer = question.get('answer') or question.get('correct_answer')
-            if student_answer == correct_answer:
-                correct_count += 1
-        
-        score = (correct_count / len(questions)) * 100 if questions else 0
+        correct_count, score = score_submission(questions, quiz_history.student_answers)
         
         quiz_history.score = score
         quiz_history.completed = True
         quiz_history.save()
         
         update_bloom_from_quiz(quiz_history.student, quiz_history)
+        # New score feeds the study-time predictor's previous_grade feature
+        invalidate_student_features(quiz_history.student_id)
         
         quiz_type = quiz_history.get_effective_quiz_type()
         
@@ -454,34 +513,52 @@ def submit_quiz(request, quiz_history_id):
 @api_view(['GET'])
 def get_quiz_history(request, student_id):
     """
-    Get all quiz history for a student.
+    Get a student's completed quizzes, newest first, one page at a time.
+
+    Query params:
+        limit: Optional - page size (default 20, max 100)
+        cursor: Optional - next_cursor of the previous page
+        fields: Optional - comma separated subset of id, module_name, score,
+                num_questions, quiz_type, created_at (default all)
+        compact: Optional - 1 to return {'fields': [...], 'rows': [[...]]}
+                 instead of one object per quiz
     """
     try:
-        student = Student.objects.get(id=student_id)
-        quiz_histories = StudentQuizHistory.objects.filter(
-            student=student,
-            completed=True
-        ).order_by('-created_at')
-
-        history_data = []
-        for quiz in quiz_histories:
-            questions = quiz.get_questions()
-            history_data.append({
-                'id': quiz.id,
-                'module_name': quiz.module.name if quiz.module else 'N/A',
-                'score': quiz.score,
-                'num_questions': len(questions),
-                'quiz_type': quiz.get_effective_quiz_type(),
-                'created_at': quiz.created_at.isoformat(),
-            })
-        
-        return Response({'quiz_history': history_data})
-        
-    except Student.DoesNotExist:
-        return Response(
-            {'error': 'Student not found'}, 
-            status=status.HTTP_404_NOT_FOUND
+        try:
+            limit = min(max(int(request.GET.get('limit', DEFAULT_HISTORY_LIMIT)), 1), MAX_HISTORY_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+        unknown = [name for name in fields if name not in QUIZ_HISTORY_FIELDS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown field(s): {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not Student.objects.filter(id=student_id).exists():
+            return Response(
+                {'error': 'Student not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        page = get_quiz_history_page(
+            student_id,
+            fields=fields or None,
+            limit=limit,
+            cursor=request.GET.get('cursor'),
         )
+
+        if request.GET.get('compact') in ('1', 'true'):
+            fields = fields or list(QUIZ_HISTORY_FIELDS)
+            page['fields'] = fields
+            page['rows'] = [[quiz[name] for name in fields] for quiz in page.pop('quiz_history')]
+
+        return Response(page)
+
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -702,6 +779,8 @@ def restore_bloom_summary(request):
         record, _ = StudentBloomRecord.objects.get_or_create(student=student, module=module)
         record.bloom_summary = bloom_summary
         record.save()
+        sync_bloom_counts([record])
+        invalidate_student_features(student.id)
 
         return Response(
             {
@@ -765,62 +844,19 @@ def update_learning_preferences(request):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        if not isinstance(breakdown, dict):
-            return Response(
-                {'error': 'learning_style_breakdown must be a dictionary'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Sanitize the breakdown
-        sanitized_breakdown = {}
-        for key, value in breakdown.items():
-            sanitized_key = str(key)
-            if isinstance(value, (int, float)):
-                sanitized_breakdown[sanitized_key] = float(value)
-            else:
-                try:
-                    sanitized_breakdown[sanitized_key] = float(value)
-                except (TypeError, ValueError):
-                    sanitized_breakdown[sanitized_key] = 0.0
-
-        # Check if a style code was explicitly provided
+        # An explicit, valid style code wins over the breakdown's primary style
         style_code = data.get('learning_style')
         valid_styles = {choice[0] for choice in Student.LEARNING_STYLE_CHOICES}
-        if style_code and style_code not in valid_styles:
+        if style_code not in valid_styles:
             style_code = None
 
-        # If no explicit style code, determine from breakdown
-        if not style_code:
-            key_map = {
-                'Retrieval Practice': 'RETRIEVAL',
-                'Elaboration': 'ELABORATION',
-                'Concrete Examples': 'CONCRETE',
-                'Interleaving': 'INTERLEAVING',
-                'Dual Coding': 'DUAL_CODING',
-                'Spaced Practice': 'SPACED',
-            }
-
-            # Find the style with the highest value (excluding total_user_messages)
-            primary_key = None
-            highest_value = float('-inf')
-            for key, value in sanitized_breakdown.items():
-                if key == 'total_user_messages':
-                    continue
-                # Skip keys that aren't in our map
-                if key not in key_map:
-                    continue
-                if value > highest_value:
-                    highest_value = value
-                    primary_key = key
-
-            if primary_key and highest_value > 0:
-                style_code = key_map[primary_key]
-
-        # Update the student record
-        if style_code:
-            student.learningStyle = style_code
-
-        student.learningStyleBreakdown = sanitized_breakdown
+        try:
+            student.set_learning_style(breakdown, style=style_code)
+        except ValidationError as e:
+            return Response(
+                {'error': ' '.join(e.messages)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         student.save()
 
         return Response(
@@ -828,20 +864,106 @@ def update_learning_preferences(request):
                 'student_id': student_id,
                 'learning_style': student.learningStyle,
                 'learning_style_display': student.get_learningStyle_display(),
+                'learning_style_description': student.learningStyleDescription,
                 'learning_style_breakdown': student.learningStyleBreakdown,
             },
             status=status.HTTP_200_OK
         )
 
     except Exception as e:
-        import traceback
-        traceback.print_exc() 
+        logger.exception("learning_preferences.error", error=str(e))
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
+@api_view(['GET'])
+def learning_style_cohorts(request):
+    """
+    Number of students per primary learning style.
+    Query params:
+        module_id: Optional - only students enrolled in this module
+    """
+    students = Student.objects.all()
+    module_id = request.GET.get('module_id')
+    if module_id:
+        students = students.filter(enrolled_modules__id=module_id)
+
+    counts = {code: 0 for code, _ in Student.LEARNING_STYLE_CHOICES}
+    for row in students.values('learningStyle').annotate(count=Count('id')).order_by():
+        if row['learningStyle'] in counts:
+            counts[row['learningStyle']] = row['count']
+
+    return Response({
+        'module_id': module_id,
+        'cohorts': [
+            {
+                'learning_style': code,
+                'learning_style_display': label,
+                'learning_style_description': Student.LEARNING_STYLE_DESCRIPTIONS.get(code, ""),
+                'students': counts[code],
+            }
+            for code, label in Student.LEARNING_STYLE_CHOICES
+        ],
+    })
+
+
+@api_view(['GET'])
+def learning_style_cohort(request, learning_style):
+    """
+    Students whose primary learning style is `learning_style`, ordered by id.
+    Query params:
+        module_id: Optional - only students enrolled in this module
+        after: Optional - last student id of the previous page
+        limit: Optional - page size (default 100, max 1000)
+    """
+    if learning_style not in dict(Student.LEARNING_STYLE_CHOICES):
+        return Response(
+            {'error': f'Unknown learning style {learning_style}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = min(max(int(request.GET.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Served from the learningStyle index; keyset pagination on the primary key
+    students = Student.objects.filter(learningStyle=learning_style)
+    module_id = request.GET.get('module_id')
+    if module_id:
+        students = students.filter(enrolled_modules__id=module_id)
+    after = request.GET.get('after')
+    if after:
+        students = students.filter(id__gt=after)
+    page = list(students.order_by('id').values('id', 'name', 'email')[:limit + 1])
+
+    return Response({
+        'learning_style': learning_style,
+        'learning_style_description': Student.LEARNING_STYLE_DESCRIPTIONS.get(learning_style, ""),
+        'students': page[:limit],
+        'next_after': page[limit - 1]['id'] if len(page) > limit else None,
+    })
+
+
+@api_view(['GET'])
+def module_bloom_analytics(request, module_id):
+    """
+    Bloom level distribution across all students enrolled in a module, per topic.
+
+    Query params:
+        week: Optional - comma separated week numbers, e.g. week=3 or week=3,4
+    """
+    if not Module.objects.filter(id=module_id).exists():
+        return Response(
+            {'error': 'Module not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    weeks = [week.strip() for week in request.GET.get('week', '').split(',') if week.strip()]
+    return Response(get_module_analytics(module_id, weeks))
+
+
 @api_view(['GET'])
 def get_bloom_summary(request):
     """
@@ -928,9 +1050,6 @@ def get_bloom_progression(request):
         else:
             records = StudentBloomRecord.objects.filter(student=student)
         
-        # Debug: Log the query
-        print(f"Found {records.count()} bloom records for student {student_id}")
-        
         if not records.exists():
             return Response(
                 {'error': 'No bloom records found for this student'},
@@ -943,9 +1062,6 @@ def get_bloom_progression(request):
             module_name = record.module.name
             bloom_summary = record.bloom_summary
             
-            print(f"Processing module: {module_name}")
-            print(f"Bloom summary keys: {list(bloom_summary.keys())}")
-            
             # bloom_summary structure: { "topic_id": { "Remember": 5, ... } }
             for topic_id, level_counts in bloom_summary.items():
                 # Fetch the actual topic name from the database
@@ -958,11 +1074,10 @@ def get_bloom_progression(request):
                         'topic': topic_name,
                         'bloom_level_counts': level_counts
                     })
-                    print(f"Added topic: {topic_name} (ID: {topic_id})")
                     
                 except Topic.DoesNotExist:
                     # Log missing topics but continue processing
-                    print(f"WARNING: Topic with ID {topic_id} does not exist in database")
+                    logger.warning("bloom_progression.missing_topic", topic_id=topic_id)
                     continue
         
         if not result:
@@ -971,16 +1086,14 @@ def get_bloom_progression(request):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        print(f"Returning {len(result)} topic progression entries")
+        logger.debug("bloom_progression.done", student_id=student_id, entries=len(result))
         
         return Response({
             'data': result
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
-        print(f"Error in get_bloom_progression: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("bloom_progression.error", error=str(e))
         
         return Response(
             {'error': str(e)},
@@ -1012,13 +1125,12 @@ def initialize_bloom_from_scenario(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        print(f"\n{'='*60}")
-        print(f"Bloom Update Request Received")
-        print(f"{'='*60}")
-        print(f"Student ID: {student_id}")
-        print(f"Module ID: {module_id}")
-        print(f"Chat filepath: {chat_filepath}")
-        print(f"{'='*60}\n")
+        logger.info(
+            "bloom_initialize.request",
+            student_id=student_id,
+            module_id=module_id,
+            file=chat_filepath,
+        )
         
         # Check if file exists
         import os
@@ -1054,10 +1166,6 @@ def initialize_bloom_from_scenario(request):
             # Get updated bloom summary
             record = StudentBloomRecord.objects.get(student=student, module=module)
             
-            print(f"\n{'='*60}")
-            print("✓ Bloom taxonomy successfully updated!")
-            print(f"{'='*60}\n")
-            
             return Response({
                 'success': True,
                 'message': f'Bloom taxonomy updated successfully for {student.name}',
@@ -1067,9 +1175,7 @@ def initialize_bloom_from_scenario(request):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"\nERROR during bloom update: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("bloom_initialize.update_error", error=str(e))
             
             return Response(
                 {'error': f'Failed to update Bloom taxonomy: {str(e)}'},
@@ -1077,11 +1183,72 @@ def initialize_bloom_from_scenario(request):
             )
             
     except Exception as e:
-        print(f"\nERROR in initialize_bloom_from_scenario: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("bloom_initialize.error", error=str(e))
         
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+# ==================== STUDY-TIME PREDICTIONS ====================
+
+@api_view(['GET'])
+def student_topic_predictions(request, student_id):
+    """
+    Predicted study hours for every topic of a student (same payload as the
+    Flask GET /student/<student_id>/topics), served in-process.
+    """
+    try:
+        results = predictions.predict_student_topics(student_id)
+        return Response({
+            'success': True,
+            'student_id': student_id,
+            'topics': results,
+            'total_topics': len(results),
+            'message': 'Predictions generated successfully'
+        })
+    except Exception as e:
+        logger.exception("predictions.topics_error", student_id=student_id, error=str(e))
+        return Response(
+            {'success': False, 'error': str(e), 'message': 'Failed to get predictions'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def predict_topic(request):
+    """
+    Predict a single topic.
+    Request body: {"student_id": "...", "topic_id": "..."}
+    """
+    student_id = request.data.get('student_id')
+    topic_id = request.data.get('topic_id')
+    if not student_id or not topic_id:
+        return Response(
+            {'success': False, 'error': 'Missing student_id or topic_id'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        prediction = predictions.predict_topic(student_id, topic_id)
+        return Response({
+            'success': True,
+            **prediction,
+            'student_id': student_id,
+            'topic_id': topic_id
+        })
+    except Exception as e:
+        logger.exception("predictions.predict_error", student_id=student_id, topic_id=topic_id, error=str(e))
+        return Response(
+            {'success': False, 'error': str(e), 'message': 'Prediction failed'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+def predictions_ready(request):
+    """Readiness of the in-process model: 503 until the artifacts are loaded."""
+    body = predictions.readiness()
+    body['ready'] = body['model_warm']
+    return Response(body, status=status.HTTP_200_OK if body['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the Bloom, quiz and analytics hot paths and prediction service startup.
+
+Run from nala/backend:
+    python -m benchmarks run --messages 10000,100000 --output results.json
+    python -m benchmarks run --baseline baseline.json
+    python -m benchmarks compare results.json baseline.json
+"""
@@ -0,0 +1,110 @@
+import argparse
+import os
+import sys
+
+import django
+
+# Set up Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nala_backend.settings')
+django.setup()
+
+from benchmarks.harness import (
+    build_report,
+    compare_reports,
+    format_comparison,
+    load_report,
+    save_report,
+)
+from benchmarks.scenarios import SCENARIOS
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="NALA backend benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmark scenarios and write a JSON report")
+    run.add_argument("--scenarios", default=",".join(SCENARIOS),
+                     help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    run.add_argument("--messages", type=_int_list, default=[10000],
+                     help="Chat history sizes, e.g. 10000,100000,1000000")
+    run.add_argument("--students", type=int, default=100)
+    run.add_argument("--topics", type=int, default=8)
+    run.add_argument("--questions", type=int, default=10)
+    run.add_argument("--history", type=_int_list, default=[100, 1000],
+                     help="Completed quizzes per student for quiz_history, e.g. 100,1000,10000")
+    run.add_argument("--iterations", type=int, default=5)
+    run.add_argument("--prediction-url",
+                     help="Base URL of a running Flask prediction service to also time over HTTP")
+    run.add_argument("--output", default="benchmark_results.json")
+    run.add_argument("--baseline", help="Compare against a previously saved report")
+    run.add_argument("--threshold", type=float, default=0.10,
+                     help="Allowed regression as a fraction (default 0.10)")
+
+    compare = sub.add_parser("compare", help="Compare two saved reports")
+    compare.add_argument("current")
+    compare.add_argument("baseline")
+    compare.add_argument("--threshold", type=float, default=0.10)
+
+    return parser.parse_args(argv)
+
+
+def run(args) -> int:
+    selected = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        print(f"ERROR: Unknown scenario(s): {', '.join(unknown)}")
+        return 2
+
+    config = {
+        "messages": args.messages,
+        "students": args.students,
+        "topics": args.topics,
+        "questions": args.questions,
+        "history": args.history,
+        "iterations": args.iterations,
+        "prediction_url": args.prediction_url,
+    }
+
+    results = []
+    for name in selected:
+        print(f"Running {name}...")
+        for result in SCENARIOS[name](config):
+            print(
+                f"  {result['name']} {result['params']}: "
+                f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                f"throughput={result['throughput_per_s']}/s queries={result['queries_per_iteration']} "
+                f"peak_rss={result['peak_rss_mb']}MB"
+                + (f" table_hit_rate={result['table_hit_rate']:.1%}" if result.get("table_hit_rate") is not None else "")
+            )
+            results.append(result)
+
+    report = build_report(results)
+    save_report(report, args.output)
+    print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        comparison = compare_reports(report, load_report(args.baseline), args.threshold)
+        print(format_comparison(comparison))
+        return 1 if comparison["regressions"] else 0
+    return 0
+
+
+def compare(args) -> int:
+    comparison = compare_reports(load_report(args.current), load_report(args.baseline), args.threshold)
+    print(format_comparison(comparison))
+    return 1 if comparison["regressions"] else 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
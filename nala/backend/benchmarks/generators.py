@@ -0,0 +1,183 @@
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+BLOOM_LEVELS = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
+
+BENCH_PREFIX = "bench"
+
+_SAMPLE_PHRASES = [
+    "What is the definition of a matrix inverse?",
+    "Can you explain why the determinant must be non-zero?",
+    "How would I apply row reduction to this system?",
+    "Compare eigenvalues of A and its transpose.",
+    "Is this proof that AB = BA correct for diagonal matrices?",
+    "Design a transformation that rotates and then scales a vector.",
+]
+
+
+# -------------------- In-memory payloads --------------------
+
+def make_topics(num_topics: int) -> List[Dict]:
+    """Topic dicts in the shape returned by blooms.load_topics_from_db."""
+    return [
+        {
+            'id': f"{BENCH_PREFIX}-topic-{i}",
+            'name': f"Benchmark Topic {i}",
+            'description': f"Synthetic topic {i}",
+        }
+        for i in range(1, num_topics + 1)
+    ]
+
+
+def make_messages(num_messages: int, seed: int = 42) -> List[Dict]:
+    """
+    Chat history messages alternating user/assistant, using the same
+    msg_text JSON-array encoding as the exported chat history files.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 9, 1, 9, 0, 0)
+    messages = []
+    for i in range(num_messages):
+        sender = "user" if i % 2 == 0 else "assistant"
+        phrase = rng.choice(_SAMPLE_PHRASES)
+        if sender == "user":
+            msg_text = json.dumps([{"type": "text", "text": phrase}])
+        else:
+            msg_text = f"Here is an explanation: {phrase}"
+        messages.append({
+            "msg_id": i + 1,
+            "msg_sender": sender,
+            "msg_text": msg_text,
+            "msg_timestamp": (start + timedelta(seconds=30 * i)).isoformat(),
+        })
+    return messages
+
+
+def write_messages_file(path: str, num_messages: int, seed: int = 42) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(make_messages(num_messages, seed=seed), f)
+    return path
+
+
+def make_questions(topic_ids: List[str], num_questions: int, seed: int = 42) -> List[Dict]:
+    """Multiple choice questions in the normalised quiz_generator format."""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(num_questions):
+        questions.append({
+            "question": f"Synthetic question {i + 1}?",
+            "options": {"A": "Option A", "B": "Option B", "C": "Option C", "D": "Option D"},
+            "answer": rng.choice("ABCD"),
+            "bloom_level": BLOOM_LEVELS[i % len(BLOOM_LEVELS)],
+            "topic_id": topic_ids[i % len(topic_ids)],
+        })
+    return questions
+
+
+def make_answers(questions: List[Dict], accuracy: float = 0.7, seed: int = 42) -> Dict[str, str]:
+    rng = random.Random(seed)
+    answers = {}
+    for idx, question in enumerate(questions):
+        if rng.random() < accuracy:
+            answers[str(idx)] = question["answer"]
+        else:
+            answers[str(idx)] = rng.choice([opt for opt in "ABCD" if opt != question["answer"]])
+    return answers
+
+
+def fake_classification(topics: List[Dict], seed: int = 42):
+    """
+    Build a drop-in replacement for services.classifier.classify that returns
+    deterministic topic/level labels without calling the LLM endpoint.
+    """
+    rng = random.Random(seed)
+    topic_ids = [t['id'] for t in topics]
+
+    def classify(text, system=None, timeout_s=30.0):
+        payload = {"topic_id": rng.choice(topic_ids), "bloom_level": rng.choice(BLOOM_LEVELS)}
+        return {"text": json.dumps(payload), "model": "benchmark-fake", "usage": {}}
+
+    return classify
+
+
+def fake_quiz_generator(seed: int = 42):
+    """Drop-in replacement for services.quiz_generator.generate_quiz."""
+    rng = random.Random(seed)
+
+    def generate_quiz(topic_name, module_name, bloom_levels, num_questions=10):
+        levels = list(bloom_levels) or ["Remember"]
+        return [
+            {
+                "question": f"{topic_name} question {i + 1}?",
+                "options": {"A": "Option A", "B": "Option B", "C": "Option C", "D": "Option D"},
+                "answer": rng.choice("ABCD"),
+                "bloom_level": levels[i % len(levels)],
+            }
+            for i in range(int(num_questions))
+        ]
+
+    return generate_quiz
+
+
+# -------------------- Database fixtures --------------------
+
+def create_fixtures(num_students: int, num_topics: int, num_questions: int, with_quizzes: bool = True) -> Dict:
+    """
+    Create a synthetic module, its topics, enrolled students and (unless
+    with_quizzes is False) one weekly quiz per student. Callers are expected
+    to run this inside a transaction that is rolled back afterwards.
+    """
+    from app.models import Module, Student, Topic, StudentQuizHistory
+
+    module = Module.objects.create(
+        id=f"{BENCH_PREFIX}-module",
+        index="BENCH",
+        name="Benchmark Module",
+    )
+    topics = [
+        Topic.objects.create(
+            id=topic['id'],
+            name=topic['name'],
+            summary=topic['description'],
+            module=module,
+            week_no=str((i % 13) + 1),
+        )
+        for i, topic in enumerate(make_topics(num_topics))
+    ]
+
+    students = Student.objects.bulk_create([
+        Student(
+            id=f"{BENCH_PREFIX}-student-{i}",
+            name=f"Benchmark Student {i}",
+            email=f"{BENCH_PREFIX}-student-{i}@example.com",
+        )
+        for i in range(1, num_students + 1)
+    ])
+    Student.enrolled_modules.through.objects.bulk_create([
+        Student.enrolled_modules.through(student_id=student.id, module_id=module.id)
+        for student in students
+    ])
+
+    topic_ids = [topic.id for topic in topics]
+    questions = make_questions(topic_ids, num_questions)
+    quizzes = []
+    for student in (students if with_quizzes else []):
+        quiz = StudentQuizHistory.objects.create(
+            student=student,
+            module=module,
+            quiz_data={'questions': questions, 'quiz_type': 'weekly', 'topic_ids': topic_ids},
+            student_answers={},
+            quiz_type='weekly',
+        )
+        quiz.topics_covered.set(topics)
+        quizzes.append(quiz)
+
+    return {
+        'module': module,
+        'topics': topics,
+        'students': students,
+        'quizzes': quizzes,
+        'questions': questions,
+    }
@@ -0,0 +1,169 @@
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Metrics where a higher value is better; everything else is "lower is better".
+HIGHER_IS_BETTER = {"throughput_per_s"}
+
+COMPARED_METRICS = ["p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "queries_per_iteration", "peak_rss_mb"]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process. ru_maxrss is bytes on macOS, KiB elsewhere."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 2)
+    return round(peak / 1024, 2)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * (pct / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow stdout produced by the code under test so the report stays readable."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(
+    name: str,
+    fn: Callable[[], None],
+    iterations: int = 5,
+    warmup: int = 1,
+    items_per_iteration: int = 1,
+    params: Optional[Dict] = None,
+) -> Dict:
+    """
+    Run `fn` repeatedly and collect latency percentiles, throughput, query
+    counts and peak RSS. Throughput is reported in items (messages, quizzes,
+    ...) per second rather than calls per second.
+    """
+    with quiet():
+        for _ in range(warmup):
+            fn()
+
+    latencies = []
+    query_counts = []
+    query_times = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as queries, quiet():
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        latencies.append(elapsed * 1000)
+        query_counts.append(len(queries.captured_queries))
+        query_times.append(sum(float(q.get('time') or 0) for q in queries.captured_queries) * 1000)
+
+    latencies.sort()
+    total_seconds = sum(latencies) / 1000
+    return {
+        "name": name,
+        "params": params or {},
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_per_s": round((items_per_iteration * iterations) / total_seconds, 2) if total_seconds else 0.0,
+        "queries_per_iteration": round(sum(query_counts) / len(query_counts), 2),
+        "query_time_ms_per_iteration": round(sum(query_times) / len(query_times), 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# -------------------- Reports --------------------
+
+def build_report(results: List[Dict]) -> Dict:
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "results": results,
+    }
+
+
+def save_report(report: Dict, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _result_key(result: Dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result.get("params", {}).items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare_reports(current: Dict, baseline: Dict, threshold: float = 0.10) -> Dict:
+    """
+    Compare two reports scenario by scenario. A metric regresses when it is
+    worse than the baseline by more than `threshold` (a fraction).
+    """
+    baseline_results = {_result_key(r): r for r in baseline.get("results", [])}
+    comparisons = []
+    regressions = 0
+
+    for result in current.get("results", []):
+        key = _result_key(result)
+        base = baseline_results.get(key)
+        if base is None:
+            comparisons.append({"scenario": key, "status": "new"})
+            continue
+
+        metrics = {}
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old in (None, 0) or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            regressed = worse > threshold
+            regressions += int(regressed)
+            metrics[metric] = {
+                "baseline": old,
+                "current": new,
+                "change_pct": round(change * 100, 2),
+                "regressed": regressed,
+            }
+        comparisons.append({"scenario": key, "status": "compared", "metrics": metrics})
+
+    return {"threshold_pct": threshold * 100, "regressions": regressions, "scenarios": comparisons}
+
+
+def format_comparison(comparison: Dict) -> str:
+    out = io.StringIO()
+    out.write(f"Regression threshold: {comparison['threshold_pct']:.1f}%\n")
+    for scenario in comparison["scenarios"]:
+        out.write(f"\n{scenario['scenario']}\n")
+        if scenario["status"] == "new":
+            out.write("  (no baseline)\n")
+            continue
+        for metric, values in scenario["metrics"].items():
+            flag = "  REGRESSION" if values["regressed"] else ""
+            out.write(
+                f"  {metric:<24} {values['baseline']:>12} -> {values['current']:>12} "
+                f"({values['change_pct']:+.2f}%){flag}\n"
+            )
+    out.write(f"\nTotal regressions: {comparison['regressions']}\n")
+    return out.getvalue()
@@ -0,0 +1,396 @@
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+from unittest import mock
+
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from benchmarks import generators
+from benchmarks.harness import measure
+
+
+@contextlib.contextmanager
+def rolled_back():
+    """Run a block inside a transaction that never commits, so fixtures never leak."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def bench_classify_messages(config: Dict) -> List[Dict]:
+    from app.services import blooms
+
+    results = []
+    topics = generators.make_topics(config["topics"])
+    for num_messages in config["messages"]:
+        messages = generators.make_messages(num_messages)
+        with mock.patch.object(blooms, "classify", generators.fake_classification(topics)):
+            results.append(measure(
+                "classify_messages_by_topic_and_taxonomy",
+                lambda: blooms.classify_messages_by_topic_and_taxonomy(messages, topics),
+                iterations=config["iterations"],
+                items_per_iteration=num_messages,
+                params={"messages": num_messages, "topics": config["topics"]},
+            ))
+    return results
+
+
+def bench_update_bloom_from_chathistory(config: Dict) -> List[Dict]:
+    from app.services import blooms
+
+    results = []
+    with rolled_back():
+        fixtures = generators.create_fixtures(1, config["topics"], config["questions"])
+        student = fixtures["students"][0]
+        module_id = fixtures["module"].id
+        topics = blooms.load_topics_from_db(module_id)
+
+        for num_messages in config["messages"]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = generators.write_messages_file(os.path.join(tmp_dir, "chat.json"), num_messages)
+                with mock.patch.object(blooms, "classify", generators.fake_classification(topics)):
+                    results.append(measure(
+                        "update_bloom_from_chathistory",
+                        lambda: blooms.update_bloom_from_chathistory(student, module_id, path),
+                        iterations=config["iterations"],
+                        items_per_iteration=num_messages,
+                        params={"messages": num_messages, "topics": config["topics"]},
+                    ))
+    return results
+
+
+def bench_submit_quiz(config: Dict) -> List[Dict]:
+    """submit_quiz through the DRF view, which also runs update_bloom_from_quiz."""
+    from app import views
+
+    factory = APIRequestFactory()
+    with rolled_back():
+        fixtures = generators.create_fixtures(config["students"], config["topics"], config["questions"])
+        payloads = [
+            (quiz.id, {
+                "student_id": quiz.student_id,
+                "answers": generators.make_answers(fixtures["questions"], seed=index),
+            })
+            for index, quiz in enumerate(fixtures["quizzes"])
+        ]
+
+        def submit_all():
+            for quiz_id, payload in payloads:
+                request = factory.post(f"/api/quiz/{quiz_id}/submit/", payload, format="json")
+                response = views.submit_quiz(request, quiz_history_id=quiz_id)
+                if response.status_code != 200:
+                    raise RuntimeError(f"submit_quiz failed: {response.data}")
+
+        return [measure(
+            "submit_quiz",
+            submit_all,
+            iterations=config["iterations"],
+            items_per_iteration=len(payloads),
+            params={"students": config["students"], "questions": config["questions"]},
+        )]
+
+
+def bench_save_quiz_answer(config: Dict) -> List[Dict]:
+    """One save_quiz_answer click per student, through the DRF view."""
+    from app import views
+
+    factory = APIRequestFactory()
+    with rolled_back():
+        fixtures = generators.create_fixtures(config["students"], config["topics"], config["questions"])
+        quizzes = fixtures["quizzes"]
+        answers = generators.make_answers(fixtures["questions"])
+        clicks = [
+            (quiz.id, {
+                "student_id": quiz.student_id,
+                "question_index": index % len(fixtures["questions"]),
+                "answer": answers[str(index % len(fixtures["questions"]))],
+            })
+            for index, quiz in enumerate(quizzes)
+        ]
+
+        def click_all():
+            for quiz_id, payload in clicks:
+                request = factory.patch(f"/api/quiz/{quiz_id}/answer/", payload, format="json")
+                response = views.save_quiz_answer(request, quiz_history_id=quiz_id)
+                if response.status_code != 200:
+                    raise RuntimeError(f"save_quiz_answer failed: {response.data}")
+
+        return [measure(
+            "save_quiz_answer",
+            click_all,
+            iterations=config["iterations"],
+            items_per_iteration=len(clicks),
+            params={"students": config["students"], "questions": config["questions"]},
+        )]
+
+
+def bench_quiz_history(config: Dict) -> List[Dict]:
+    """First page of get_quiz_history for students with growing numbers of completed quizzes."""
+    from app import views
+    from app.models import QuizPayload, StudentQuizHistory
+
+    factory = APIRequestFactory()
+    results = []
+    with rolled_back():
+        fixtures = generators.create_fixtures(1, config["topics"], config["questions"])
+        student = fixtures["students"][0]
+        payload = QuizPayload.for_questions(fixtures["questions"])
+        created = 0
+        for history_size in sorted(config["history"]):
+            StudentQuizHistory.objects.bulk_create([
+                StudentQuizHistory(
+                    student=student,
+                    module=fixtures["module"],
+                    payload=payload,
+                    num_questions=len(fixtures["questions"]),
+                    completed=True,
+                    score=50.0,
+                )
+                for _ in range(history_size - created)
+            ], batch_size=1000)
+            created = history_size
+
+            def first_page():
+                request = factory.get(f"/api/student/{student.id}/quiz-history/")
+                response = views.get_quiz_history(request, student_id=student.id)
+                if response.status_code != 200:
+                    raise RuntimeError(f"get_quiz_history failed: {response.data}")
+
+            results.append(measure(
+                "get_quiz_history",
+                first_page,
+                iterations=config["iterations"],
+                params={"history": history_size, "questions": config["questions"]},
+            ))
+    return results
+
+
+def bench_regrade(config: Dict) -> List[Dict]:
+    """Regrade every submitted attempt of one weekly quiz after an answer key correction."""
+    from app.models import StudentQuizHistory
+    from app.services import grading
+
+    with rolled_back():
+        fixtures = generators.create_fixtures(config["students"], config["topics"], config["questions"])
+        quizzes = fixtures["quizzes"]
+        for index, quiz in enumerate(quizzes):
+            quiz.student_answers = generators.make_answers(fixtures["questions"], seed=index)
+            quiz.completed = True
+        StudentQuizHistory.objects.bulk_update(quizzes, ['student_answers', 'completed'])
+        payload_id = quizzes[0].payload_id
+        first_answer = fixtures["questions"][0]["answer"]
+        keys = iter([{0: answer} for answer in "ABCD" if answer != first_answer] * (config["iterations"] + 1))
+
+        return [measure(
+            "regrade_payload",
+            lambda: grading.regrade_payload(payload_id, next(keys)),
+            iterations=config["iterations"],
+            items_per_iteration=len(quizzes),
+            params={"students": config["students"], "questions": config["questions"]},
+        )]
+
+
+def bench_provision_weekly_quiz(config: Dict) -> List[Dict]:
+    """provision_weekly_quiz for a whole cohort, then the idempotent rerun that finds nothing to do."""
+    from app.services.quiz_provisioning import provision_weekly_quiz
+
+    with rolled_back():
+        fixtures = generators.create_fixtures(
+            config["students"], config["topics"], config["questions"], with_quizzes=False
+        )
+        module_id = fixtures["module"].id
+        topic_ids = [topic.id for topic in fixtures["topics"]]
+        params = {"students": config["students"], "topics": len(topic_ids), "questions": config["questions"]}
+
+        results = []
+        for name in ("provision_weekly_quiz", "provision_weekly_quiz_rerun"):
+            # The first run does the work once; later runs are the idempotent no-op.
+            results.append(measure(
+                name,
+                lambda: provision_weekly_quiz(module_id, topic_ids, fixtures["questions"]),
+                iterations=1 if name == "provision_weekly_quiz" else config["iterations"],
+                warmup=0,
+                items_per_iteration=config["students"],
+                params=params,
+            ))
+        return results
+
+
+def bench_generate_custom_quiz(config: Dict) -> List[Dict]:
+    """generate_custom_quiz with the LLM replaced by a synthetic generator."""
+    from app import views
+
+    factory = APIRequestFactory()
+    with rolled_back():
+        fixtures = generators.create_fixtures(1, config["topics"], config["questions"])
+        module_id = fixtures["module"].id
+        payload = {
+            "student_id": fixtures["students"][0].id,
+            "num_questions": config["questions"],
+            "bloom_levels": ["Remember", "Understand", "Apply"],
+        }
+
+        def generate():
+            request = factory.post(f"/api/module/{module_id}/quiz/generate/", payload, format="json")
+            response = views.generate_custom_quiz(request, module_id=module_id)
+            if response.status_code != 201:
+                raise RuntimeError(f"generate_custom_quiz failed: {response.data}")
+
+        with mock.patch.object(views, "generate_quiz", generators.fake_quiz_generator()):
+            return [measure(
+                "generate_custom_quiz",
+                generate,
+                iterations=config["iterations"],
+                params={"topics": config["topics"], "questions": config["questions"]},
+            )]
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loads app.py by path: the `app` Django package shadows it as a module name.
+_FLASK_STARTUP_SCRIPT = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("flask_app", {path!r})
+flask_app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(flask_app)
+if {warm!r}:
+    flask_app.warmup()
+"""
+
+
+def bench_flask_startup(config: Dict) -> List[Dict]:
+    """Wall time of a fresh interpreter importing the Flask prediction app, cold and warmed up."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [BACKEND_DIR, os.path.join(BACKEND_DIR, "prediction_model"), env.get("PYTHONPATH", "")]
+    )
+    results = []
+    for warm in (False, True):
+        script = _FLASK_STARTUP_SCRIPT.format(path=os.path.join(BACKEND_DIR, "app.py"), warm=warm)
+
+        def start():
+            subprocess.run([sys.executable, "-c", script], env=env, cwd=BACKEND_DIR, check=True,
+                           stdout=subprocess.DEVNULL)
+
+        results.append(measure(
+            "flask_startup",
+            start,
+            iterations=config["iterations"],
+            params={"warmup": warm},
+        ))
+    return results
+
+
+def _load_flask_app():
+    """Import app.py (the standalone Flask prediction service) by path."""
+    import importlib.util
+
+    name = "flask_prediction_app"
+    if name not in sys.modules:
+        prediction_model_dir = os.path.join(BACKEND_DIR, "prediction_model")
+        if prediction_model_dir not in sys.path:
+            sys.path.append(prediction_model_dir)
+        spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND_DIR, "app.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def bench_prediction_api(config: Dict) -> List[Dict]:
+    """
+    GET student topics with predictions through the in-process DRF view and
+    through the Flask app (test client, same process, same warm registry), so
+    the difference is framework overhead. With --prediction-url the running
+    Flask service is also called over HTTP, which adds the cross-service hop.
+    """
+    import urllib.request
+
+    from app import views
+    from app.models import StudentQuizHistory
+    from app.services import prediction_features, predictions
+
+    predictions.warmup()
+    flask_client = _load_flask_app().create_app().test_client()
+    factory = APIRequestFactory()
+    results = []
+    with rolled_back():
+        fixtures = generators.create_fixtures(config["students"], config["topics"], config["questions"])
+        student_ids = [student.id for student in fixtures["students"]]
+        params = {"students": len(student_ids), "topics": config["topics"]}
+
+        # Completed quizzes scored k/n*100 over quiz lengths 3-12, so many grades are fractional
+        # (off the prediction table) as with real quizzes
+        quizzes = fixtures["quizzes"]
+        for index, quiz in enumerate(quizzes):
+            num_questions = 3 + index % 10
+            quiz.completed = True
+            quiz.score = (index * 7 % (num_questions + 1)) / num_questions * 100
+        StudentQuizHistory.objects.bulk_update(quizzes, ['completed', 'score'])
+
+        table = predictions.get_registry().get().table
+        feature_rows = [
+            row for student_id in student_ids
+            for row in predictions.collect_topic_features(student_id, predictions.get_student_topics(student_id))
+        ]
+        columns = predictions.prepare_batch_prediction_columns(feature_rows)
+        table_hit_rate = round(float(table.lookup(columns)[1].mean()), 4) if table is not None and feature_rows else None
+
+        def via_drf():
+            for student_id in student_ids:
+                request = factory.get(f"/api/student/{student_id}/topics/")
+                response = views.student_topic_predictions(request, student_id=student_id)
+                if response.status_code != 200:
+                    raise RuntimeError(f"student_topic_predictions failed: {response.data}")
+
+        def via_flask():
+            for student_id in student_ids:
+                response = flask_client.get(f"/student/{student_id}/topics")
+                if response.status_code != 200:
+                    raise RuntimeError(f"Flask /student/<id>/topics failed: {response.get_json()}")
+
+        targets = [("predictions_drf", via_drf), ("predictions_flask", via_flask)]
+        if config.get("prediction_url"):
+            base_url = config["prediction_url"].rstrip("/")
+
+            def via_flask_http():
+                for student_id in student_ids:
+                    with urllib.request.urlopen(f"{base_url}/student/{student_id}/topics") as response:
+                        response.read()
+
+            # The remote service cannot see the rolled-back fixtures, only the transport cost matters here.
+            targets.append(("predictions_flask_http", via_flask_http))
+
+        try:
+            for name, fn in targets:
+                result = measure(
+                    name,
+                    fn,
+                    iterations=config["iterations"],
+                    items_per_iteration=len(student_ids),
+                    params=params,
+                )
+                result["table_hit_rate"] = table_hit_rate
+                results.append(result)
+        finally:
+            for student_id in student_ids:
+                prediction_features.invalidate_student_features(student_id)
+    return results
+
+
+SCENARIOS = {
+    "classify": bench_classify_messages,
+    "chathistory": bench_update_bloom_from_chathistory,
+    "submit_quiz": bench_submit_quiz,
+    "generate_quiz": bench_generate_custom_quiz,
+    "save_answer": bench_save_quiz_answer,
+    "quiz_history": bench_quiz_history,
+    "regrade": bench_regrade,
+    "provision": bench_provision_weekly_quiz,
+    "startup": bench_flask_startup,
+    "predictions": bench_prediction_api,
+}
@@ -1,25 +1,15 @@
 # Model gets Bloom's level for specific student and topic 
 
-from app.models import StudentBloomLevel
-
-BLOOM_ORDER = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
-
-def get_highest_blooms_level(blooms_dict):
-    """Return the highest Bloom's level that has a non-zero count."""
-    if not blooms_dict:
-        return None
-    for level in reversed(BLOOM_ORDER):
-        if blooms_dict.get(level, 0) > 0:
-            return level
-    return None
+from app.services.prediction_features import (
+    BLOOM_ORDER,
+    get_highest_blooms_level,
+    get_student_features,
+)
 
 def get_blooms_level(student_id, topic_id):
     """Fetch the highest Bloom's level for a given student + topic."""
-    try:
-        entry = StudentBloomLevel.objects.get(student_id=student_id, node_id=topic_id)
-        return get_highest_blooms_level(entry.blooms_level)
-    except StudentBloomLevel.DoesNotExist:
-        return None
+    features = get_student_features(student_id)
+    return features['blooms_level'].get(str(topic_id))
 
 
 # blooms_dict looks like this:
@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for the Flask prediction service (see prediction_wsgi.py).
+
+    gunicorn -c gunicorn.conf.py prediction_wsgi:application
+
+Concurrency is set through the environment, no code changes needed:
+    PREDICTION_BIND      address to listen on (default 0.0.0.0:5000)
+    PREDICTION_WORKERS   worker processes (default: one per CPU)
+    PREDICTION_THREADS   request threads per worker (default 4)
+    PREDICTION_TIMEOUT   seconds before a silent worker is restarted (default 30)
+    PREDICTION_MAX_REQUESTS  recycle a worker after this many requests (0 = never)
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('PREDICTION_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('PREDICTION_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('PREDICTION_THREADS', '4'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.getenv('PREDICTION_TIMEOUT', '30'))
+max_requests = int(os.getenv('PREDICTION_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Import prediction_wsgi (and with it the model artifacts) in the master before forking.
+preload_app = True
+
+accesslog = os.getenv('PREDICTION_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('PREDICTION_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Database connections must not be shared across processes; each worker opens its own.
+    try:
+        from django.conf import settings
+    except ImportError:
+        return
+    if settings.configured:
+        from django.db import connections
+        connections.close_all()
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nala_backend.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings
+
+if settings.PREDICTION_PRELOAD:
+    from app.services import predictions
+    predictions.warmup()
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -130,4 +131,67 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 import os
 
 BASE_URL = os.getenv("BASE_URL", "https://nala.ntu.edu.sg")
-API_KEY = os.getenv("API_KEY", "pk_SleepDeprivedAtFour_11adfhkl9903")
\ No newline at end of file
+API_KEY = os.getenv("API_KEY", "pk_SleepDeprivedAtFour_11adfhkl9903")
+
+# Caching
+# Use a shared backend (e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache,
+# CACHE_LOCATION=redis://127.0.0.1:6379) so invalidations reach every process,
+# including the Flask prediction service.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", "nala-default"),
+    }
+}
+
+# Seconds a student's assembled prediction features stay cached.
+PREDICTION_FEATURE_CACHE_TTL = int(os.getenv("PREDICTION_FEATURE_CACHE_TTL", "300"))
+# Module-wide Bloom analytics; entries are also invalidated on every Bloom record update.
+BLOOM_ANALYTICS_CACHE_TTL = int(os.getenv("BLOOM_ANALYTICS_CACHE_TTL", "600"))
+
+# Study-time model (app.services.predictions): project root of prediction_model, and
+# whether the WSGI/ASGI entry points load the model before serving (e.g. with
+# gunicorn --preload so workers share it).
+PREDICTION_MODEL_DIR = Path(os.getenv("PREDICTION_MODEL_DIR", BASE_DIR / "prediction_model"))
+PREDICTION_PRELOAD = os.getenv("PREDICTION_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+# Request metrics (app.middleware.RequestMetricsMiddleware)
+# Fraction of requests that are timed and query-profiled, 0.0 - 1.0.
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "0.1"))
+# Allow clients to request a Server-Timing header with `X-Server-Timing: 1`.
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+# Logging
+# LOG_LEVEL sets the default level; LOG_LEVELS overrides individual modules,
+# e.g. LOG_LEVELS="app.services.blooms=DEBUG,app.views=WARNING".
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {
+            '()': 'app.services.structured_logging.KeyValueFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'structured',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        # Replace Django's default console handler; records reach the root handler once
+        'django': {'handlers': [], 'propagate': True},
+    },
+}
+
+for _item in os.getenv("LOG_LEVELS", "").split(","):
+    _name, _sep, _level = _item.partition("=")
+    if _sep and _name.strip() and _level.strip():
+        LOGGING['loggers'].setdefault(_name.strip(), {})['level'] = _level.strip().upper()
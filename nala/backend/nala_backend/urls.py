@@ -6,6 +6,7 @@ from django.db import transaction
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.homepage_view, name="homepage"),
+    path('api/metrics/', views.metrics_view, name="metrics"),
 
     # Students
     path('api/student/<str:pk>/', views.getStudent, name='get_student'),
@@ -30,6 +31,7 @@ urlpatterns = [
     path('api/module/<str:module_id>/quiz/weekly/', views.get_weekly_quiz, name='get_weekly_quiz'),
     path('api/module/<str:module_id>/quiz/generate/', views.generate_custom_quiz, name='generate_custom_quiz'),
     path('api/quiz/<int:quiz_history_id>/answer/', views.save_quiz_answer, name='save_quiz_answer'),
+    path('api/quiz/<int:quiz_history_id>/answers/', views.save_quiz_answers_batch, name='save_quiz_answers_batch'),
     path('api/quiz/<int:quiz_history_id>/submit/', views.submit_quiz, name='submit_quiz'),
     path('api/student/<str:student_id>/quiz-history/', views.get_quiz_history, name='get_quiz_history'),
 
@@ -40,7 +42,15 @@ urlpatterns = [
     path('api/bloom/restore/', views.restore_bloom_summary, name='restore_bloom_summary'),
     path('api/bloom/summary/', views.get_bloom_summary, name='get_bloom_summary'),
     path('api/bloom/progression/', views.get_bloom_progression, name='get_bloom_progression'),
+    path('api/module/<str:module_id>/bloom/analytics/', views.module_bloom_analytics, name='module_bloom_analytics'),
+
+    # Study-time predictions
+    path('api/student/<str:student_id>/topics/', views.student_topic_predictions, name='student_topic_predictions'),
+    path('api/predict/', views.predict_topic, name='predict_topic'),
+    path('api/predict/ready/', views.predictions_ready, name='predictions_ready'),
 
     # Learning preferences
     path('api/learning-preferences/update/', views.update_learning_preferences, name='update_learning_preferences'),
+    path('api/cohorts/learning-style/', views.learning_style_cohorts, name='learning_style_cohorts'),
+    path('api/cohorts/learning-style/<str:learning_style>/', views.learning_style_cohort, name='learning_style_cohort'),
 ]
\ No newline at end of file
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nala_backend.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.PREDICTION_PRELOAD:
+    from app.services import predictions
+    predictions.warmup()
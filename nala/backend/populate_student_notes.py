@@ -1,50 +1,79 @@
 import os
+from collections import defaultdict
 import django
 
 # Setup Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nala_backend.settings')
 django.setup()
 
-from app.models import Student, Topic, StudentNote, Concept
+from django.db.models import Exists, F, OuterRef
+from app.models import Topic, StudentNote, Concept
 
-def generate_default_notes(topic):
+BATCH_SIZE = 1000
+
+def generate_default_notes(topic, concepts=None):
     """
     Generate default notes for a topic using its summary and all related concepts.
+    `concepts` can be passed in (ordered by id) to avoid querying them again.
     """
-    # Start with the topic's summary
-    note = topic.summary or ""
-    
-    # Append concepts under this topic
-    concepts = Concept.objects.filter(related_topic=topic).order_by('id')
+    if concepts is None:
+        concepts = Concept.objects.filter(related_topic=topic).order_by('id')
+
+    # Start with the topic's summary, then one section per concept
+    parts = [topic.summary or ""]
     for concept in concepts:
-        note += f"\n\n## {concept.name}\n{concept.summary.strip() if concept.summary else ''}"
-    
-    return note
-
-def populate_student_notes():
-    students = Student.objects.all()
-    print(f"Found {students.count()} students. Populating notes...")
-
-    for student in students:
-        print(f"Processing student: {student.name} (ID: {student.id})")
-        
-        # Get all topics from modules the student is enrolled in
-        enrolled_modules = student.enrolled_modules.all()
-        topics = Topic.objects.filter(module__in=enrolled_modules)
-        
-        for topic in topics:
-            # Create StudentNote if it doesn't already exist
-            note_obj, created = StudentNote.objects.get_or_create(
-                student=student,
-                topic=topic,
-                defaults={"content": generate_default_notes(topic)}
-            )
-            if created:
-                print(f"  Created note for topic: {topic.name}")
-            else:
-                print(f"  Note already exists for topic: {topic.name}")
+        parts.append(f"\n\n## {concept.name}\n{concept.summary.strip() if concept.summary else ''}")
+    return "".join(parts)
+
+def load_default_notes(topic_ids=None):
+    """Render every topic's default note once: {topic_id: content}, with two queries in total."""
+    topics = Topic.objects.only('id', 'summary')
+    concepts = Concept.objects.filter(related_topic__isnull=False).only('id', 'name', 'summary', 'related_topic_id')
+    if topic_ids is not None:
+        topics = topics.filter(id__in=topic_ids)
+        concepts = concepts.filter(related_topic_id__in=topic_ids)
+
+    concepts_by_topic = defaultdict(list)
+    for concept in concepts.order_by('id'):
+        concepts_by_topic[concept.related_topic_id].append(concept)
+
+    return {topic.id: generate_default_notes(topic, concepts_by_topic[topic.id]) for topic in topics}
+
+def missing_note_pairs():
+    """
+    (student_id, topic_id) for every topic of every enrolled module that has no
+    StudentNote yet, found with a single anti-join query.
+    """
+    existing = StudentNote.objects.filter(student_id=OuterRef('enrolled_student_id'), topic_id=OuterRef('pk'))
+    return (
+        # Annotating first keeps a single join through the enrollment table.
+        Topic.objects.annotate(enrolled_student_id=F('module__students__id'))
+        .filter(enrolled_student_id__isnull=False)
+        .filter(~Exists(existing))
+        .order_by('enrolled_student_id', 'id')
+        .values_list('enrolled_student_id', 'id')
+    )
+
+def populate_student_notes(batch_size=BATCH_SIZE):
+    default_notes = load_default_notes()
+    print(f"Rendered default notes for {len(default_notes)} topics. Populating notes...")
+
+    # Materialised before inserting: some backends don't isolate a running cursor
+    # from writes to the table it reads on the same connection.
+    pairs = list(missing_note_pairs())
+    print(f"Found {len(pairs)} missing (student, topic) notes")
+
+    for start in range(0, len(pairs), batch_size):
+        batch = [
+            StudentNote(student_id=student_id, topic_id=topic_id, content=default_notes[topic_id])
+            for student_id, topic_id in pairs[start:start + batch_size]
+        ]
+        # ignore_conflicts: a note created meanwhile (e.g. through the notes API) is kept as is.
+        StudentNote.objects.bulk_create(batch, ignore_conflicts=True)
+        print(f"  Inserted {start + len(batch)}/{len(pairs)} notes")
 
     print("All student notes populated!")
+    return len(pairs)
 
 if __name__ == "__main__":
     populate_student_notes()
@@ -7,18 +7,18 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from dataclasses import dataclass  # to directly define class variable without __init__ using decorator @dataclass
 
-from src.components.data_transformation import DataTransformation
-from src.components.data_transformation import DataTransformationConfig
-
-from src.components.model_trainer import ModelTrainerConfig
-from src.components.model_trainer import ModelTrainer
+from src.utils import save_frame
 
 @dataclass
 class DataIngestionConfig:
     # if only defining variables then its okay to use dataclass, if have methods prefer init approach
-    train_data_path: str=os.path.join('artifacts','train.csv')
-    test_data_path: str=os.path.join('artifacts','test.csv')
-    raw_data_path: str=os.path.join('artifacts','data.csv')
+    # columnar .npz files (src.utils.save_frame), much faster to reload than CSV
+    source_data_path: str=os.path.join('Notebook','data','stud.csv')
+    train_data_path: str=os.path.join('artifacts','train.npz')
+    test_data_path: str=os.path.join('artifacts','test.npz')
+    raw_data_path: str=os.path.join('artifacts','data.npz')
+    test_size: float=0.2
+    random_state: int=42
 
 class DataIngestion:
     def __init__(self):
@@ -27,18 +27,20 @@ class DataIngestion:
     def initiate_data_ingestion(self):
         logging.info("Entered the data ingestion method")
         try:
-            df = pd.read_csv('Notebook/data/stud.csv')
+            df = pd.read_csv(self.ingestion_config.source_data_path)
             logging.info('Read the dataset as dataframe')
 
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
 
-            df.to_csv(self.ingestion_config.raw_data_path,index=False, header=True)
+            save_frame(self.ingestion_config.raw_data_path,df)
 
             logging.info("Train test validation split initiated")
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
+            train_set, test_set = train_test_split(
+                df, test_size=self.ingestion_config.test_size, random_state=self.ingestion_config.random_state
+            )
 
-            train_set.to_csv(self.ingestion_config.train_data_path, index = False, header = True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index = False, header = True)
+            save_frame(self.ingestion_config.train_data_path,train_set)
+            save_frame(self.ingestion_config.test_data_path,test_set)
 
             logging.info("Ingestion of data is completed")
 
@@ -51,12 +53,8 @@ class DataIngestion:
             raise CustomException(e,sys)
 
 if __name__ == "__main__":
-    obj = DataIngestion()
-    train_data, test_data = obj.initiate_data_ingestion()
-
-    data_transformation = DataTransformation()
-    train_arr,test_arr,_=data_transformation.initiate_data_transformation(train_data,test_data)
+    # Runs ingestion -> transformation -> training, skipping stages whose outputs are current
+    from src.pipeline.train_pipeline import TrainPipeline
 
-    model_trainer = ModelTrainer()
-    acc=model_trainer.initiate_model_trainer(train_arr,test_arr)
-    print(acc)
\ No newline at end of file
+    acc=TrainPipeline().run()
+    print(acc)
@@ -17,11 +17,14 @@ from src.exception import CustomException
 from src.logger import logging
 import os
 
-from src.utils import save_object
+from src.utils import save_object, load_frame
 
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path = os.path.join('artifacts', 'preprocessor.pkl')
+    # transformed feature arrays (+ target as last column), reused by training without refitting
+    train_arr_file_path = os.path.join('artifacts', 'train_arr.npy')
+    test_arr_file_path = os.path.join('artifacts', 'test_arr.npy')
 
 class DataTransformation:
     
@@ -69,8 +72,8 @@ class DataTransformation:
 
     def initiate_data_transformation(self,train_path,test_path):
         try:
-            train_df=pd.read_csv(train_path)
-            test_df=pd.read_csv(test_path)
+            train_df=load_frame(train_path)
+            test_df=load_frame(test_path)
 
             logging.info("Read train and test data completed")
             logging.info("Obtaining preprocessing object")
@@ -109,6 +112,9 @@ class DataTransformation:
                 input_feature_test_arr,np.array(target_feature_test_df)
             ]
 
+            np.save(self.data_transformation_config.train_arr_file_path, train_arr)
+            np.save(self.data_transformation_config.test_arr_file_path, test_arr)
+
             logging.info(f"Saved preprocessing object")
 
             save_object(
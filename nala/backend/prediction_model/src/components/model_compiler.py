@@ -0,0 +1,383 @@
+# ******************************************************************
+# * Model Compiler : export the fitted preprocessor + best model   *
+# *                  into flat NumPy arrays (CompiledPredictor)    *
+# *                  and check it against the sklearn output       *
+# ******************************************************************
+import json
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.compiled_predictor import CompiledModel, CompiledPredictor, CompiledPreprocessor
+from src.pipeline.model_bundle import save_bundle
+from src.pipeline.model_registry import artifacts_version
+from src.utils import load_object
+
+# XGBoost objectives whose prediction is the raw margin (no link function).
+IDENTITY_OBJECTIVES = {"reg:squarederror", "reg:squaredlogerror", "reg:pseudohubererror", "reg:absoluteerror"}
+
+
+@dataclass
+class ModelCompilerConfig:
+    compiled_model_file_path = os.path.join("artifacts", "model_compiled.npz")
+    bundle_dir_name = "model_bundle"
+    rtol: float = 1e-5
+    atol: float = 1e-4
+
+
+# -------------------- Preprocessor --------------------
+
+def _pipeline_steps(transformer):
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps]
+    return [transformer]
+
+
+def _scaler_params(scaler: StandardScaler, n: int):
+    # mean_ is fitted even with with_mean=False, so the flags decide what transform() applies.
+    mean = scaler.mean_ if scaler.with_mean and scaler.mean_ is not None else np.zeros(n)
+    scale = scaler.scale_ if scaler.with_std and scaler.scale_ is not None else np.ones(n)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+def _compile_numeric(columns, steps):
+    n = len(columns)
+    fill = np.full(n, np.nan)
+    mean = np.zeros(n)
+    scale = np.ones(n)
+    for step in steps:
+        if isinstance(step, SimpleImputer):
+            fill = np.asarray(step.statistics_, dtype=np.float64)
+        elif isinstance(step, StandardScaler):
+            mean_, scale_ = _scaler_params(step, n)
+            # Fold successive scalers into one affine map: ((x - m1) / s1 - m2) / s2
+            mean = mean + mean_ * scale
+            scale = scale * scale_
+        else:
+            raise ValueError(f"Unsupported numeric step {type(step).__name__}")
+    return {"kind": "numeric", "columns": list(columns), "fill": fill, "mean": mean, "scale": scale}
+
+
+def _compile_categorical(columns, steps):
+    if len(columns) != 1:
+        raise ValueError(f"Categorical pipelines must take a single column, got {columns}")
+    fill = None
+    encoder = None
+    mean = None
+    scale = None
+    for step in steps:
+        if isinstance(step, SimpleImputer) and encoder is None:
+            fill = str(step.statistics_[0])
+        elif isinstance(step, OneHotEncoder) and encoder is None:
+            if step.drop_idx_ is not None:
+                raise ValueError("OneHotEncoder(drop=...) is not supported")
+            encoder = step
+            n = len(step.categories_[0])
+            mean = np.zeros(n)
+            scale = np.ones(n)
+        elif isinstance(step, StandardScaler) and encoder is not None:
+            mean_, scale_ = _scaler_params(step, len(scale))
+            mean = mean + mean_ * scale
+            scale = scale * scale_
+        else:
+            raise ValueError(f"Unsupported categorical step {type(step).__name__}")
+    if encoder is None:
+        raise ValueError("Categorical pipeline has no OneHotEncoder")
+
+    categories = np.asarray([str(category) for category in encoder.categories_[0]])
+    if not np.all(categories[:-1] < categories[1:]):
+        raise ValueError("OneHotEncoder categories must be sorted")
+    return {
+        "kind": "onehot",
+        "columns": list(columns),
+        "fill": fill if fill is not None else "",
+        "categories": categories,
+        "mean": mean,
+        "scale": scale,
+    }
+
+
+def compile_preprocessor(preprocessor: ColumnTransformer) -> CompiledPreprocessor:
+    blocks = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder" and transformer == "drop":
+            continue
+        steps = _pipeline_steps(transformer)
+        if any(isinstance(step, OneHotEncoder) for step in steps):
+            blocks.append(_compile_categorical(columns, steps))
+        else:
+            blocks.append(_compile_numeric(columns, steps))
+    return CompiledPreprocessor(blocks)
+
+
+# -------------------- Models --------------------
+
+class _TreeBuilder:
+    '''Accumulates the nodes of several trees into shared flat arrays.'''
+
+    def __init__(self):
+        self.roots = []
+        self.feature = []
+        self.threshold = []
+        self.left = []
+        self.right = []
+        self.missing = []
+        self.value = []
+        self.max_depth = 0
+
+    def add_sklearn_tree(self, tree):
+        tree = tree.tree_
+        offset = len(self.feature)
+        self.roots.append(offset)
+        is_leaf = tree.children_left == -1
+        missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+        for node in range(tree.node_count):
+            if is_leaf[node]:
+                self._append(-1, 0.0, offset + node, offset + node, offset + node,
+                             float(tree.value[node].ravel()[0]))
+            else:
+                left = offset + tree.children_left[node]
+                right = offset + tree.children_right[node]
+                self._append(int(tree.feature[node]), float(tree.threshold[node]), left, right,
+                             left if missing_left[node] else right, 0.0)
+        self.max_depth = max(self.max_depth, int(tree.max_depth))
+
+    def add_xgboost_tree(self, dump: dict):
+        nodes = {}
+
+        def collect(node, depth):
+            nodes[node["nodeid"]] = node
+            self.max_depth = max(self.max_depth, depth)
+            for child in node.get("children", []):
+                collect(child, depth + 1)
+
+        collect(dump, 0)
+        offset = len(self.feature)
+        self.roots.append(offset + 0)
+        # XGBoost node ids are dense, so they index straight into the flat arrays.
+        for node_id in range(len(nodes)):
+            node = nodes[node_id]
+            if "leaf" in node:
+                self._append(-1, 0.0, offset + node_id, offset + node_id, offset + node_id, float(node["leaf"]))
+            else:
+                feature = node["split"]
+                feature = int(feature[1:]) if feature.startswith("f") else int(feature)
+                threshold = float(np.float32(node["split_condition"]))
+                self._append(feature, threshold, offset + node["yes"], offset + node["no"],
+                             offset + node["missing"], 0.0)
+
+    def _append(self, feature, threshold, left, right, missing, value):
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        self.left.append(left)
+        self.right.append(right)
+        self.missing.append(missing)
+        self.value.append(value)
+
+    def build(self, base, scale, strict) -> CompiledModel:
+        feature = np.asarray(self.feature, dtype=np.int32)
+        return CompiledModel(
+            kind="trees",
+            base=float(base),
+            scale=float(scale),
+            strict=strict,
+            max_depth=self.max_depth,
+            roots=np.asarray(self.roots, dtype=np.int32),
+            split_feature=np.maximum(feature, 0),
+            # XGBoost thresholds are float32 already; sklearn ones are float64 midpoints
+            # between float32 values and must stay float64 to compare exactly.
+            threshold=np.asarray(self.threshold, dtype=np.float32 if strict else np.float64),
+            children=np.column_stack([self.left, self.right]).astype(np.int32).ravel(),
+            missing=np.asarray(self.missing, dtype=np.int32),
+            value=np.asarray(self.value, dtype=np.float64),
+        )
+
+
+def _xgboost_base_score(booster) -> float:
+    config = json.loads(booster.save_config())
+    learner = config["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in IDENTITY_OBJECTIVES:
+        raise ValueError(f"XGBoost objective {objective!r} is not supported")
+    # Newer releases store the base score as a vector literal, e.g. "[1.3016614E0]".
+    return float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+
+def compile_model(model) -> CompiledModel:
+    if isinstance(model, LinearRegression):
+        return CompiledModel(
+            kind="linear",
+            coef=np.asarray(model.coef_, dtype=np.float64).ravel(),
+            intercept=float(np.ravel(model.intercept_)[0]),
+        )
+
+    builder = _TreeBuilder()
+    if isinstance(model, DecisionTreeRegressor):
+        builder.add_sklearn_tree(model)
+        return builder.build(base=0.0, scale=1.0, strict=False)
+
+    if isinstance(model, RandomForestRegressor):
+        for tree in model.estimators_:
+            builder.add_sklearn_tree(tree)
+        return builder.build(base=0.0, scale=1.0 / len(model.estimators_), strict=False)
+
+    if isinstance(model, GradientBoostingRegressor):
+        if model.init_ == "zero":
+            base = 0.0
+        else:
+            base = float(np.ravel(model.init_.constant_)[0])
+        for tree in model.estimators_[:, 0]:
+            builder.add_sklearn_tree(tree)
+        return builder.build(base=base, scale=model.learning_rate, strict=False)
+
+    if type(model).__name__ == "XGBRegressor":
+        booster = model.get_booster()
+        dumps = booster.get_dump(dump_format="json")
+        best_iteration = getattr(model, "best_iteration", None)
+        if best_iteration is not None:
+            dumps = dumps[:best_iteration + 1]
+        for dump in dumps:
+            builder.add_xgboost_tree(json.loads(dump))
+        return builder.build(base=_xgboost_base_score(booster), scale=1.0, strict=True)
+
+    raise ValueError(f"Cannot compile model of type {type(model).__name__}")
+
+
+# -------------------- Validation --------------------
+
+def make_validation_frame(compiled_preprocessor: CompiledPreprocessor, rows_per_category: int = 50,
+                          seed: int = 42) -> pd.DataFrame:
+    '''
+    Synthetic inputs spanning the training distribution: every category, numeric
+    values drawn around the fitted mean (+-4 std), plus a few missing values.
+    '''
+    rng = np.random.default_rng(seed)
+    categorical = [block for block in compiled_preprocessor.blocks if block["kind"] == "onehot"]
+    n_rows = rows_per_category * max([len(block["categories"]) for block in categorical] or [1])
+
+    frame = {}
+    for block in compiled_preprocessor.blocks:
+        if block["kind"] == "numeric":
+            for i, column in enumerate(block["columns"]):
+                center = block["fill"][i] if not np.isnan(block["fill"][i]) else block["mean"][i]
+                values = center + rng.uniform(-4, 4, n_rows) * block["scale"][i]
+                values[rng.random(n_rows) < 0.02] = np.nan
+                frame[column] = values
+        else:
+            categories = block["categories"]
+            frame[block["columns"][0]] = np.resize(categories, n_rows).astype(object)
+    return pd.DataFrame(frame)
+
+
+def validate_compiled(compiled: CompiledPredictor, preprocessor, model, features, rtol: float = 1e-5,
+                      atol: float = 1e-4) -> dict:
+    '''Compare compiled transform + predict with the sklearn objects; raise if they diverge.'''
+    expected_X = preprocessor.transform(features)
+    if hasattr(expected_X, "toarray"):
+        expected_X = expected_X.toarray()
+    compiled_X = compiled.transform(features)
+    if not np.allclose(compiled_X, expected_X, rtol=rtol, atol=atol):
+        raise ValueError(
+            f"Compiled preprocessor diverges: max abs diff {np.abs(compiled_X - expected_X).max():.3g}"
+        )
+
+    expected = np.asarray(model.predict(expected_X), dtype=np.float64).ravel()
+    predicted = compiled.model.predict(expected_X)
+    max_abs_diff = float(np.abs(predicted - expected).max()) if len(expected) else 0.0
+    if not np.allclose(predicted, expected, rtol=rtol, atol=atol):
+        raise ValueError(f"Compiled model diverges: max abs diff {max_abs_diff:.3g}")
+
+    return {"rows": int(len(expected)), "max_abs_diff": max_abs_diff, "rtol": rtol, "atol": atol}
+
+
+# -------------------- Export --------------------
+
+class ModelCompiler:
+    def __init__(self):
+        self.model_compiler_config = ModelCompilerConfig()
+
+    def compile(self, model, preprocessor, validation_features=None, source_version=None) -> CompiledPredictor:
+        try:
+            compiled = CompiledPredictor(
+                compile_preprocessor(preprocessor),
+                compile_model(model),
+                meta={"model_type": type(model).__name__, "source_version": source_version},
+            )
+            if validation_features is None:
+                validation_features = make_validation_frame(compiled.preprocessor)
+            report = validate_compiled(
+                compiled, preprocessor, model, validation_features,
+                rtol=self.model_compiler_config.rtol, atol=self.model_compiler_config.atol,
+            )
+            compiled.meta["validation"] = report
+            logging.info(f"Compiled {type(model).__name__} validated on {report['rows']} rows, "
+                         f"max abs diff {report['max_abs_diff']:.3g}")
+            return compiled
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def export(self, model_path, preprocessor_path, validation_features=None, output_path=None,
+               metrics=None) -> str:
+        '''
+        Compile the saved artifacts and write them next to model.pkl, both as one
+        .npz file and as a memory-mappable bundle directory with a manifest.
+        '''
+        try:
+            output_path = output_path or self.model_compiler_config.compiled_model_file_path
+            version = artifacts_version(model_path, preprocessor_path)
+            compiled = self.compile(
+                load_object(model_path),
+                load_object(preprocessor_path),
+                validation_features=validation_features,
+                source_version=version,
+            )
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            compiled.save(output_path)
+            logging.info(f"Saved compiled model to {output_path}")
+
+            bundle_dir = os.path.join(os.path.dirname(output_path), self.model_compiler_config.bundle_dir_name)
+            save_bundle(bundle_dir, compiled, model_version=version, metrics=metrics)
+            logging.info(f"Saved model bundle to {bundle_dir}")
+            return output_path
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    from src.components.data_ingestion import DataIngestionConfig
+    from src.components.data_transformation import DataTransformationConfig
+    from src.components.model_trainer import ModelTrainerConfig
+    from src.utils import load_frame
+
+    model_path = ModelTrainerConfig().trained_model_file_path
+    preprocessor_path = DataTransformationConfig().preprocessor_obj_file_path
+
+    # Re-export the current artifacts, recording their held-out metrics in the bundle manifest.
+    metrics = None
+    test_path = DataIngestionConfig().test_data_path
+    if os.path.exists(test_path):
+        test_df = load_frame(test_path)
+        y_test = test_df.pop("actual_study_hours")
+        predicted = load_object(model_path).predict(load_object(preprocessor_path).transform(test_df))
+        metrics = {
+            "test_r2": float(r2_score(y_test, predicted)),
+            "test_mae": float(mean_absolute_error(y_test, predicted)),
+            "test_rmse": float(mean_squared_error(y_test, predicted) ** 0.5),
+        }
+
+    path = ModelCompiler().export(model_path, preprocessor_path, metrics=metrics)
+    print(f"Compiled model written to {path}")
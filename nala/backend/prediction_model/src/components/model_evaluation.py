@@ -0,0 +1,193 @@
+# ******************************************************************
+# * Model Evaluation : score a saved artifact set on a dataset     *
+# *                    and benchmark each inference path           *
+# *                    (sklearn / compiled NumPy / lookup table)   *
+# ******************************************************************
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.model_registry import DEFAULT_ARTIFACTS_DIR, ModelRegistry
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils import load_frame
+
+INFERENCE_PATHS = ("sklearn", "compiled", "table")
+
+
+@dataclass
+class ModelEvaluationConfig:
+    artifacts_dir: str = str(DEFAULT_ARTIFACTS_DIR)
+    data_path: str = os.path.join(os.path.dirname(DEFAULT_ARTIFACTS_DIR), "Notebook", "data", "unseen_data.csv")
+    target_column: str = "actual_study_hours"
+    paths: List[str] = field(default_factory=lambda: list(INFERENCE_PATHS))
+    batch_sizes: List[int] = field(default_factory=lambda: [1, 10, 100, 1000, 10000, 100000])
+    single_iterations: int = 1000
+    min_seconds: float = 0.5        # keep repeating a batch size for at least this long...
+    max_repeats: int = 50           # ...but at most this many times
+    seed: int = 42
+
+
+def load_dataset(data_path) -> pd.DataFrame:
+    '''CSV, or the columnar .npz written by src.utils.save_frame.'''
+    if str(data_path).endswith(".npz"):
+        return load_frame(data_path)
+    return pd.read_csv(data_path)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def regression_metrics(y_true, y_pred) -> Dict[str, float]:
+    return {
+        "r2": float(r2_score(y_true, y_pred)),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "rmse": float(mean_squared_error(y_true, y_pred) ** 0.5),
+    }
+
+
+class ModelEvaluation:
+    def __init__(self, config: ModelEvaluationConfig = None):
+        self.config = config or ModelEvaluationConfig()
+        self.registry = ModelRegistry(self.config.artifacts_dir, check_interval=float("inf"))
+
+    def predictors(self) -> Dict[str, Callable]:
+        '''The inference paths available for this artifact set, name -> (DataFrame -> 1-D array).'''
+        artifacts = self.registry.warmup()
+        pipeline = PredictPipeline(registry=self.registry)
+        available = {
+            "sklearn": lambda df: np.asarray(
+                artifacts.model.predict(artifacts.preprocessor.transform(df)), dtype=float
+            ).ravel(),
+        }
+        if artifacts.compiled is not None:
+            available["compiled"] = artifacts.compiled.predict
+        if artifacts.table is not None:
+            available["table"] = pipeline.predict_batch
+        missing = [path for path in self.config.paths if path not in available]
+        if missing:
+            logging.info(f"Inference paths not available for these artifacts: {missing}")
+        return {path: available[path] for path in self.config.paths if path in available}
+
+    def _throughput(self, predict, features: pd.DataFrame) -> List[Dict]:
+        rng = np.random.default_rng(self.config.seed)
+        results = []
+        for batch_size in self.config.batch_sizes:
+            batch = features.iloc[rng.integers(0, len(features), batch_size)].reset_index(drop=True)
+            predict(batch)  # warm-up
+            timings = []
+            started = time.perf_counter()
+            while not timings or (
+                time.perf_counter() - started < self.config.min_seconds and len(timings) < self.config.max_repeats
+            ):
+                start = time.perf_counter()
+                predict(batch)
+                timings.append(time.perf_counter() - start)
+            seconds = float(np.median(timings))
+            results.append({
+                "batch_size": batch_size,
+                "repeats": len(timings),
+                "median_ms": seconds * 1000,
+                "rows_per_s": batch_size / seconds if seconds else float("inf"),
+            })
+        return results
+
+    def _single_latency(self, predict, features: pd.DataFrame) -> Dict:
+        rows = [features.iloc[[i % len(features)]].reset_index(drop=True)
+                for i in range(self.config.single_iterations)]
+        predict(rows[0])
+        latencies = []
+        for row in rows:
+            start = time.perf_counter()
+            predict(row)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        return {
+            "iterations": len(latencies),
+            "mean_ms": float(np.mean(latencies)),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+        }
+
+    def evaluate(self) -> Dict:
+        try:
+            config = self.config
+            data = load_dataset(config.data_path)
+            target = data.pop(config.target_column) if config.target_column in data.columns else None
+
+            artifacts = self.registry.get()
+            report = {
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "artifacts_dir": str(config.artifacts_dir),
+                "model_version": artifacts.version,
+                "model_source": artifacts.source,
+                "data_path": str(config.data_path),
+                "rows": int(len(data)),
+                "paths": {},
+            }
+
+            reference = None
+            for name, predict in self.predictors().items():
+                logging.info(f"Evaluating inference path {name}")
+                predictions = np.asarray(predict(data), dtype=float).ravel()
+                if reference is None:
+                    reference = predictions
+                result = {
+                    "max_abs_diff_vs_first": float(np.abs(predictions - reference).max()) if len(data) else 0.0,
+                    "throughput": self._throughput(predict, data),
+                    "single": self._single_latency(predict, data),
+                }
+                if target is not None:
+                    result["metrics"] = regression_metrics(target, predictions)
+                if name == "table":
+                    result["table_hit_rate"] = float(artifacts.table.lookup(data)[1].mean()) if len(data) else 0.0
+                report["paths"][name] = result
+            return report
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def save_report(report: Dict, output_path):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as file_obj:
+        json.dump(report, file_obj, indent=2)
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"Model {report['model_version']} ({report['model_source']}) on {report['data_path']} "
+        f"({report['rows']} rows)",
+    ]
+    for name, result in report["paths"].items():
+        metrics = result.get("metrics")
+        if metrics:
+            lines.append(
+                f"[{name}] R2 {metrics['r2']:.4f}  MAE {metrics['mae']:.4f}  RMSE {metrics['rmse']:.4f}  "
+                f"max diff {result['max_abs_diff_vs_first']:.2g}"
+            )
+        else:
+            lines.append(f"[{name}] max diff {result['max_abs_diff_vs_first']:.2g}")
+        if "table_hit_rate" in result:
+            lines.append(f"    table hit rate: {result['table_hit_rate']:.1%}")
+        single = result["single"]
+        lines.append(
+            f"    single row: p50 {single['p50_ms']:.3f} ms  p99 {single['p99_ms']:.3f} ms"
+        )
+        for row in result["throughput"]:
+            lines.append(
+                f"    batch {row['batch_size']:>7}: {row['median_ms']:10.3f} ms  {row['rows_per_s']:>14,.0f} rows/s"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,309 @@
+# ******************************************************************
+# * Model Search : hyperparameter search for every candidate model *
+# *                -> folds of all models run in one process pool  *
+# *                -> grid search or successive halving            *
+# *                -> fold scores cached by data, fold and params  *
+# ******************************************************************
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class ModelSearchConfig:
+    n_jobs: int = 1                 # -1 uses every CPU
+    strategy: str = "grid"          # "grid" or "halving"
+    cv: int = 3
+    halving_factor: int = 3
+    min_resources: int = 30         # training rows per fold in the first halving round
+    random_state: int = 42
+    cache_dir: Optional[str] = os.path.join("artifacts", "search_cache")
+
+
+@dataclass
+class ModelSearchResult:
+    name: str
+    best_params: Dict
+    cv_score: float
+    train_score: float = None
+    test_score: float = None
+    estimator: object = None
+    fits: int = 0
+    cached_fits: int = 0
+    fit_seconds: float = 0.0       # summed over all fits, as if run serially
+    wall_seconds: float = 0.0      # first task submitted -> last task (refit) finished
+    rounds: List[Dict] = field(default_factory=list)
+
+
+def data_fingerprint(X, y) -> str:
+    digest = hashlib.sha256()
+    for array in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def folds_fingerprint(folds) -> List[str]:
+    '''One hash per fold of its (train, validation) row indices, in training order.'''
+    fingerprints = []
+    for train_idx, val_idx in folds:
+        digest = hashlib.sha256()
+        for array in (np.ascontiguousarray(train_idx, dtype=np.int64), np.ascontiguousarray(val_idx, dtype=np.int64)):
+            digest.update(str(array.shape).encode())
+            digest.update(array.tobytes())
+        fingerprints.append(digest.hexdigest()[:16])
+    return fingerprints
+
+
+def _fit_and_score(estimator, params, X, y, train_idx, val_idx):
+    '''Worker task: fit a fresh clone on one fold and score it on the held-out part.'''
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train_idx], y[train_idx])
+    score = r2_score(y[val_idx], model.predict(X[val_idx]))
+    return float(score), time.perf_counter() - start, time.time()
+
+
+def _refit(estimator, params, X_train, y_train, X_test, y_test):
+    '''Worker task: fit the winning params on the full training set.'''
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(X_train, y_train)
+    train_score = r2_score(y_train, model.predict(X_train))
+    test_score = r2_score(y_test, model.predict(X_test))
+    return model, float(train_score), float(test_score), time.perf_counter() - start, time.time()
+
+
+class _InlineExecutor:
+    '''Executor with the ProcessPoolExecutor interface that runs tasks immediately (n_jobs=1).'''
+
+    class _Done:
+        def __init__(self, value):
+            self._value = value
+
+        def result(self):
+            return self._value
+
+    def submit(self, fn, *args):
+        return self._Done(fn(*args))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FoldCache:
+    '''
+    JSON file of fold scores keyed by data hash, model class and base
+    parameters, searched params, fold indices and resources. The fold hash
+    covers cv, strategy and random_state (halving rounds train on a prefix of
+    a random permutation of each fold), so a changed base estimator or
+    search config never reuses another setup's scores.
+    '''
+
+    def __init__(self, cache_dir: Optional[str]):
+        self.path = os.path.join(cache_dir, "fold_scores.json") if cache_dir else None
+        self._entries = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as file_obj:
+                    self._entries = json.load(file_obj)
+            except (OSError, ValueError) as e:
+                logging.info(f"Ignoring unreadable search cache {self.path}: {e}")
+
+    @staticmethod
+    def key(data_hash, estimator, params, fold_hash, n_resources) -> str:
+        estimator_class = f"{type(estimator).__module__}.{type(estimator).__qualname__}"
+        payload = json.dumps(
+            [data_hash, estimator_class, estimator.get_params(deep=False), params, fold_hash, n_resources],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def put(self, key, score, seconds):
+        self._entries[key] = {"score": score, "seconds": seconds}
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file_obj:
+            json.dump(self._entries, file_obj)
+        os.replace(tmp_path, self.path)
+
+
+class _ModelState:
+    '''Search progress of one model: remaining candidates and the current round's resources.'''
+
+    def __init__(self, name, estimator, candidates, n_resources):
+        self.name = name
+        self.estimator = estimator
+        self.candidates = candidates
+        self.n_resources = n_resources
+        self.scores = {}
+        self.result = ModelSearchResult(name=name, best_params={}, cv_score=float("-inf"))
+        self.started = None
+        self.finished = None
+
+    def mark_finished(self, timestamp):
+        self.finished = max(self.finished or timestamp, timestamp)
+
+
+class ModelSearch:
+    '''
+    Hyperparameter search over several models at once.
+
+    Every (model, params, fold) fit is an independent task; tasks of all
+    models are submitted together to one process pool of `n_jobs` workers,
+    round by round (with n_jobs=1 models simply run one after another).
+    With strategy="halving" each round trains on `halving_factor` times more
+    rows than the previous one and keeps the best 1/`halving_factor` of the
+    candidates (successive halving), so large grids only see the full data
+    for their few best settings.
+    '''
+
+    def __init__(self, config: ModelSearchConfig = None):
+        self.config = config or ModelSearchConfig()
+        if self.config.strategy not in ("grid", "halving"):
+            raise ValueError(f"Unknown search strategy {self.config.strategy!r}")
+
+    @property
+    def n_jobs(self) -> int:
+        n_jobs = self.config.n_jobs
+        if n_jobs is None or n_jobs == 0:
+            return 1
+        return (os.cpu_count() or 1) if n_jobs < 0 else n_jobs
+
+    def _executor(self):
+        if self.n_jobs == 1:
+            return _InlineExecutor()
+        return ProcessPoolExecutor(max_workers=self.n_jobs)
+
+    def _first_resources(self, n_candidates, max_resources) -> int:
+        if self.config.strategy == "grid" or n_candidates <= 1:
+            return max_resources
+        factor = self.config.halving_factor
+        n_rounds = 1 + int(math.floor(math.log(n_candidates, factor)))
+        return min(max_resources, max(self.config.min_resources, max_resources // factor ** (n_rounds - 1)))
+
+    def run(self, X_train, y_train, X_test, y_test, models: Dict, params: Dict) -> Dict[str, ModelSearchResult]:
+        try:
+            X_train, y_train = np.asarray(X_train), np.asarray(y_train)
+            data_hash = data_fingerprint(X_train, y_train)
+            folds = list(KFold(n_splits=self.config.cv).split(X_train))
+            if self.config.strategy == "halving":
+                # One fixed row order per fold, so a round's subsample is a prefix of the next one's.
+                rng = np.random.RandomState(self.config.random_state)
+                folds = [(rng.permutation(train_idx), val_idx) for train_idx, val_idx in folds]
+            max_resources = min(len(train_idx) for train_idx, _ in folds)
+            fold_hashes = folds_fingerprint(folds)
+
+            cache = FoldCache(self.config.cache_dir)
+            states = []
+            for name, estimator in models.items():
+                candidates = list(ParameterGrid(params.get(name, {})))
+                states.append(_ModelState(name, estimator, candidates,
+                                          self._first_resources(len(candidates), max_resources)))
+
+            # In a pool all models share every round; serially each model runs to completion
+            # on its own, so wall times stay per model.
+            groups = [states] if self.n_jobs > 1 else [[state] for state in states]
+            with self._executor() as executor:
+                for group in groups:
+                    active = [state for state in group if state.candidates]
+                    while active:
+                        self._run_round(executor, active, folds, fold_hashes, X_train, y_train, data_hash, cache,
+                                        max_resources)
+                        cache.save()
+                        active = [state for state in active if self._advance(state, max_resources)]
+                    self._refit_all(executor, group, X_train, y_train, X_test, y_test)
+
+            return {state.name: state.result for state in states}
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _run_round(self, executor, active, folds, fold_hashes, X, y, data_hash, cache, max_resources):
+        pending = []
+        for state in active:
+            if state.started is None:
+                state.started = time.time()
+            state.scores = {}
+            for i, params in enumerate(state.candidates):
+                for fold, (train_idx, val_idx) in enumerate(folds):
+                    key = cache.key(data_hash, state.estimator, params, fold_hashes[fold], state.n_resources)
+                    hit = cache.get(key)
+                    if hit is not None:
+                        state.scores.setdefault(i, []).append(hit["score"])
+                        state.result.cached_fits += 1
+                        continue
+                    if state.n_resources < max_resources:
+                        train_idx = train_idx[:state.n_resources]
+                    future = executor.submit(_fit_and_score, state.estimator, params, X, y, train_idx, val_idx)
+                    pending.append((state, i, key, future))
+
+        for state, i, key, future in pending:
+            score, seconds, finished = future.result()
+            cache.put(key, score, seconds)
+            state.scores.setdefault(i, []).append(score)
+            state.result.fits += 1
+            state.result.fit_seconds += seconds
+            state.mark_finished(finished)
+
+    def _refit_all(self, executor, states, X_train, y_train, X_test, y_test):
+        futures = []
+        for state in states:
+            if state.started is None:
+                state.started = time.time()
+            futures.append((state, executor.submit(
+                _refit, state.estimator, state.result.best_params, X_train, y_train, X_test, y_test
+            )))
+        for state, future in futures:
+            estimator, train_score, test_score, seconds, finished = future.result()
+            result = state.result
+            result.estimator = estimator
+            result.train_score = train_score
+            result.test_score = test_score
+            result.fit_seconds += seconds
+            state.mark_finished(finished)
+            result.wall_seconds = state.finished - state.started
+
+    def _advance(self, state: _ModelState, max_resources) -> bool:
+        '''Record the round, keep the best candidates; returns False once the model is done.'''
+        mean_scores = [float(np.mean(state.scores[i])) for i in range(len(state.candidates))]
+        # Stable sort keeps grid order on ties, like GridSearchCV's rank.
+        order = sorted(range(len(mean_scores)), key=lambda i: -mean_scores[i])
+        best = order[0]
+        state.result.best_params = state.candidates[best]
+        state.result.cv_score = mean_scores[best]
+        state.result.rounds.append({
+            "n_candidates": len(state.candidates),
+            "n_resources": state.n_resources,
+            "best_score": mean_scores[best],
+        })
+
+        if self.config.strategy == "grid" or state.n_resources >= max_resources or len(state.candidates) <= 1:
+            return False
+        keep = max(1, math.ceil(len(state.candidates) / self.config.halving_factor))
+        state.candidates = [state.candidates[i] for i in order[:keep]]
+        state.n_resources = min(max_resources, state.n_resources * self.config.halving_factor)
+        return True
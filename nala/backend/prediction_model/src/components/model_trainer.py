@@ -8,27 +8,110 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 
 #from sklearn.multioutput import MultiOutputRegressor
-from catboost import CatBoostRegressor
 from sklearn.ensemble import (AdaBoostRegressor,GradientBoostingRegressor,RandomForestRegressor)
 from sklearn.linear_model import LinearRegression
 from sklearn.neighbors import KNeighborsRegressor
 from sklearn.tree import DecisionTreeRegressor
-from xgboost import XGBRegressor
 
 from src.exception import CustomException
 from src.logger import logging
 
 from src.utils import save_object,evaluate_models
+from src.components.data_transformation import DataTransformationConfig
+from src.components.model_compiler import ModelCompiler
+from src.pipeline.model_registry import ModelRegistry
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path = os.path.join("artifacts", "model.pkl")
+    search_n_jobs = int(os.getenv("MODEL_SEARCH_N_JOBS", "1"))
+    search_strategy = os.getenv("MODEL_SEARCH_STRATEGY", "grid")  # "grid" or "halving"
+    search_cache_dir = os.path.join("artifacts", "search_cache")
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config = ModelTrainerConfig()
 
-    def initiate_model_trainer(self,train_array,test_array):
+    def export_compiled_model(self,preprocessor_path,metrics=None):
+        '''
+        Compile the saved model + preprocessor into the NumPy-only representation
+        used for serving. Models without a compiled form (CatBoost, AdaBoost, KNN)
+        keep using the pickled sklearn path, so a failure here only gets logged.
+        '''
+        try:
+            return ModelCompiler().export(
+                self.model_trainer_config.trained_model_file_path, preprocessor_path, metrics=metrics
+            )
+        except Exception as e:
+            logging.info(f"Compiled model not exported: {e}")
+            return None
+
+    def build_prediction_table(self):
+        '''Warm a registry on the new artifacts, which (re)builds and saves prediction_table.npz.'''
+        try:
+            registry = ModelRegistry(os.path.dirname(self.model_trainer_config.trained_model_file_path))
+            table = registry.warmup().table
+            logging.info(f"Prediction table {table.shape} saved to {registry.table_path}")
+            return table
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def get_model_candidates(self):
+        '''Candidate models and their hyperparameter grids; also fingerprinted by the train pipeline.'''
+        # Training-only dependencies: imported here so nothing on the prediction side pulls them in.
+        from catboost import CatBoostRegressor
+        from xgboost import XGBRegressor
+
+        models = {
+            "Random Forest": (RandomForestRegressor()),
+            "Decision Tree": (DecisionTreeRegressor()),
+            "Gradient Boosting": (GradientBoostingRegressor()),
+            "Linear Regression": (LinearRegression()),
+            "XGBRegressor": (XGBRegressor()),
+            "CatBoosting Regressor": (CatBoostRegressor(verbose=False)),
+            "AdaBoost Regressor": (AdaBoostRegressor()),
+        }
+        # Best way is to use additional config file, yaml file and from that can read hyperparameters
+        params={
+            "Decision Tree": {
+                'criterion':['squared_error', 'friedman_mse', 'absolute_error', 'poisson'],
+                # 'splitter':['best','random'],
+                # 'max_features':['sqrt','log2'],
+            },
+            "Random Forest":{
+                # 'criterion':['squared_error', 'friedman_mse', 'absolute_error', 'poisson'],
+             
+                # 'max_features':['sqrt','log2',None],
+                'n_estimators': [8,16,32,64,128,256]
+            },
+            "Gradient Boosting":{
+                # 'loss':['squared_error', 'huber', 'absolute_error', 'quantile'],
+                'learning_rate':[.1,.01,.05,.001],
+                'subsample':[0.6,0.7,0.75,0.8,0.85,0.9],
+                # 'criterion':['squared_error', 'friedman_mse'],
+                # 'max_features':['auto','sqrt','log2'],
+                'n_estimators': [8,16,32,64,128,256]
+            },
+            "Linear Regression":{},
+            "XGBRegressor":{
+                'learning_rate':[.1,.01,.05,.001],
+                'n_estimators': [8,16,32,64,128,256]
+            },
+            "CatBoosting Regressor":{
+                'depth': [6,8,10],
+                'learning_rate': [0.01, 0.05, 0.1],
+                'iterations': [30, 50, 100]
+            },
+            "AdaBoost Regressor":{
+                'learning_rate':[.1,.01,0.5,.001],
+                # 'loss':['linear','square','exponential'],
+                'n_estimators': [8,16,32,64,128,256]
+            }
+            
+        }
+        return models, params
+
+    def initiate_model_trainer(self,train_array,test_array,preprocessor_path=None):
         try:
             logging.info("Split training and test input data")
             X_train,y_train,X_test,y_test =(
@@ -37,56 +120,13 @@ class ModelTrainer:
                 test_array[:,:-1],
                 test_array[:,-1]
                 )
-            models = {
-                "Random Forest": (RandomForestRegressor()),
-                "Decision Tree": (DecisionTreeRegressor()),
-                "Gradient Boosting": (GradientBoostingRegressor()),
-                "Linear Regression": (LinearRegression()),
-                "XGBRegressor": (XGBRegressor()),
-                "CatBoosting Regressor": (CatBoostRegressor(verbose=False)),
-                "AdaBoost Regressor": (AdaBoostRegressor()),
-            }
-            # Best way is to use additional config file, yaml file and from that can read hyperparameters
-            params={
-                "Decision Tree": {
-                    'criterion':['squared_error', 'friedman_mse', 'absolute_error', 'poisson'],
-                    # 'splitter':['best','random'],
-                    # 'max_features':['sqrt','log2'],
-                },
-                "Random Forest":{
-                    # 'criterion':['squared_error', 'friedman_mse', 'absolute_error', 'poisson'],
-                 
-                    # 'max_features':['sqrt','log2',None],
-                    'n_estimators': [8,16,32,64,128,256]
-                },
-                "Gradient Boosting":{
-                    # 'loss':['squared_error', 'huber', 'absolute_error', 'quantile'],
-                    'learning_rate':[.1,.01,.05,.001],
-                    'subsample':[0.6,0.7,0.75,0.8,0.85,0.9],
-                    # 'criterion':['squared_error', 'friedman_mse'],
-                    # 'max_features':['auto','sqrt','log2'],
-                    'n_estimators': [8,16,32,64,128,256]
-                },
-                "Linear Regression":{},
-                "XGBRegressor":{
-                    'learning_rate':[.1,.01,.05,.001],
-                    'n_estimators': [8,16,32,64,128,256]
-                },
-                "CatBoosting Regressor":{
-                    'depth': [6,8,10],
-                    'learning_rate': [0.01, 0.05, 0.1],
-                    'iterations': [30, 50, 100]
-                },
-                "AdaBoost Regressor":{
-                    'learning_rate':[.1,.01,0.5,.001],
-                    # 'loss':['linear','square','exponential'],
-                    'n_estimators': [8,16,32,64,128,256]
-                }
-                
-            }        
-            
+            models, params = self.get_model_candidates()
+
             model_report:dict=evaluate_models(X_train=X_train,y_train=y_train,X_test=X_test,y_test=y_test,
-                                             models=models,param=params)
+                                             models=models,param=params,
+                                             n_jobs=self.model_trainer_config.search_n_jobs,
+                                             strategy=self.model_trainer_config.search_strategy,
+                                             cache_dir=self.model_trainer_config.search_cache_dir)
             
             # to get best model score from dict
             best_model_score = max(sorted(model_report.values()))
@@ -123,6 +163,18 @@ class ModelTrainer:
             rmse = mse ** 0.5
             print(f"Root Mean Squared Error: {rmse}")
 
+            self.export_compiled_model(
+                preprocessor_path or DataTransformationConfig().preprocessor_obj_file_path,
+                metrics={
+                    "model_name": best_model_name,
+                    "train_r2": float(train_r2),
+                    "test_r2": float(r2_square),
+                    "test_mae": float(mae),
+                    "test_rmse": float(rmse),
+                },
+            )
+            self.build_prediction_table()
+
             return r2_square
         except Exception as e:
             raise CustomException(e,sys)
@@ -4,12 +4,27 @@ from datetime import datetime
 
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 logs_path = os.path.join(os.getcwd(),"logs",LOG_FILE)
-os.makedirs(logs_path, exist_ok=True)
 
 LOG_FILE_PATH = os.path.join(logs_path,LOG_FILE)
 
+
+class LazyFileHandler(logging.FileHandler):
+    '''
+    FileHandler that creates the log directory and file on the first record,
+    so importing src (e.g. in every prediction worker) has no filesystem side effects.
+    '''
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def emit(self, record):
+        if self.stream is None:
+            os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        super().emit(record)
+
+
 logging.basicConfig(
-    filename= LOG_FILE_PATH,
+    handlers=[LazyFileHandler(LOG_FILE_PATH)],
     format= "[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO
 )
@@ -0,0 +1,207 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+# Trees are evaluated for at most this many (row, tree) pairs at once to bound memory.
+EVAL_CHUNK_CELLS = 1 << 21
+
+
+@dataclass
+class CompiledPreprocessor:
+    '''
+    Constant-array form of the fitted ColumnTransformer.
+
+    Each block reproduces one sub-pipeline:
+      numeric -> impute with `fill`, then (x - mean) / scale per column
+      onehot  -> impute with `fill`, one-hot against `categories`, then (x - mean) / scale
+    Output columns follow block order, as in ColumnTransformer.
+    '''
+    blocks: List[Dict] = field(default_factory=list)
+
+    @property
+    def n_features_out(self) -> int:
+        return sum(
+            len(block["columns"]) if block["kind"] == "numeric" else len(block["categories"])
+            for block in self.blocks
+        )
+
+    @property
+    def input_columns(self) -> List[str]:
+        columns = []
+        for block in self.blocks:
+            columns.extend(block["columns"])
+        return columns
+
+    def transform(self, features) -> np.ndarray:
+        outputs = []
+        for block in self.blocks:
+            if block["kind"] == "numeric":
+                values = np.column_stack(
+                    [np.asarray(features[column], dtype=np.float64) for column in block["columns"]]
+                )
+                values = np.where(np.isnan(values), block["fill"], values)
+                outputs.append((values - block["mean"]) / block["scale"])
+            else:
+                values = np.asarray(features[block["columns"][0]], dtype=object)
+                # None or NaN (the only value not equal to itself)
+                missing = np.equal(values, None) | np.not_equal(values, values)
+                values = np.where(missing, block["fill"], values).astype(str)
+
+                categories = block["categories"]
+                codes = np.searchsorted(categories, values)
+                codes = np.minimum(codes, len(categories) - 1)
+                unknown = categories[codes] != values
+                if unknown.any():
+                    raise ValueError(
+                        f"Found unknown categories {sorted(set(values[unknown]))} "
+                        f"in column {block['columns'][0]!r}"
+                    )
+                one_hot = np.zeros((len(values), len(categories)), dtype=np.float64)
+                one_hot[np.arange(len(values)), codes] = 1.0
+                outputs.append((one_hot - block["mean"]) / block["scale"])
+        return np.hstack(outputs)
+
+
+@dataclass
+class CompiledModel:
+    '''
+    Flat array form of a fitted regressor, stored ready for evaluation so the
+    arrays can be used straight from a memory map without conversion.
+
+    kind == "trees": every tree of the ensemble lives in shared node arrays and
+    starts at `roots[i]`. Node i goes to children[2i] (left) or children[2i+1]
+    (right), or to missing[i] for NaN. Leaves point to themselves and "split"
+    on feature 0, so every row can take max_depth steps without masking.
+    prediction = base + scale * sum(leaf values). `strict` selects `x < threshold`
+    (XGBoost, float32 thresholds) instead of `x <= threshold` (sklearn, float64
+    thresholds); inputs are rounded to float32 first, like the original libraries.
+
+    kind == "linear": prediction = X @ coef + intercept.
+    '''
+    kind: str
+    base: float = 0.0
+    scale: float = 1.0
+    strict: bool = False
+    max_depth: int = 0
+    roots: np.ndarray = None
+    split_feature: np.ndarray = None
+    threshold: np.ndarray = None
+    children: np.ndarray = None
+    missing: np.ndarray = None
+    value: np.ndarray = None
+    coef: np.ndarray = None
+    intercept: float = 0.0
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if self.kind == "linear":
+            return X @ self.coef + self.intercept
+
+        X = np.ascontiguousarray(X.astype(np.float32).astype(self.threshold.dtype))
+        n_trees = len(self.roots)
+        chunk = max(1, EVAL_CHUNK_CELLS // max(n_trees, 1))
+        has_missing = bool(np.isnan(X).any())
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), chunk):
+            out[start:start + chunk] = self._predict_chunk(X[start:start + chunk], has_missing)
+        return out
+
+    def _predict_chunk(self, X: np.ndarray, has_missing: bool) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=self.roots.dtype) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            x = np.take(flat_X, row_offsets + np.take(self.split_feature, nodes))
+            threshold = np.take(self.threshold, nodes)
+            go_right = (x >= threshold) if self.strict else (x > threshold)
+            child = np.take(self.children, nodes * 2 + go_right)
+            if has_missing:
+                # NaN compares False above; route it to the stored default child.
+                child = np.where(np.isnan(x), np.take(self.missing, nodes), child)
+            nodes = child
+        return self.base + self.scale * np.take(self.value, nodes).sum(axis=1)
+
+
+_MODEL_ARRAYS = ("roots", "split_feature", "threshold", "children", "missing", "value", "coef")
+_BLOCK_ARRAYS = ("columns", "fill", "mean", "scale", "categories")
+
+
+class CompiledPredictor:
+    '''
+    NumPy-only replacement for preprocessor.transform + model.predict.
+
+    Built by src.components.model_compiler at training time and stored as a
+    single .npz file; loading it needs neither sklearn nor the model library.
+    '''
+
+    def __init__(self, preprocessor: CompiledPreprocessor, model: CompiledModel, meta: Dict = None):
+        self.preprocessor = preprocessor
+        self.model = model
+        self.meta = meta or {}
+
+    @property
+    def source_version(self):
+        return self.meta.get("source_version")
+
+    def transform(self, features) -> np.ndarray:
+        return self.preprocessor.transform(features)
+
+    def predict(self, features) -> np.ndarray:
+        return self.model.predict(self.preprocessor.transform(features))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        model_meta = {}
+        for name in ("kind", "base", "scale", "strict", "max_depth", "intercept"):
+            model_meta[name] = getattr(self.model, name)
+        for name in _MODEL_ARRAYS:
+            value = getattr(self.model, name)
+            if value is not None:
+                arrays[f"model_{name}"] = value
+
+        blocks_meta = []
+        for i, block in enumerate(self.preprocessor.blocks):
+            blocks_meta.append({"kind": block["kind"]})
+            for name in _BLOCK_ARRAYS:
+                if name in block:
+                    arrays[f"block{i}_{name}"] = np.asarray(block[name])
+
+        meta = dict(self.meta, model=model_meta, blocks=blocks_meta)
+        arrays["meta"] = np.array(json.dumps(meta))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "CompiledPredictor":
+        meta = json.loads(str(arrays["meta"]))
+        model_meta = meta.pop("model")
+        blocks_meta = meta.pop("blocks")
+
+        model_kwargs = dict(model_meta)
+        for name in _MODEL_ARRAYS:
+            key = f"model_{name}"
+            if key in arrays:
+                model_kwargs[name] = arrays[key]
+
+        blocks = []
+        for i, block_meta in enumerate(blocks_meta):
+            block = dict(block_meta)
+            for name in _BLOCK_ARRAYS:
+                key = f"block{i}_{name}"
+                if key in arrays:
+                    block[name] = arrays[key]
+            block["columns"] = [str(column) for column in block["columns"]]
+            blocks.append(block)
+
+        return cls(CompiledPreprocessor(blocks), CompiledModel(**model_kwargs), meta)
+
+    def save(self, file_path):
+        with open(file_path, "wb") as file_obj:
+            np.savez(file_obj, **self.to_arrays())
+
+    @classmethod
+    def load(cls, file_path) -> "CompiledPredictor":
+        with np.load(file_path, allow_pickle=False) as arrays:
+            return cls.from_arrays({name: arrays[name] for name in arrays.files})
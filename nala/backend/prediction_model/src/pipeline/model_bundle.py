@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.pipeline.compiled_predictor import CompiledPredictor
+from src.pipeline.prediction_table import BLOOMS_LEVELS
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# What the serving code sends: one row per (student, topic).
+SERVING_FEATURE_SCHEMA = [
+    {"name": "blooms_level", "type": "category", "categories": list(BLOOMS_LEVELS)},
+    {"name": "topic_difficulty", "type": "number"},
+    {"name": "previous_grade", "type": "number"},
+]
+
+
+class BundleSchemaError(ValueError):
+    '''The bundle on disk does not match the feature schema or array layout the caller expects.'''
+
+
+@dataclass
+class ModelBundle:
+    path: Path
+    manifest: Dict
+    predictor: CompiledPredictor
+
+    @property
+    def model_version(self) -> str:
+        return self.manifest["model_version"]
+
+    @property
+    def feature_schema(self) -> List[Dict]:
+        return self.manifest["feature_schema"]
+
+    @property
+    def metrics(self) -> Dict:
+        return self.manifest.get("metrics", {})
+
+
+def feature_schema(predictor: CompiledPredictor) -> List[Dict]:
+    '''Input columns the compiled preprocessor reads, with the categories it accepts.'''
+    schema = []
+    for block in predictor.preprocessor.blocks:
+        if block["kind"] == "numeric":
+            schema.extend({"name": column, "type": "number"} for column in block["columns"])
+        else:
+            schema.append({
+                "name": block["columns"][0],
+                "type": "category",
+                "categories": [str(category) for category in block["categories"]],
+            })
+    return sorted(schema, key=lambda field: field["name"])
+
+
+def verify_schema(actual: List[Dict], expected: List[Dict]):
+    '''Every expected field must exist with the same type; categories must cover the expected ones.'''
+    fields = {field["name"]: field for field in actual}
+    for field in expected:
+        found = fields.get(field["name"])
+        if found is None:
+            raise BundleSchemaError(f"Model bundle has no feature {field['name']!r}")
+        if found["type"] != field["type"]:
+            raise BundleSchemaError(
+                f"Feature {field['name']!r} is {found['type']} in the bundle, expected {field['type']}"
+            )
+        missing = set(field.get("categories", [])) - set(found.get("categories", []))
+        if missing:
+            raise BundleSchemaError(f"Feature {field['name']!r} does not accept categories {sorted(missing)}")
+    extra = set(fields) - {field["name"] for field in expected}
+    if extra:
+        raise BundleSchemaError(f"Model bundle needs features the caller does not send: {sorted(extra)}")
+
+
+def _array_sha256(array: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def save_bundle(bundle_dir, predictor: CompiledPredictor, model_version: str, metrics: Optional[Dict] = None) -> Path:
+    '''
+    Write `predictor` as a bundle directory:
+        manifest.json   format/model version, feature schema, metrics, array index
+        arrays/*.npy    one plain .npy file per array (memory-mappable, no pickles)
+    The bundle is written to a temporary directory and swapped in, so readers
+    never see a half-written bundle.
+    '''
+    bundle_dir = Path(bundle_dir)
+    tmp_dir = bundle_dir.with_name(f"{bundle_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    (tmp_dir / "arrays").mkdir(parents=True)
+
+    arrays = predictor.to_arrays()
+    predictor_meta = json.loads(str(arrays.pop("meta")))
+    index = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        np.save(tmp_dir / "arrays" / f"{name}.npy", array, allow_pickle=False)
+        index[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "sha256": _array_sha256(array)}
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "model_version": model_version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model_type": predictor.meta.get("model_type"),
+        "feature_schema": feature_schema(predictor),
+        "metrics": metrics or {},
+        "predictor": predictor_meta,
+        "arrays": index,
+    }
+    with open(tmp_dir / MANIFEST_FILE, "w") as file_obj:
+        json.dump(manifest, file_obj, indent=2)
+
+    old_dir = bundle_dir.with_name(f"{bundle_dir.name}.old-{os.getpid()}")
+    if bundle_dir.exists():
+        os.replace(bundle_dir, old_dir)
+    os.replace(tmp_dir, bundle_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return bundle_dir
+
+
+def read_manifest(bundle_dir) -> Dict:
+    with open(Path(bundle_dir) / MANIFEST_FILE) as file_obj:
+        return json.load(file_obj)
+
+
+def load_bundle(bundle_dir, expected_schema: Optional[List[Dict]] = SERVING_FEATURE_SCHEMA,
+                mmap: bool = True, verify_hashes: bool = False) -> ModelBundle:
+    '''
+    Open a bundle written by save_bundle.
+
+    Arrays are memory-mapped read-only by default, so loading costs a few
+    syscalls and every worker process shares the same page-cache pages.
+    The manifest's format version, feature schema (against `expected_schema`)
+    and every array's dtype/shape are checked; `verify_hashes` additionally
+    reads all data to check content hashes.
+    '''
+    bundle_dir = Path(bundle_dir)
+    manifest = read_manifest(bundle_dir)
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise BundleSchemaError(
+            f"Unsupported bundle format {manifest.get('format_version')}, expected {BUNDLE_FORMAT_VERSION}"
+        )
+    if expected_schema is not None:
+        verify_schema(manifest["feature_schema"], expected_schema)
+
+    arrays = {}
+    for name, spec in manifest["arrays"].items():
+        array = np.load(bundle_dir / "arrays" / f"{name}.npy", mmap_mode="r" if mmap else None,
+                        allow_pickle=False)
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise BundleSchemaError(
+                f"Array {name} is {array.dtype.str}{list(array.shape)}, "
+                f"manifest says {spec['dtype']}{spec['shape']}"
+            )
+        if verify_hashes and _array_sha256(array) != spec["sha256"]:
+            raise BundleSchemaError(f"Array {name} does not match its manifest hash")
+        arrays[name] = array
+    arrays["meta"] = np.array(json.dumps(manifest["predictor"]))
+
+    return ModelBundle(path=bundle_dir, manifest=manifest, predictor=CompiledPredictor.from_arrays(arrays))
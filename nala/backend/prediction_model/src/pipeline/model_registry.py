@@ -0,0 +1,263 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.compiled_predictor import CompiledPredictor
+from src.pipeline.model_bundle import MANIFEST_FILE, ModelBundle, load_bundle
+from src.pipeline.prediction_table import PredictionTable
+from src.utils import file_sha256, load_object
+
+DEFAULT_ARTIFACTS_DIR = Path(__file__).resolve().parents[2] / "artifacts"
+
+
+@dataclass
+class ModelArtifacts:
+    version: str
+    loaded_at: float
+    model_path: Path
+    preprocessor_path: Path
+    fingerprints: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    compiled: Optional[CompiledPredictor] = None
+    bundle: Optional[ModelBundle] = None
+    table: Optional[PredictionTable] = None
+    _sklearn: Optional[Tuple[object, object]] = None
+    _sklearn_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def _load_sklearn(self) -> Tuple[object, object]:
+        # Only unpickled when needed: no compiled form, or an explicit sklearn predict().
+        if self._sklearn is None:
+            with self._sklearn_lock:
+                if self._sklearn is None:
+                    self._sklearn = (load_object(self.model_path), load_object(self.preprocessor_path))
+        return self._sklearn
+
+    @property
+    def source(self) -> str:
+        return "bundle" if self.bundle else "compiled" if self.compiled else "pickle"
+
+    @property
+    def model(self):
+        return self._load_sklearn()[0]
+
+    @property
+    def preprocessor(self):
+        return self._load_sklearn()[1]
+
+    def predict_exact(self, features):
+        '''Model output without the lookup table: compiled path if available, else sklearn.'''
+        if self.compiled is not None:
+            return self.compiled.predict(features)
+        if not hasattr(features, "iloc"):
+            import pandas as pd
+
+            features = pd.DataFrame(features)
+        return self.model.predict(self.preprocessor.transform(features))
+
+
+def artifacts_version(model_path, preprocessor_path) -> str:
+    '''Short content hash identifying one model + preprocessor pair.'''
+    digest = hashlib.sha256()
+    for path in (model_path, preprocessor_path):
+        digest.update(file_sha256(path).encode())
+    return digest.hexdigest()[:12]
+
+
+class ModelRegistry:
+    '''
+    Process-level cache of the trained model and preprocessor.
+
+    Artifacts are loaded once and shared by every request. At most every
+    `check_interval` seconds the files are stat'ed; if their mtime or size
+    changed and the content hash differs, the artifacts are reloaded (hot
+    reload after retraining). All loads happen under a lock, so concurrent
+    first requests deserialize only once.
+
+    Serving prefers the model_bundle/ directory (memory-mapped arrays, schema
+    checked, see model_bundle), then model_compiled.npz, if either was built
+    from the same model + preprocessor; the dill pickles are then only
+    unpickled on demand. prediction_table.npz
+    caches the model over the whole discrete feature grid; it is rebuilt on
+    load whenever its source hash no longer matches model.pkl.
+    '''
+
+    def __init__(self, artifacts_dir=None, check_interval: float = 5.0):
+        self.artifacts_dir = Path(artifacts_dir) if artifacts_dir else DEFAULT_ARTIFACTS_DIR
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._artifacts: Optional[ModelArtifacts] = None
+        self._last_check = 0.0
+
+    @property
+    def model_path(self) -> Path:
+        return self.artifacts_dir / "model.pkl"
+
+    @property
+    def preprocessor_path(self) -> Path:
+        return self.artifacts_dir / "preprocessor.pkl"
+
+    @property
+    def compiled_path(self) -> Path:
+        return self.artifacts_dir / "model_compiled.npz"
+
+    @property
+    def bundle_path(self) -> Path:
+        return self.artifacts_dir / "model_bundle"
+
+    @property
+    def table_path(self) -> Path:
+        return self.artifacts_dir / "prediction_table.npz"
+
+    @property
+    def is_warm(self) -> bool:
+        return self._artifacts is not None
+
+    @property
+    def current(self) -> Optional[ModelArtifacts]:
+        '''The loaded artifacts, if any, without loading or checking files.'''
+        return self._artifacts
+
+    @property
+    def version(self) -> Optional[str]:
+        artifacts = self._artifacts
+        return artifacts.version if artifacts else None
+
+    def _stat(self) -> Dict[str, Tuple[int, int]]:
+        fingerprints = {}
+        for path in (self.model_path, self.preprocessor_path):
+            stat = os.stat(path)
+            fingerprints[path.name] = (stat.st_mtime_ns, stat.st_size)
+        for path in (self.compiled_path, self.bundle_path / MANIFEST_FILE):
+            if path.exists():
+                stat = os.stat(path)
+                fingerprints[path.name] = (stat.st_mtime_ns, stat.st_size)
+        return fingerprints
+
+    def _version(self) -> str:
+        return artifacts_version(self.model_path, self.preprocessor_path)
+
+    def _load_bundle(self, version: str) -> Optional[ModelBundle]:
+        if not (self.bundle_path / MANIFEST_FILE).exists():
+            return None
+        try:
+            bundle = load_bundle(self.bundle_path)
+        except Exception as e:
+            logging.info(f"Ignoring model bundle {self.bundle_path}: {e}")
+            return None
+        if bundle.model_version != version:
+            logging.info(f"Ignoring stale model bundle (built from {bundle.model_version}, current {version})")
+            return None
+        return bundle
+
+    def _load_compiled(self, version: str) -> Optional[CompiledPredictor]:
+        if not self.compiled_path.exists():
+            return None
+        try:
+            compiled = CompiledPredictor.load(self.compiled_path)
+        except Exception as e:
+            logging.info(f"Ignoring unreadable compiled model {self.compiled_path}: {e}")
+            return None
+        if compiled.source_version != version:
+            logging.info(
+                f"Ignoring stale compiled model (built from {compiled.source_version}, current {version})"
+            )
+            return None
+        return compiled
+
+    def _load_table(self, artifacts: ModelArtifacts) -> Optional[PredictionTable]:
+        if self.table_path.exists():
+            try:
+                table = PredictionTable.load(self.table_path)
+                if table.source_version == artifacts.version:
+                    return table
+            except Exception as e:
+                logging.info(f"Ignoring unreadable prediction table {self.table_path}: {e}")
+
+        start = time.perf_counter()
+        table = PredictionTable.build(artifacts.predict_exact, source_version=artifacts.version)
+        logging.info(f"Built prediction table {table.shape} in {time.perf_counter() - start:.3f}s")
+        try:
+            table.save(self.table_path)
+        except OSError as e:
+            # Read-only deployments just keep the table in memory.
+            logging.info(f"Could not save prediction table to {self.table_path}: {e}")
+        return table
+
+    def _load(self, fingerprints: Dict[str, Tuple[int, int]]) -> ModelArtifacts:
+        start = time.perf_counter()
+        version = self._version()
+        artifacts = ModelArtifacts(
+            version=version,
+            loaded_at=time.time(),
+            model_path=self.model_path,
+            preprocessor_path=self.preprocessor_path,
+            fingerprints=fingerprints,
+        )
+        self._attach_compiled(artifacts)
+        if artifacts.compiled is None:
+            # No compiled form: unpickle now rather than on the first request.
+            artifacts._load_sklearn()
+        artifacts.table = self._load_table(artifacts)
+        logging.info(
+            f"Loaded model artifacts version {artifacts.version} from {self.artifacts_dir} "
+            f"in {time.perf_counter() - start:.3f}s (source: {artifacts.source})"
+        )
+        return artifacts
+
+    def _attach_compiled(self, artifacts: ModelArtifacts):
+        artifacts.bundle = self._load_bundle(artifacts.version)
+        if artifacts.bundle is not None:
+            artifacts.compiled = artifacts.bundle.predictor
+        else:
+            artifacts.compiled = self._load_compiled(artifacts.version)
+
+    def _is_fresh(self, artifacts: Optional[ModelArtifacts], now: float) -> bool:
+        return artifacts is not None and now - self._last_check < self.check_interval
+
+    def get(self, force_check: bool = False) -> ModelArtifacts:
+        artifacts = self._artifacts
+        now = time.monotonic()
+        if not force_check and self._is_fresh(artifacts, now):
+            return artifacts
+
+        with self._lock:
+            try:
+                artifacts = self._artifacts
+                if not force_check and self._is_fresh(artifacts, now):
+                    return artifacts
+
+                fingerprints = self._stat()
+                if artifacts is None:
+                    self._artifacts = self._load(fingerprints)
+                elif fingerprints != artifacts.fingerprints:
+                    # Files were touched; only reload if the content really changed.
+                    if self._version() != artifacts.version:
+                        self._artifacts = self._load(fingerprints)
+                    else:
+                        # Same model; the bundle or compiled export may have been (re)written.
+                        self._attach_compiled(artifacts)
+                        artifacts.fingerprints = fingerprints
+                self._last_check = time.monotonic()
+                return self._artifacts
+            except Exception as e:
+                if self._artifacts is not None:
+                    # Keep serving the last good artifacts if a reload fails mid-write.
+                    logging.info(f"Model artifact reload failed, keeping version {self._artifacts.version}: {e}")
+                    self._last_check = time.monotonic()
+                    return self._artifacts
+                raise CustomException(e, sys)
+
+    def warmup(self) -> ModelArtifacts:
+        '''Load artifacts eagerly, e.g. at app start, so no request pays for deserialization.'''
+        return self.get(force_check=True)
+
+
+default_registry = ModelRegistry(
+    check_interval=float(os.getenv("MODEL_RELOAD_CHECK_INTERVAL", "5"))
+)
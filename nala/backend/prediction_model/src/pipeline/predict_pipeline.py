@@ -1,31 +1,47 @@
-import os
-from pathlib import Path
 import sys
-import pandas as pd
+
+import numpy as np
 
 from src.exception import CustomException
-from src.utils import load_object
+from src.pipeline.model_registry import default_registry
 
 class PredictPipeline:
-    def __init__(self):
-        self.artifacts_dir = Path(__file__).resolve().parents[2] / "artifacts"
+    def __init__(self, registry=None):
+        self.registry = registry or default_registry
+        self.artifacts_dir = self.registry.artifacts_dir
 
 
     def predict(self,features):
         try:
-            print("here")
-            print("Before Loading")
-            # Build dynamic file paths
-            model_path = self.artifacts_dir / "model.pkl"
-            preprocessor_path = self.artifacts_dir / "preprocessor.pkl"
-            
-            model=load_object(model_path)
-            preprocessor=load_object(preprocessor_path)
-            print("After Loading")
-            data_scaled=preprocessor.transform(features)
-            preds=model.predict(data_scaled)
-            print("Predictions:", preds)
+            # Model and preprocessor are loaded once per process by the registry
+            artifacts = self.registry.get()
+            data_scaled=artifacts.preprocessor.transform(features)
+            preds=artifacts.model.predict(data_scaled)
+            return preds
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def predict_batch(self,features):
+        '''
+        Predict every row of `features` (a DataFrame or a dict of column arrays);
+        returns a 1-D float array.
+        In-grid rows are read from the precomputed prediction table, the rest go
+        through one exact model call (compiled NumPy path when available).
+        '''
+        try:
+            artifacts = self.registry.get()
+            if artifacts.table is None:
+                return np.asarray(artifacts.predict_exact(features), dtype=float).ravel()
+
+            preds, in_grid = artifacts.table.lookup(features)
+            if not in_grid.all():
+                misses = ~in_grid
+                if hasattr(features, "iloc"):
+                    rows = features[misses]
+                else:
+                    rows = {column: np.asarray(values)[misses] for column, values in features.items()}
+                preds[misses] = np.asarray(artifacts.predict_exact(rows), dtype=float).ravel()
             return preds
-        
         except Exception as e:
-            raise CustomException(e,sys)
\ No newline at end of file
+            raise CustomException(e,sys)
@@ -0,0 +1,105 @@
+import json
+from typing import Callable, Sequence, Tuple
+
+import numpy as np
+
+# The model's whole input space: 6 Bloom levels x difficulty 1-10 x grade 0-100.
+BLOOMS_LEVELS = ("analyze", "apply", "create", "evaluate", "remember", "understand")
+DIFFICULTY_RANGE = (1, 10)
+GRADE_RANGE = (0, 100)
+
+
+class PredictionTable:
+    '''
+    Model output precomputed for every integer point of the discrete feature grid.
+
+    lookup() answers a batch by array indexing; rows that fall outside the grid
+    (unknown Bloom level, non-integer or out-of-range difficulty/grade, missing
+    values) are reported in a mask so the caller can fall back to the model.
+    Fractional grades (quiz scores are k/n*100, e.g. 66.67) are off the grid
+    too and go to the model.
+    '''
+
+    def __init__(self, values: np.ndarray, blooms_levels: Sequence[str] = BLOOMS_LEVELS,
+                 difficulty_range: Tuple[int, int] = DIFFICULTY_RANGE,
+                 grade_range: Tuple[int, int] = GRADE_RANGE, source_version: str = None):
+        self.values = values
+        self.blooms_levels = np.asarray(blooms_levels)
+        self.difficulty_range = tuple(int(v) for v in difficulty_range)
+        self.grade_range = tuple(int(v) for v in grade_range)
+        self.source_version = source_version
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.values.shape
+
+    @staticmethod
+    def grid_frame(blooms_levels=BLOOMS_LEVELS, difficulty_range=DIFFICULTY_RANGE, grade_range=GRADE_RANGE):
+        '''Every grid point as model input columns, in C order of the table.'''
+        levels, difficulties, grades = np.meshgrid(
+            np.asarray(blooms_levels, dtype=object),
+            np.arange(difficulty_range[0], difficulty_range[1] + 1),
+            np.arange(grade_range[0], grade_range[1] + 1),
+            indexing="ij",
+        )
+        return {
+            "blooms_level": levels.ravel(),
+            "topic_difficulty": difficulties.ravel(),
+            "previous_grade": grades.ravel(),
+        }
+
+    @classmethod
+    def build(cls, predict: Callable, source_version: str = None, blooms_levels=BLOOMS_LEVELS,
+              difficulty_range=DIFFICULTY_RANGE, grade_range=GRADE_RANGE) -> "PredictionTable":
+        '''Evaluate `predict` (DataFrame-like columns -> 1-D array) over the full grid in one call.'''
+        import pandas as pd
+
+        grid = pd.DataFrame(cls.grid_frame(blooms_levels, difficulty_range, grade_range))
+        shape = (
+            len(blooms_levels),
+            difficulty_range[1] - difficulty_range[0] + 1,
+            grade_range[1] - grade_range[0] + 1,
+        )
+        values = np.asarray(predict(grid), dtype=np.float64).reshape(shape)
+        return cls(values, blooms_levels, difficulty_range, grade_range, source_version)
+
+    def _integer_index(self, values, bounds) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.asarray(values, dtype=np.float64)
+        in_grid = (values == np.round(values)) & (values >= bounds[0]) & (values <= bounds[1])
+        index = np.where(in_grid, values - bounds[0], 0).astype(np.intp)
+        return index, in_grid
+
+    def lookup(self, features) -> Tuple[np.ndarray, np.ndarray]:
+        '''Return (predictions, in_grid); predictions are NaN where in_grid is False.'''
+        levels = np.asarray(features["blooms_level"], dtype=object)
+        levels = np.where(np.equal(levels, None), "", levels).astype(str)
+        level_index = np.minimum(np.searchsorted(self.blooms_levels, levels), len(self.blooms_levels) - 1)
+        level_in_grid = self.blooms_levels[level_index] == levels
+
+        difficulty_index, difficulty_in_grid = self._integer_index(features["topic_difficulty"], self.difficulty_range)
+        grade_index, grade_in_grid = self._integer_index(features["previous_grade"], self.grade_range)
+
+        in_grid = level_in_grid & difficulty_in_grid & grade_in_grid
+        predictions = self.values[level_index, difficulty_index, grade_index]
+        return np.where(in_grid, predictions, np.nan), in_grid
+
+    def save(self, file_path):
+        meta = {
+            "difficulty_range": self.difficulty_range,
+            "grade_range": self.grade_range,
+            "source_version": self.source_version,
+        }
+        with open(file_path, "wb") as file_obj:
+            np.savez(file_obj, values=self.values, blooms_levels=self.blooms_levels, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, file_path) -> "PredictionTable":
+        with np.load(file_path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays["meta"]))
+            return cls(
+                arrays["values"],
+                [str(level) for level in arrays["blooms_levels"]],
+                meta["difficulty_range"],
+                meta["grade_range"],
+                meta["source_version"],
+            )
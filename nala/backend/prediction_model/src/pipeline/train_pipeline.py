@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import file_sha256
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    config: Dict = field(default_factory=dict)
+
+
+class StageRunner:
+    '''
+    Runs pipeline stages in order and skips the ones whose outputs are current.
+
+    A stage's fingerprint hashes its name, config and the content of its input
+    files. It is skipped when the fingerprint matches the last recorded run and
+    every output still has the recorded hash. Stage state lives in a small JSON
+    file next to the artifacts.
+    '''
+
+    def __init__(self, state_path=os.path.join("artifacts", "stages.json"), force=()):
+        self.state_path = state_path
+        self.force = set(force)
+        self.state = self._read_state()
+
+    def _read_state(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path) as file_obj:
+                return json.load(file_obj)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as file_obj:
+            json.dump(self.state, file_obj, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def fingerprint(stage: Stage) -> str:
+        digest = hashlib.sha256()
+        digest.update(stage.name.encode())
+        digest.update(json.dumps(stage.config, sort_keys=True, default=str).encode())
+        for path in stage.inputs:
+            digest.update(path.encode())
+            digest.update(file_sha256(path).encode())
+        return digest.hexdigest()
+
+    def is_current(self, stage: Stage, fingerprint: str) -> bool:
+        record = self.state.get(stage.name)
+        if stage.name in self.force or "all" in self.force or not record:
+            return False
+        if record.get("fingerprint") != fingerprint:
+            return False
+        for path, digest in record.get("outputs", {}).items():
+            if not os.path.exists(path) or file_sha256(path) != digest:
+                return False
+        return True
+
+    def run(self, stages: List[Stage]) -> Dict:
+        '''Returns {stage name: result} where result is the stage's (recorded) return value.'''
+        results = {}
+        for stage in stages:
+            fingerprint = self.fingerprint(stage)
+            if self.is_current(stage, fingerprint):
+                logging.info(f"Stage {stage.name} is up to date, skipping")
+                results[stage.name] = self.state[stage.name].get("result")
+                continue
+
+            logging.info(f"Running stage {stage.name}")
+            start = time.perf_counter()
+            result = stage.run()
+            self.state[stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": {path: file_sha256(path) for path in stage.outputs if os.path.exists(path)},
+                "result": result,
+                "seconds": round(time.perf_counter() - start, 3),
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            # Written after every stage so an interrupted run still keeps finished stages.
+            self._write_state()
+            results[stage.name] = result
+        return results
+
+
+def _estimator_config(models: Dict, params: Dict) -> Dict:
+    return {
+        name: {
+            "class": f"{type(model).__module__}.{type(model).__name__}",
+            "init_params": {key: repr(value) for key, value in sorted(model.get_params().items())},
+            "grid": params.get(name, {}),
+        }
+        for name, model in models.items()
+    }
+
+
+class TrainPipeline:
+    '''Ingestion -> transformation -> training, each stage rerun only when its inputs or config changed.'''
+
+    def __init__(self, force=()):
+        from src.components.data_ingestion import DataIngestion
+        from src.components.data_transformation import DataTransformation
+        from src.components.model_trainer import ModelTrainer
+
+        self.ingestion = DataIngestion()
+        self.transformation = DataTransformation()
+        self.trainer = ModelTrainer()
+        self.runner = StageRunner(force=force)
+
+    def stages(self) -> List[Stage]:
+        ingestion_config = self.ingestion.ingestion_config
+        transformation_config = self.transformation.data_transformation_config
+        trainer_config = self.trainer.model_trainer_config
+        models, params = self.trainer.get_model_candidates()
+
+        def ingest():
+            self.ingestion.initiate_data_ingestion()
+
+        def transform():
+            self.transformation.initiate_data_transformation(
+                ingestion_config.train_data_path, ingestion_config.test_data_path
+            )
+
+        def train():
+            train_arr = np.load(transformation_config.train_arr_file_path)
+            test_arr = np.load(transformation_config.test_arr_file_path)
+            return float(self.trainer.initiate_model_trainer(
+                train_arr, test_arr, transformation_config.preprocessor_obj_file_path
+            ))
+
+        return [
+            Stage(
+                name="ingestion",
+                run=ingest,
+                inputs=[ingestion_config.source_data_path],
+                outputs=[
+                    ingestion_config.raw_data_path,
+                    ingestion_config.train_data_path,
+                    ingestion_config.test_data_path,
+                ],
+                config=asdict(ingestion_config),
+            ),
+            Stage(
+                name="transformation",
+                run=transform,
+                inputs=[ingestion_config.train_data_path, ingestion_config.test_data_path],
+                outputs=[
+                    transformation_config.preprocessor_obj_file_path,
+                    transformation_config.train_arr_file_path,
+                    transformation_config.test_arr_file_path,
+                ],
+                config={"preprocessor": repr(self.transformation.get_data_transformer_object())},
+            ),
+            Stage(
+                name="training",
+                run=train,
+                inputs=[
+                    transformation_config.train_arr_file_path,
+                    transformation_config.test_arr_file_path,
+                    transformation_config.preprocessor_obj_file_path,
+                ],
+                outputs=[trainer_config.trained_model_file_path],
+                config={
+                    "models": _estimator_config(models, params),
+                    "search_strategy": trainer_config.search_strategy,
+                },
+            ),
+        ]
+
+    def run(self):
+        '''Returns the test R2 of the current model (recorded if training was skipped).'''
+        try:
+            results = self.runner.run(self.stages())
+            return results["training"]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping up-to-date stages.")
+    parser.add_argument(
+        "--force", nargs="*", default=[], metavar="STAGE",
+        help="rerun these stages (ingestion, transformation, training) or 'all' even if current",
+    )
+    args = parser.parse_args()
+
+    r2 = TrainPipeline(force=args.force).run()
+    print(f"Test R2: {r2}")
@@ -1,56 +1,118 @@
+import hashlib
+import json
 import os
 import sys
 
 import numpy as np 
-import pandas as pd
-import dill
-from sklearn.model_selection import GridSearchCV
 from src.exception import CustomException
-from sklearn.metrics import r2_score
 from src.logger import logging
 
+# dill, pandas and the search (sklearn) are imported inside the functions that need
+# them, so the prediction service can use load_object/file_sha256 without paying for them.
+
 def save_object(file_path,obj):
     try:
         dir_path = os.path.dirname(file_path)
 
         os.makedirs(dir_path, exist_ok=True)
 
+        import dill
+
         with open(file_path, "wb") as file_obj:
             dill.dump(obj,file_obj)
 
     except Exception as e:
         raise CustomException(e,sys)
     
-def evaluate_models(X_train,y_train,X_test,y_test,models,param):
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_frame(file_path,df):
+    '''
+    Store a DataFrame column by column in one .npz file (no pickling).
+    Text columns become fixed-width unicode arrays with a separate missing mask.
+    '''
     try:
-        report = {}
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para =  param[list(models.keys())[i]]
+        import pandas as pd
 
-            gs = GridSearchCV(model,para,cv=3)
-            gs.fit(X_train,y_train)
+        dir_path = os.path.dirname(file_path)
 
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
-    
+        os.makedirs(dir_path, exist_ok=True)
+
+        arrays = {}
+        columns = []
+        for i, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            if values.dtype.kind in "biuf":
+                columns.append({"name": str(column), "kind": "numeric"})
+                arrays[f"col{i}"] = values
+            else:
+                missing = pd.isna(df[column]).to_numpy()
+                columns.append({"name": str(column), "kind": "text"})
+                arrays[f"col{i}"] = np.where(missing, "", values).astype(str)
+                arrays[f"col{i}_missing"] = missing
+        arrays["columns"] = np.array(json.dumps(columns))
 
-            y_train_pred = model.predict(X_train)
+        with open(file_path, "wb") as file_obj:
+            np.savez_compressed(file_obj, **arrays)
 
-            y_test_pred = model.predict(X_test)
+    except Exception as e:
+        raise CustomException(e,sys)
 
-            train_model_score = r2_score(y_train,y_train_pred)
-            test_model_score = r2_score(y_test,y_test_pred)
+def load_frame(file_path):
+    try:
+        import pandas as pd
 
-            logging.info(f"{list(models.keys())[i]},Train model score :{train_model_score}, Test model score: {test_model_score}")
-            
-            report[list(models.keys())[i]] = test_model_score
+        with np.load(file_path, allow_pickle=False) as arrays:
+            data = {}
+            for i, column in enumerate(json.loads(str(arrays["columns"]))):
+                values = arrays[f"col{i}"]
+                if column["kind"] == "text":
+                    values = values.astype(object)
+                    values[arrays[f"col{i}_missing"]] = np.nan
+                data[column["name"]] = values
+        return pd.DataFrame(data)
+
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def evaluate_models(X_train,y_train,X_test,y_test,models,param,n_jobs=1,strategy="grid",cache_dir=None):
+    '''
+    Search each model's param grid (3-fold CV), refit the best params on the full
+    training set and return {model name: test R2}. Fitted models replace the
+    entries of `models`. Fits run on `n_jobs` processes; strategy="halving" uses
+    successive halving instead of a full grid; `cache_dir` keeps fold scores so
+    reruns on the same data skip finished fits.
+    '''
+    try:
+        from src.components.model_search import ModelSearch, ModelSearchConfig
+
+        search = ModelSearch(ModelSearchConfig(n_jobs=n_jobs, strategy=strategy, cache_dir=cache_dir))
+        results = search.run(X_train, y_train, X_test, y_test, models=models, params=param)
+
+        report = {}
+        for name, result in results.items():
+            models[name] = result.estimator
+
+            logging.info(
+                f"{name},Train model score :{result.train_score}, Test model score: {result.test_score}, "
+                f"best params: {result.best_params}, fits: {result.fits} (+{result.cached_fits} cached), "
+                f"wall time: {result.wall_seconds:.2f}s, fit time: {result.fit_seconds:.2f}s"
+            )
+
+            report[name] = result.test_score
 
         return report
     except Exception as e:
         raise CustomException(e,sys)
 def load_object(file_path):
     try:
+        import dill
+
         with open(file_path, "rb") as file_obj:
             return dill.load(file_obj)
 
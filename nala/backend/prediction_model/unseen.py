@@ -1,38 +1,38 @@
-import pandas as pd
-from src.utils import load_object
-from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
-
-# test 
-
-unseen_data_path = "/Users/yvonne/User Github/NALA-LearnScape/nala/backend/prediction_model/Notebook/data/unseen_data.csv"
-
-unseen_df = pd.read_csv(unseen_data_path)
-
-preprocessor = load_object("/Users/yvonne/User Github/NALA-LearnScape/nala/backend/prediction_model/artifacts/preprocessor.pkl")
-
-target_column_name = "actual_study_hours"
-if target_column_name in unseen_df.columns:
-    unseen_target = unseen_df[target_column_name]
-    unseen_features = unseen_df.drop(columns=[target_column_name], axis=1)
-else:
-    unseen_features = unseen_df
-
-unseen_features_transformed = preprocessor.transform(unseen_features)
-
-model = load_object("/Users/yvonne/User Github/NALA-LearnScape/nala/backend/prediction_model/artifacts/model.pkl")
-
-unseen_predictions = model.predict(unseen_features_transformed)
-
-if target_column_name in unseen_df.columns:
-    r2 = r2_score(unseen_target, unseen_predictions)
-    mae = mean_absolute_error(unseen_target, unseen_predictions)
-    mse = mean_squared_error(unseen_target, unseen_predictions)
-    rmse = mse ** 0.5
-    print(f"Unseen Data R²: {r2}")
-    print(f"Unseen Data Mean Absolute Error: {mae}")
-    print(f"Unseen Data Root Mean Squared Error: {rmse}")
-    print(unseen_predictions)
-
-else:
-    print("Predictions on unseen data:")
-    print(unseen_predictions)
\ No newline at end of file
+import argparse
+
+from src.components.model_evaluation import (INFERENCE_PATHS, ModelEvaluation, ModelEvaluationConfig,
+                                             format_report, save_report)
+
+# Evaluate a saved artifact set on unseen data and benchmark the inference paths, e.g.
+#   python unseen.py
+#   python unseen.py --artifacts artifacts --data Notebook/data/unseen_data.csv --output results/unseen.json
+#   python unseen.py --paths compiled table --batch-sizes 1 100 10000
+
+defaults = ModelEvaluationConfig()
+
+parser = argparse.ArgumentParser(description="Score a model artifact set and benchmark its inference paths.")
+parser.add_argument("--artifacts", default=defaults.artifacts_dir,
+                    help="directory with model.pkl / preprocessor.pkl (+ compiled, bundle, table)")
+parser.add_argument("--data", default=defaults.data_path, help="CSV or columnar .npz dataset")
+parser.add_argument("--target", default=defaults.target_column, help="target column, if the dataset has it")
+parser.add_argument("--paths", nargs="+", choices=INFERENCE_PATHS, default=defaults.paths)
+parser.add_argument("--batch-sizes", nargs="+", type=int, default=defaults.batch_sizes)
+parser.add_argument("--single-iterations", type=int, default=defaults.single_iterations,
+                    help="single-row predictions timed for the latency percentiles")
+parser.add_argument("--output", default=None, help="write the JSON report here")
+args = parser.parse_args()
+
+evaluation = ModelEvaluation(ModelEvaluationConfig(
+    artifacts_dir=args.artifacts,
+    data_path=args.data,
+    target_column=args.target,
+    paths=args.paths,
+    batch_sizes=args.batch_sizes,
+    single_iterations=args.single_iterations,
+))
+report = evaluation.evaluate()
+
+print(format_report(report))
+if args.output:
+    save_report(report, args.output)
+    print(f"Report written to {args.output}")
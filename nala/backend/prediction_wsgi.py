@@ -0,0 +1,34 @@
+"""
+WSGI entry point for the Flask prediction service.
+
+It exposes the WSGI callable as a module-level variable named ``application``.
+Model artifacts and Django are loaded here, at import time, so with gunicorn's
+preload_app they are loaded once in the master and shared copy-on-write by
+every forked worker:
+
+    gunicorn -c gunicorn.conf.py prediction_wsgi:application
+"""
+
+import gc
+import importlib.util
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, 'prediction_model')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# app.py is loaded by path: the `app` Django package shadows it as a module name.
+_spec = importlib.util.spec_from_file_location('prediction_app', os.path.join(BACKEND_DIR, 'app.py'))
+prediction_app = importlib.util.module_from_spec(_spec)
+sys.modules['prediction_app'] = prediction_app
+_spec.loader.exec_module(prediction_app)
+
+if os.getenv('PREDICTION_PRELOAD', '1') != '0':
+    prediction_app.warmup()
+    # Everything loaded so far lives as long as the process; keep the collector
+    # from touching (and un-sharing) those pages in forked workers.
+    gc.freeze()
+
+application = prediction_app.app
@@ -1,88 +1,170 @@
+import argparse
+import hashlib
 import os
+import time
 import django
 
 # Set up Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nala_backend.settings')
 django.setup()
 
-from app.models import Student, Module
-from app.services.blooms import update_bloom_from_chathistory
+from django.db import transaction
+from app.models import BloomSeedProgress, Student, Module
+from app.services.blooms import apply_classification_to_students, classify_chathistory_file
 
-def initialize_bloom_for_all_students(module_id: int = 1):
+DEFAULT_CHAT_FILEPATH = 'app/services/chat_history/studentbloombytopic.json'
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def initialize_bloom_for_all_students(
+    module_id: int = 1,
+    chat_filepath: str = DEFAULT_CHAT_FILEPATH,
+    chunk_size: int = 500,
+    restart: bool = False,
+):
     """
     Initialize Bloom taxonomy records for ALL students in the database
     for a specific module using the same chat history file (studentbloombytopic.json).
 
+    The file is classified once and the counts are merged into every
+    student's record in chunks (one bulk_update + bulk_create per chunk,
+    each chunk its own transaction). The classification and the last
+    finished student are kept in a BloomSeedProgress row, whose cursor is
+    saved in each chunk's transaction, so an interrupted run resumes after
+    the last committed chunk without classifying again or applying a chunk
+    twice.
+
     Args:
         module_id (int, optional): The ID of the module to process. Defaults to 1.
+        chat_filepath (str, optional): Chat history JSON to classify.
+        chunk_size (int, optional): Students per transaction.
+        restart (bool, optional): Discard the progress of an earlier run and start over.
     """
-    
-    # Configuration
-    chat_filepath = 'app/services/chat_history/studentbloombytopic.json'
-    
+
     print("=" * 60)
     print("Initializing Bloom Taxonomy Records for All Students")
     print("=" * 60)
     print(f"Chat history file: {chat_filepath}")
     print(f"Target module_id: {module_id}")
     print()
-    
+
     # Check if file exists
     if not os.path.exists(chat_filepath):
         print(f"ERROR: File not found: {chat_filepath}")
         return
-    
-    # Get all students
-    students = Student.objects.all()
-    total_students = students.count()
-    
-    if total_students == 0:
-        print("No students found in database.")
-        return
-    
-    print(f"Found {total_students} student(s) in database\n")
-    
-    success_count = 0
-    error_count = 0
-    
-    # Process single module for all students
+
     try:
         module = Module.objects.get(id=module_id)
-        print(f"Processing module: {module.name} ({module.id})\n")
-        
-        for student in students:
-            try:
-                print(f"Processing: {student.name} ({student.id})")
-                
-                # Process chat history and update Bloom records
-                update_bloom_from_chathistory(student, module_id, chat_filepath)
-                
-                print("  ✓ Successfully processed")
-                success_count += 1
-                
-            except Exception as e:
-                print(f"  ERROR: {str(e)}")
-                error_count += 1
-        
     except Module.DoesNotExist:
         print(f"ERROR: Module '{module_id}' not found")
         return
-    
+    print(f"Processing module: {module.name} ({module.id})\n")
+
+    run_key = {'module': module, 'chat_file_sha256': file_sha256(chat_filepath)}
+    if restart:
+        BloomSeedProgress.objects.filter(**run_key).delete()
+    progress = BloomSeedProgress.objects.filter(**run_key).first()
+
+    if progress:
+        print(f"Resuming after student {progress.last_student_id} "
+              f"({progress.processed} already processed)\n")
+    else:
+        # Classify once; the result is identical for every student.
+        start = time.perf_counter()
+        classification = classify_chathistory_file(module.id, chat_filepath)
+        if classification is None:
+            print(f"ERROR: Module '{module_id}' has no topics")
+            return
+        print(f"Classified chat history in {time.perf_counter() - start:.1f}s\n")
+        progress = BloomSeedProgress.objects.create(**run_key, classification=classification)
+
+    # Students in primary key order so the progress row is a simple keyset cursor
+    students = Student.objects.order_by('id').values_list('id', flat=True)
+    if progress.last_student_id is not None:
+        students = students.filter(id__gt=progress.last_student_id)
+    student_ids = list(students)
+    total_students = progress.processed + len(student_ids)
+
+    if total_students == 0:
+        progress.delete()
+        print("No students found in database.")
+        return
+
+    print(f"Found {total_students} student(s) in database\n")
+
+    error_count = 0
+    start = time.perf_counter()
+    done_this_run = 0
+    for offset in range(0, len(student_ids), chunk_size):
+        chunk = student_ids[offset:offset + chunk_size]
+        try:
+            with transaction.atomic():
+                counts = apply_classification_to_students(module, chunk, progress.classification)
+                # The cursor commits with the records it covers.
+                progress.last_student_id = chunk[-1]
+                progress.processed += len(chunk)
+                progress.created += counts['created']
+                progress.updated += counts['updated']
+                progress.save(update_fields=['last_student_id', 'processed', 'created', 'updated', 'updated_at'])
+        except Exception as e:
+            # Nothing of this chunk was written; rerunning resumes here.
+            print(f"  ERROR in chunk starting at student {chunk[0]}: {str(e)}")
+            error_count += len(chunk)
+            progress.refresh_from_db()
+            break
+
+        done_this_run += len(chunk)
+        elapsed = time.perf_counter() - start
+        rate = done_this_run / elapsed if elapsed else 0.0
+        remaining = total_students - progress.processed
+        eta = remaining / rate if rate else 0.0
+        print(f"  [{progress.processed}/{total_students}] "
+              f"{counts['updated']} updated, {counts['created']} created "
+              f"({rate:.0f} students/s, ETA {eta:.0f}s)")
+
+    success_count = progress.processed
+    finished = error_count == 0
+    if finished:
+        progress.delete()
+
     # Summary
     print("\n" + "=" * 60)
     print("Summary:")
     print(f"  Total students: {total_students}")
     print(f"  Successfully processed: {success_count}")
+    print(f"    Records updated: {progress.updated}")
+    print(f"    Records created: {progress.created}")
     print(f"  Errors: {error_count}")
+    if not finished:
+        print("  Progress saved in the database; rerun to resume.")
     print("=" * 60)
-    
-    if success_count > 0:
+
+    if finished and success_count > 0:
         print("\n✓ Bloom taxonomy records have been initialized!")
         print("  Students can now continue to accumulate Bloom data through:")
         print("  - New chatbot messages (processed every 10 messages or on exit)")
         print("  - Quiz completions (processed when quiz is submitted)")
-    
+
     return success_count, error_count
 
 if __name__ == "__main__":
-    initialize_bloom_for_all_students(module_id=1)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed every student's Bloom record from one chat history file.")
+    parser.add_argument("--module", default="1", help="Module ID (default 1)")
+    parser.add_argument("--chat-file", default=DEFAULT_CHAT_FILEPATH)
+    parser.add_argument("--chunk-size", type=int, default=500, help="Students per transaction")
+    parser.add_argument("--restart", action="store_true", help="Discard the progress of an interrupted run")
+    args = parser.parse_args()
+
+    initialize_bloom_for_all_students(
+        module_id=args.module,
+        chat_filepath=args.chat_file,
+        chunk_size=args.chunk_size,
+        restart=args.restart,
+    )
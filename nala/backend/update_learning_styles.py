@@ -1,3 +1,4 @@
+import argparse
 import os
 import django
 
@@ -5,21 +6,30 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nala_backend.settings')
 django.setup()
 
-from app.models import Student
-from app.services.classifierjson import learning_style_from_json
-
-# Run function
-results = learning_style_from_json("app/services/chat_history/newlearningstyle.json")
-
-# Update students
-if results and not any("error" in str(result) for result in results):
-    breakdown = results[0] if isinstance(results, list) else results
-    
-    for student in Student.objects.all():
-        student.learningStyleBreakdown = breakdown
-        student.save()
-        print(f"Updated student: {student.name}")
-        
-    print("All students updated!")
-else:
-    print("Error in results:", results)
\ No newline at end of file
+from app.services.learning_styles import update_learning_styles
+
+# Each student's learning style comes from their own user messages. Labels are
+# stored in Message.msg_context, so a rerun only classifies new messages.
+
+parser = argparse.ArgumentParser(description="Recompute students' learning styles from their chat messages.")
+parser.add_argument("--students", help="Comma separated student IDs (default: all students)")
+parser.add_argument("--module", help="Only use messages from this module")
+parser.add_argument("--workers", type=int, default=4, help="Students classified concurrently")
+parser.add_argument("--chunk-size", type=int, default=200, help="Students written per transaction")
+args = parser.parse_args()
+
+student_ids = [sid.strip() for sid in args.students.split(',') if sid.strip()] if args.students else None
+
+def report(totals):
+    print(f"  [{totals['processed']}/{totals['students']}] {totals['updated']} updated, "
+          f"{totals['classified']} messages classified, {totals['reused']} reused")
+
+totals = update_learning_styles(
+    student_ids=student_ids,
+    module_id=args.module,
+    workers=args.workers,
+    chunk_size=args.chunk_size,
+    progress=report,
+)
+
+print(f"All students updated! ({totals['updated']} of {totals['students']} had user messages)")